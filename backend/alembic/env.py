@@ -12,17 +12,18 @@ from core.database import Base, settings
 
 # Import ALL models here so Alembic can see them
 # This is crucial for 'autogenerate' to detect new tables
-from modules.catalog.domain.models import Product, ProductBarcode
-from modules.inventory.domain.models import Warehouse, Batch, StockMovement
-from modules.sales.domain.models import Sale, SaleItem
+from modules.catalog.domain.models import Product, ProductBarcode, CatalogTombstone, PriceList, PriceListItem
+from modules.inventory.domain.models import Warehouse, Location, ProductLocation, Batch, StockMovement
+from modules.sales.domain.models import Sale, SaleItem, AnalyticsCheckpoint, ProductBasketStat, ProductAffinity, ProductSalesDaily
 from modules.invoicing.domain.models import Document
-from modules.customers.domain.models import Customer
+from modules.customers.domain.models import Customer, CustomerScore
 from modules.accounts_receivable.domain.models import CustomerLedger
 from modules.finance.domain.models import CostCategory, ProductCostComponent, Payment
-from modules.picking.domain.models import PickTask, PickScanEvent
+from modules.picking.domain.models import PickTask, PickScanEvent, PickShortPick, PickMetricsHourly, PickWave, PickWaveOrder, PickWaveLine, PickWaveSort
 from modules.iam.domain.models import User
 from modules.suppliers.domain.models import Supplier
 from modules.admin.domain.models import SystemSetting
+from modules.printing.domain.models import Printer, PrintJob
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -36,6 +37,18 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# Search objects created with raw SQL by the product_search_index migration:
+# not in the metadata, so autogenerate must not propose dropping them
+SEARCH_INDEXES = {"ix_products_name_trgm", "ix_products_sku_trgm", "ix_product_barcodes_barcode_trgm"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and name.startswith("products_fts"):
+        return False
+    if type_ == "index" and name in SEARCH_INDEXES:
+        return False
+    return True
+
 # Update DB URL from settings
 config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 
@@ -56,6 +69,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -65,7 +79,7 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,60 @@
+"""product_affinity
+
+Revision ID: 4b7d2c9e1f06
+Revises: 8c1f4e2a9b3d
+Create Date: 2026-10-19 11:03:27.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7d2c9e1f06'
+down_revision: Union[str, Sequence[str], None] = '8c1f4e2a9b3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('sales', sa.Column('confirmed_at', sa.DateTime(), nullable=True))
+    # Existing confirmed sales have no confirmation timestamp; creation time is the closest proxy
+    op.execute("UPDATE sales SET confirmed_at = created_at WHERE status = 'CONFIRMED'")
+    op.create_index(op.f('ix_sales_confirmed_at'), 'sales', ['confirmed_at'], unique=False)
+    op.create_table('analytics_checkpoints',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('last_processed_at', sa.DateTime(), nullable=True),
+    sa.Column('last_id', sa.Integer(), nullable=True),
+    sa.Column('processed_count', sa.Integer(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table('product_basket_stats',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('basket_count', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+    op.create_table('product_affinities',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('related_product_id', sa.Integer(), nullable=False),
+    sa.Column('pair_count', sa.Integer(), nullable=True),
+    sa.Column('support', sa.Float(), nullable=True),
+    sa.Column('confidence', sa.Float(), nullable=True),
+    sa.Column('lift', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.ForeignKeyConstraint(['related_product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('product_id', 'related_product_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('product_affinities')
+    op.drop_table('product_basket_stats')
+    op.drop_table('analytics_checkpoints')
+    op.drop_index(op.f('ix_sales_confirmed_at'), table_name='sales')
+    op.drop_column('sales', 'confirmed_at')
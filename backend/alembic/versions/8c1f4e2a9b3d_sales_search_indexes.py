@@ -0,0 +1,44 @@
+"""sales_search_indexes
+
+Revision ID: 8c1f4e2a9b3d
+Revises: dc63abba97ea
+Create Date: 2026-10-19 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c1f4e2a9b3d'
+down_revision: Union[str, Sequence[str], None] = 'dc63abba97ea'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('sales', sa.Column('total', sa.Float(), nullable=True))
+    # Backfill denormalized totals from existing lines
+    op.execute(
+        "UPDATE sales SET total = ("
+        "SELECT COALESCE(SUM(sale_items.qty * sale_items.price), 0) "
+        "FROM sale_items WHERE sale_items.sale_id = sales.id)"
+    )
+    op.create_index(op.f('ix_sales_created_at'), 'sales', ['created_at'], unique=False)
+    op.create_index('ix_sales_customer_id_id', 'sales', ['customer_id', 'id'], unique=False)
+    op.create_index('ix_sales_status_id', 'sales', ['status', 'id'], unique=False)
+    op.create_index(op.f('ix_sale_items_sale_id'), 'sale_items', ['sale_id'], unique=False)
+    op.create_index('ix_sale_items_product_id_sale_id', 'sale_items', ['product_id', 'sale_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_sale_items_product_id_sale_id', table_name='sale_items')
+    op.drop_index(op.f('ix_sale_items_sale_id'), table_name='sale_items')
+    op.drop_index('ix_sales_status_id', table_name='sales')
+    op.drop_index('ix_sales_customer_id_id', table_name='sales')
+    op.drop_index(op.f('ix_sales_created_at'), table_name='sales')
+    op.drop_column('sales', 'total')
@@ -0,0 +1,40 @@
+"""wave_scan_events_and_shorts
+
+Revision ID: 8f3c6a1d9e27
+Revises: 6b2d8f4a1c37
+Create Date: 2026-10-20 17:20:36.551902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f3c6a1d9e27'
+down_revision: Union[str, Sequence[str], None] = '6b2d8f4a1c37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Wave scans and wave shorts belong to a wave instead of a pick task
+    for table in ('pick_scan_events', 'pick_short_picks'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('wave_id', sa.Integer(), nullable=True))
+            batch_op.alter_column('task_id', existing_type=sa.Integer(), nullable=True)
+            batch_op.create_foreign_key(f'fk_{table}_wave_id', 'pick_waves', ['wave_id'], ['id'])
+            batch_op.create_index(batch_op.f(f'ix_{table}_wave_id'), ['wave_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('pick_short_picks', 'pick_scan_events'):
+        op.execute(f'DELETE FROM {table} WHERE task_id IS NULL')
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f'ix_{table}_wave_id'))
+            batch_op.drop_constraint(f'fk_{table}_wave_id', type_='foreignkey')
+            batch_op.alter_column('task_id', existing_type=sa.Integer(), nullable=False)
+            batch_op.drop_column('wave_id')
@@ -0,0 +1,42 @@
+"""price_list_item_versions
+
+Revision ID: 9d1e4b7c2a60
+Revises: c7e2a5f4b913
+Create Date: 2026-10-20 14:05:21.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d1e4b7c2a60'
+down_revision: Union[str, Sequence[str], None] = 'c7e2a5f4b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('price_list_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('valid_from', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('valid_to', sa.DateTime(), nullable=True))
+        batch_op.drop_constraint('uq_price_list_items_list_product', type_='unique')
+    # Existing rows become the current version (open on both ends); one current row per product
+    op.create_index(
+        'uq_price_list_items_current', 'price_list_items', ['price_list_id', 'product_id'], unique=True,
+        postgresql_where=sa.text('valid_to IS NULL'), sqlite_where=sa.text('valid_to IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_price_list_items_current', table_name='price_list_items')
+    # Closed versions have no place in the old one-row-per-product table
+    op.execute('DELETE FROM price_list_items WHERE valid_to IS NOT NULL')
+    with op.batch_alter_table('price_list_items', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_price_list_items_list_product', ['price_list_id', 'product_id'])
+        batch_op.drop_column('valid_to')
+        batch_op.drop_column('valid_from')
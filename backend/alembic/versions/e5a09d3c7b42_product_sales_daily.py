@@ -0,0 +1,48 @@
+"""product_sales_daily
+
+Revision ID: e5a09d3c7b42
+Revises: 4b7d2c9e1f06
+Create Date: 2026-10-19 12:26:54.117803
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a09d3c7b42'
+down_revision: Union[str, Sequence[str], None] = '4b7d2c9e1f06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('product_sales_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('warehouse_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Float(), nullable=True),
+    sa.Column('revenue', sa.Float(), nullable=True),
+    sa.Column('order_count', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('day', 'product_id', 'warehouse_id')
+    )
+    op.create_index(op.f('ix_product_sales_daily_product_id'), 'product_sales_daily', ['product_id'], unique=False)
+    # Backfill with UTC days; POST /sales/analytics/rollups/rebuild re-buckets with timezone_offset
+    op.execute(
+        "INSERT INTO product_sales_daily (day, product_id, warehouse_id, quantity, revenue, order_count) "
+        "SELECT date(sales.created_at), sale_items.product_id, sales.warehouse_id, "
+        "SUM(sale_items.qty), SUM(sale_items.qty * sale_items.price), COUNT(DISTINCT sales.id) "
+        "FROM sales JOIN sale_items ON sale_items.sale_id = sales.id "
+        "WHERE sales.status = 'CONFIRMED' "
+        "GROUP BY date(sales.created_at), sale_items.product_id, sales.warehouse_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_product_sales_daily_product_id'), table_name='product_sales_daily')
+    op.drop_table('product_sales_daily')
@@ -0,0 +1,87 @@
+"""product_search_index
+
+Revision ID: f2c8b5a1d7e9
+Revises: a3e6f1b8c524
+Create Date: 2026-10-19 14:35:12.660148
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c8b5a1d7e9'
+down_revision: Union[str, Sequence[str], None] = 'a3e6f1b8c524'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+POSTGRES_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_products_name_trgm ON products USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_products_sku_trgm ON products USING gin (sku gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_product_barcodes_barcode_trgm ON product_barcodes USING gin (barcode gin_trgm_ops)",
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP INDEX IF EXISTS ix_product_barcodes_barcode_trgm",
+    "DROP INDEX IF EXISTS ix_products_sku_trgm",
+    "DROP INDEX IF EXISTS ix_products_name_trgm",
+]
+
+# FTS5 index keyed by product id (rowid); barcodes are stored space-separated.
+# prefix='2 3 4' keeps short typeahead prefixes on dedicated index entries.
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+    "name, sku, barcodes, tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')",
+    "INSERT INTO products_fts (rowid, name, sku, barcodes) "
+    "SELECT products.id, products.name, products.sku, "
+    "(SELECT group_concat(barcode, ' ') FROM product_barcodes WHERE product_barcodes.product_id = products.id) "
+    "FROM products",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN "
+    "INSERT INTO products_fts (rowid, name, sku, barcodes) VALUES (new.id, new.name, new.sku, ''); END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, sku ON products BEGIN "
+    "UPDATE products_fts SET name = new.name, sku = new.sku WHERE rowid = new.id; END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN "
+    "DELETE FROM products_fts WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS product_barcodes_fts_ai AFTER INSERT ON product_barcodes BEGIN "
+    "UPDATE products_fts SET barcodes = (SELECT group_concat(barcode, ' ') FROM product_barcodes "
+    "WHERE product_id = new.product_id) WHERE rowid = new.product_id; END",
+    "CREATE TRIGGER IF NOT EXISTS product_barcodes_fts_ad AFTER DELETE ON product_barcodes BEGIN "
+    "UPDATE products_fts SET barcodes = (SELECT group_concat(barcode, ' ') FROM product_barcodes "
+    "WHERE product_id = old.product_id) WHERE rowid = old.product_id; END",
+    # Edited in place or moved to another product: refresh both rows
+    "CREATE TRIGGER IF NOT EXISTS product_barcodes_fts_au AFTER UPDATE OF barcode, product_id ON product_barcodes BEGIN "
+    "UPDATE products_fts SET barcodes = (SELECT group_concat(barcode, ' ') FROM product_barcodes "
+    "WHERE product_id = old.product_id) WHERE rowid = old.product_id; "
+    "UPDATE products_fts SET barcodes = (SELECT group_concat(barcode, ' ') FROM product_barcodes "
+    "WHERE product_id = new.product_id) WHERE rowid = new.product_id; END",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS product_barcodes_fts_au",
+    "DROP TRIGGER IF EXISTS product_barcodes_fts_ad",
+    "DROP TRIGGER IF EXISTS product_barcodes_fts_ai",
+    "DROP TRIGGER IF EXISTS products_fts_ad",
+    "DROP TRIGGER IF EXISTS products_fts_au",
+    "DROP TRIGGER IF EXISTS products_fts_ai",
+    "DROP TABLE IF EXISTS products_fts",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    statements = {"postgresql": POSTGRES_UPGRADE, "sqlite": SQLITE_UPGRADE}.get(dialect, [])
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    statements = {"postgresql": POSTGRES_DOWNGRADE, "sqlite": SQLITE_DOWNGRADE}.get(dialect, [])
+    for statement in statements:
+        op.execute(statement)
@@ -20,9 +20,23 @@ async def lifespan(app: FastAPI):
                 print("--- Seeded Default Warehouse (ID=1) ---")
     except Exception as e:
         print(f"Failed to seed db: {e}")
-        
+
+    # Warm process-local caches
+    try:
+        from modules.catalog.application.barcode_cache import barcode_index
+        async with SessionLocal() as db:
+            count = await barcode_index.warm(db)
+            print(f"--- Barcode cache warmed ({count} entries) ---")
+    except Exception as e:
+        print(f"Failed to warm barcode cache: {e}")
+
+    # Background print spooler (one per process; disable it on extra workers)
+    from modules.printing.application.spooler import print_spooler
+    if settings.PRINT_SPOOLER_ENABLED:
+        print_spooler.start()
+
     yield
-    # Shutdown logic if any
+    await print_spooler.stop()
 
 settings = get_settings()
 
@@ -71,6 +85,7 @@ def create_app() -> FastAPI:
     from modules.iam import manifest as iam_manifest
     from modules.suppliers import manifest as suppliers_manifest
     from modules.finance import manifest as finance_manifest
+    from modules.printing import manifest as printing_manifest
     
     registry.register_module(catalog_manifest.module)
     registry.register_module(inventory_manifest.module)
@@ -83,6 +98,7 @@ def create_app() -> FastAPI:
     registry.register_module(iam_manifest.module)
     registry.register_module(suppliers_manifest.module)
     registry.register_module(finance_manifest.module)
+    registry.register_module(printing_manifest.module)
     
     # 2. Include Routers
     registry.include_routers(app, prefix=settings.API_V1_STR)
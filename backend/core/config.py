@@ -39,6 +39,45 @@ class Settings(BaseSettings):
         # Add other types as needed
         return self
 
+    # Caches (process-local)
+    BARCODE_CACHE_SIZE: int = 50000
+    COST_CACHE_TTL_SECONDS: int = 300
+    PRICE_INDEX_TTL_SECONDS: int = 60
+    PICK_CONTEXT_CACHE_SIZE: int = 1000
+
+    # Picking WebSocket: scans are persisted every N ms or every N scans, whichever comes first
+    PICK_WS_FLUSH_MS: int = 250
+    PICK_WS_FLUSH_BATCH: int = 50
+    # Raw pick scan events are pruned once rolled up into pick_metrics_hourly and older than this
+    PICK_EVENT_RETENTION_DAYS: int = 90
+    # Metrics rollup skips scans newer than this: queued WebSocket batches commit after they are stamped
+    PICK_METRICS_LAG_SECONDS: int = 60
+
+    # Incremental analytics jobs: sales confirmed within this window are left for the next run,
+    # so a transaction that stamped confirmed_at earlier but commits later is not skipped
+    ANALYTICS_COMMIT_LAG_SECONDS: int = 5
+
+    # Catalog delta sync: changes newer than this are held back until in-flight writes commit
+    CATALOG_SYNC_LAG_SECONDS: int = 2
+    # Catalog snapshot files served by /products/snapshot
+    CATALOG_SNAPSHOT_DIR: str = "./data/catalog_snapshots"
+    # Older snapshots are still served but rebuilt in the background (terminals replay the rest as deltas)
+    CATALOG_SNAPSHOT_MAX_AGE_SECONDS: int = 300
+
+    # /printing/batch: batches of at least this many receipts render in a process pool (0 workers: inline)
+    PRINT_BATCH_WORKERS: int = 2
+    PRINT_BATCH_POOL_THRESHOLD: int = 2000
+
+    # Print spooler (started with the app): poll interval, TCP timeout, retry backoff
+    PRINT_SPOOLER_ENABLED: bool = True
+    PRINT_SPOOLER_POLL_SECONDS: float = 2.0
+    PRINT_TCP_TIMEOUT_SECONDS: float = 10.0
+    PRINT_MAX_ATTEMPTS: int = 5
+    PRINT_RETRY_BASE_SECONDS: float = 2.0
+    PRINT_RETRY_MAX_SECONDS: float = 300.0
+    # PRINTING jobs older than this are assumed lost (process died) and requeued
+    PRINT_JOB_LEASE_SECONDS: int = 120
+
     # CORS
     BACKEND_CORS_ORIGINS: list[str] | str = []
 
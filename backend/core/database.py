@@ -28,3 +28,14 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+def dialect_insert(db: AsyncSession, table):
+    """
+    Returns an INSERT for the session's dialect that supports ON CONFLICT
+    (on_conflict_do_update / on_conflict_do_nothing) on both Postgres and SQLite.
+    """
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
@@ -1,13 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, BackgroundTasks, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from core.database import get_db
+from sqlalchemy.exc import IntegrityError
+from core.database import get_db, SessionLocal
 from modules.catalog.domain.models import Product, ProductBarcode
+from modules.catalog.application.barcode_cache import barcode_index, ProductRef
+from modules.finance.application.cost_engine import cost_engine
 from modules.suppliers.domain.models import Supplier
 from modules.iam.api.v1.router import RoleChecker, get_current_user
 from modules.iam.domain.models import User, UserRole
+from modules.catalog.application.read_model import fetch_compact, parse_fields
+from fastapi.responses import JSONResponse, FileResponse, Response
 from pydantic import BaseModel
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Literal
 
 router = APIRouter(prefix="/products", tags=["Catalog"])
 
@@ -98,14 +104,492 @@ async def create_product(product: ProductCreate, db: AsyncSession = Depends(get_
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=400, detail="Product usually already exists or duplicate SKU")
+    cost_engine.invalidate([db_product.id])
     return db_product
 
+from modules.catalog.application.import_service import ProductImportService, iter_csv, iter_xlsx
+
+@router.post("/import", dependencies=[Depends(RoleChecker([UserRole.ADMIN, UserRole.SUPERVISOR]))])
+async def import_products(file: UploadFile = File(...), db: AsyncSession = Depends(get_db)):
+    """
+    Bulk upsert by SKU from CSV or XLSX (header row required).
+    Columns: sku, name, price, cost_price, description, ... plus `barcodes` and
+    `supplier_ids` ("|"-separated) and one `cost:<category_id>` column per cost category.
+    Blank cells leave the current value unchanged. XLSX needs the optional `xlsx` extra (openpyxl).
+    Returns counts plus `results` (status of every row: created, updated, superseded or
+    failed), `errors` for failed rows and `warnings` for rows written with barcodes
+    skipped; rows overridden by a later row with the same SKU are `superseded`, not failed.
+    """
+    filename = (file.filename or "").lower()
+    try:
+        if filename.endswith(".xlsx"):
+            records = iter_xlsx(file.file)
+        elif filename.endswith(".csv") or file.content_type in ("text/csv", "application/vnd.ms-excel"):
+            records = iter_csv(file.file)
+        else:
+            raise ValueError("Unsupported file type; upload a .csv or .xlsx file")
+        report = await ProductImportService(db).run(records)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        # Imported rows may have changed barcode ownership, names or prices
+        barcode_index.clear()
+        cost_engine.invalidate()
+    return report
+
+from modules.catalog.application.reprice_service import RepriceService, RepriceRequest
+
+@router.post("/reprice", dependencies=[Depends(RoleChecker([UserRole.ADMIN, UserRole.SUPERVISOR]))])
+async def reprice_products(request: RepriceRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Rule-based bulk repricing (by supplier, cost category and/or SKU glob; +%, fixed,
+    or markup over landed cost).
+    The first matching rule wins. `dry_run` (default) returns counts and a diff preview;
+    otherwise all prices are updated in one statement and transaction.
+    """
+    result = await RepriceService(db).run(request)
+    if not request.dry_run:
+        barcode_index.clear()
+        cost_engine.invalidate()
+    return result
+
 @router.get("/", response_model=list[ProductRead])
-async def list_products(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def list_products(
+    skip: int = 0,
+    limit: int = 100,
+    view: Literal["full", "compact"] = "full",
+    fields: str | None = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    `view=full` (default) returns the complete ProductRead graph.
+    `view=compact` (or `fields=a,b,...`) returns scalar columns plus a barcode list
+    from a single query, encoded directly without ORM/Pydantic overhead.
+    """
+    if view == "compact" or fields:
+        try:
+            selected = parse_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        rows = await fetch_compact(db, fields=selected, skip=skip, limit=limit)
+        return JSONResponse(content=rows)
+
     # Need to load suppliers eagerly? lazy='selectin' in model handles it.
     result = await db.execute(select(Product).offset(skip).limit(limit))
     return result.scalars().all()
 
+class ProductSearchResult(BaseModel):
+    id: int
+    name: str
+    sku: str
+    price: float | None = 0.0
+    unit_of_measure: str | None = "unit"
+    product_type: str | None = "unitary"
+    measurement_value: float | None = None
+    measurement_unit: str | None = None
+    is_inventory_tracked: bool | None = True
+
+from modules.catalog.application.search_service import ProductSearchService
+
+@router.get("/search", response_model=list[ProductSearchResult])
+async def search_products(q: str, limit: int = 20, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    Typeahead search: exact SKU/barcode hits first, then name/SKU/barcode prefix matches ranked server-side.
+    """
+    service = ProductSearchService(db)
+    return await service.search(q, limit=max(1, min(limit, 50)))
+
+class ProductByBarcode(BaseModel):
+    id: int
+    name: str
+    sku: str
+    price: float
+    is_inventory_tracked: bool
+    barcode: str
+
+@router.get("/by-barcode/{code}", response_model=ProductByBarcode)
+async def get_product_by_barcode(code: str, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    Scanner lookup served from the in-process barcode index (one joined query on a miss).
+    """
+    ref = await barcode_index.resolve(db, code)
+    if not ref:
+        raise HTTPException(status_code=404, detail="Barcode not found")
+    return ProductByBarcode(
+        id=ref.id, name=ref.name, sku=ref.sku, price=ref.price,
+        is_inventory_tracked=ref.is_inventory_tracked, barcode=code
+    )
+
+from modules.catalog.application.sync_service import CatalogSyncService
+
+@router.get("/changes")
+async def get_catalog_changes(
+    since: str | None = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Delta sync for POS terminals. Omit `since` for a full paged download, then keep
+    passing the returned `next_cursor` while `has_more` is true; store the last
+    cursor and poll with it later. Products come in the compact read-model shape;
+    `deleted` lists ids to drop locally.
+    """
+    try:
+        page = await CatalogSyncService(db).changes(cursor=since, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse(content=page)
+
+from modules.catalog.application.snapshot_service import CatalogSnapshotService
+
+async def _rebuild_snapshot():
+    async with SessionLocal() as db:
+        await CatalogSnapshotService(db).build()
+
+async def _refresh_snapshot():
+    async with SessionLocal() as db:
+        await CatalogSnapshotService(db).refresh(wait=False)
+
+@router.get("/snapshot")
+async def get_catalog_snapshot(
+    background_tasks: BackgroundTasks,
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Whole catalog as one gzip-compressed columnar JSON document (cold start).
+    Honors If-None-Match; after loading, continue with /products/changes?since=<cursor>.
+    A stale snapshot is still served (its cursor covers the gap) and rebuilt in the background.
+    """
+    service = CatalogSnapshotService(db)
+    info = service.current()
+    if info is None:
+        # First request on this node: build synchronously
+        await service.refresh()
+        info = service.current()
+    elif service.is_stale(info):
+        background_tasks.add_task(_refresh_snapshot)
+
+    etag = f'"{info["etag"]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    headers["Content-Encoding"] = "gzip"
+    return FileResponse(info["path"], media_type="application/json", headers=headers)
+
+@router.post("/snapshot/rebuild", status_code=202, dependencies=[Depends(RoleChecker([UserRole.ADMIN, UserRole.SUPERVISOR]))])
+async def rebuild_catalog_snapshot(background_tasks: BackgroundTasks):
+    background_tasks.add_task(_rebuild_snapshot)
+    return {"message": "Catalog snapshot rebuild scheduled"}
+
+# --- Partial / batch updates ---
+
+from modules.catalog.application.product_writer import ProductWriteService, ProductNotFoundError, ProductInUseError
+
+class ProductUpdate(BaseModel):
+    name: str | None = None
+    sku: str | None = None
+    description: str | None = None
+    price: float | None = None
+    cost_price: float | None = None
+    cost_components: List[dict] | None = None # Complete set of {category_id: int, value: float}
+    track_expiry: bool | None = None
+    is_batch_tracked: bool | None = None
+    is_inventory_tracked: bool | None = None
+    min_stock_level: float | None = None
+    unit_of_measure: str | None = None
+    product_type: str | None = None
+    measurement_value: float | None = None
+    measurement_unit: str | None = None
+    supplier_ids: List[int] | None = None
+
+class ProductBatchUpdate(ProductUpdate):
+    id: int
+
+class ProductPatchResult(BaseModel):
+    id: int
+    changed: List[str]
+
+async def _apply_product_changes(db: AsyncSession, changes_by_id: dict) -> dict:
+    writer = ProductWriteService(db)
+    changed, missing = {}, []
+    try:
+        for product_id, changes in changes_by_id.items():
+            try:
+                changed[product_id] = await writer.apply_changes(product_id, changes)
+            except ProductNotFoundError:
+                missing.append(product_id)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Error updating product. Check for duplicate SKU.")
+    if missing:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail=f"Products not found: {missing}")
+    return changed
+
+async def _commit_product_changes(db: AsyncSession, changed: dict):
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Error updating product. Check for duplicate SKU.")
+    for product_id, fields in changed.items():
+        if fields:
+            barcode_index.invalidate_product(product_id)
+    cost_engine.invalidate([pid for pid, fields in changed.items() if fields])
+
+@router.patch("/batch", response_model=list[ProductPatchResult], dependencies=[Depends(RoleChecker([UserRole.ADMIN, UserRole.SUPERVISOR]))])
+async def patch_products(items: List[ProductBatchUpdate], db: AsyncSession = Depends(get_db)):
+    """Applies several partial updates in one transaction (all or nothing)."""
+    changes_by_id = {}
+    for item in items:
+        data = item.model_dump(exclude_unset=True)
+        changes_by_id.setdefault(data.pop("id"), {}).update(data)
+    changed = await _apply_product_changes(db, changes_by_id)
+    await _commit_product_changes(db, changed)
+    return [{"id": pid, "changed": fields} for pid, fields in changed.items()]
+
+# --- Price Lists ---
+
+from sqlalchemy import update, insert
+from modules.catalog.domain.models import PriceList, PriceListItem
+from modules.catalog.application.price_resolver import price_resolver
+
+class PriceListItemData(BaseModel):
+    product_id: int
+    price: float
+
+class PriceListCreate(BaseModel):
+    name: str
+    customer_id: int | None = None
+    warehouse_id: int | None = None
+    priority: int = 0
+    valid_from: datetime | None = None
+    valid_to: datetime | None = None
+    is_active: bool = True
+    items: List[PriceListItemData] = []
+
+class PriceListUpdate(BaseModel):
+    name: str | None = None
+    customer_id: int | None = None
+    warehouse_id: int | None = None
+    priority: int | None = None
+    valid_from: datetime | None = None
+    valid_to: datetime | None = None
+    is_active: bool | None = None
+
+class PriceListItemRead(PriceListItemData):
+    class Config:
+        from_attributes = True
+
+class PriceListRead(BaseModel):
+    id: int
+    name: str
+    customer_id: int | None = None
+    warehouse_id: int | None = None
+    priority: int | None = 0
+    valid_from: datetime | None = None
+    valid_to: datetime | None = None
+    is_active: bool | None = True
+    items: list[PriceListItemRead] = []
+    class Config:
+        from_attributes = True
+
+class PriceResolveRequest(BaseModel):
+    product_ids: List[int]
+    customer_id: int | None = None
+    warehouse_id: int | None = None
+    at: datetime | None = None
+
+class ResolvedPrice(BaseModel):
+    product_id: int
+    price: float
+    base_price: float
+    price_list_id: int | None = None
+
+def _check_window(valid_from, valid_to):
+    if valid_from and valid_to and valid_to <= valid_from:
+        raise HTTPException(status_code=400, detail="valid_to must be after valid_from")
+
+async def _check_products(db: AsyncSession, product_ids):
+    if not product_ids:
+        return
+    found = set((await db.execute(select(Product.id).where(Product.id.in_(product_ids)))).scalars().all())
+    missing = sorted(set(product_ids) - found)
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Unknown product ids: {missing}")
+
+# Fields that can still change once a list is in effect; anything else would rewrite
+# which price applied in the past
+LIVE_PRICE_LIST_FIELDS = {"name", "valid_to"}
+
+def _in_effect(price_list: PriceList, now: datetime) -> bool:
+    return bool(price_list.is_active) and (price_list.valid_from is None or price_list.valid_from <= now)
+
+async def _write_price_items(db: AsyncSession, price_list_id: int, items, since: datetime):
+    """
+    Versioned item prices: a changed price closes the current row at `since` and opens a
+    new one, so resolving a past date still finds the price that applied then.
+    Unchanged prices are left alone.
+    """
+    prices = {item.product_id: item.price for item in items}
+    if not prices:
+        return
+    current = dict((await db.execute(
+        select(PriceListItem.product_id, PriceListItem.price).where(
+            PriceListItem.price_list_id == price_list_id,
+            PriceListItem.product_id.in_(prices),
+            PriceListItem.valid_to == None,
+        )
+    )).all())
+    changed = {pid: price for pid, price in prices.items() if current.get(pid) != price}
+    if not changed:
+        return
+
+    replaced = [pid for pid in changed if pid in current]
+    if replaced:
+        await db.execute(
+            update(PriceListItem)
+            .where(
+                PriceListItem.price_list_id == price_list_id,
+                PriceListItem.product_id.in_(replaced),
+                PriceListItem.valid_to == None,
+            )
+            .values(valid_to=since)
+        )
+    await db.execute(insert(PriceListItem), [
+        {"price_list_id": price_list_id, "product_id": pid, "price": price, "valid_from": since}
+        for pid, price in changed.items()
+    ])
+
+async def _commit_price_items(db: AsyncSession):
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Another writer opened the same current row first (uq_price_list_items_current)
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Price list items were changed concurrently; retry")
+
+@router.get("/price-lists", response_model=list[PriceListRead])
+async def list_price_lists(
+    customer_id: int | None = None,
+    active_only: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    stmt = select(PriceList).order_by(PriceList.id)
+    if customer_id is not None:
+        stmt = stmt.where(PriceList.customer_id == customer_id)
+    if active_only:
+        stmt = stmt.where(PriceList.is_active == True)
+    return (await db.execute(stmt)).scalars().all()
+
+@router.post("/price-lists", response_model=PriceListRead, dependencies=[Depends(RoleChecker([UserRole.ADMIN, UserRole.SUPERVISOR]))])
+async def create_price_list(data: PriceListCreate, db: AsyncSession = Depends(get_db)):
+    _check_window(data.valid_from, data.valid_to)
+    await _check_products(db, [item.product_id for item in data.items])
+
+    price_list = PriceList(**data.model_dump(exclude={"items"}))
+    db.add(price_list)
+    await db.flush()
+    # Items start now even on a back-dated list: earlier dates keep their old prices
+    await _write_price_items(db, price_list.id, data.items, since=datetime.utcnow())
+    await db.commit()
+    price_resolver.invalidate()
+    return await db.get(PriceList, price_list.id, populate_existing=True)
+
+@router.get("/price-lists/{price_list_id}", response_model=PriceListRead)
+async def get_price_list(price_list_id: int, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    price_list = await db.get(PriceList, price_list_id)
+    if not price_list:
+        raise HTTPException(status_code=404, detail="Price list not found")
+    return price_list
+
+@router.patch("/price-lists/{price_list_id}", response_model=PriceListRead, dependencies=[Depends(RoleChecker([UserRole.ADMIN, UserRole.SUPERVISOR]))])
+async def update_price_list(price_list_id: int, data: PriceListUpdate, db: AsyncSession = Depends(get_db)):
+    """
+    Lists not yet in effect (inactive or scheduled) can change freely; one activated
+    without a future start starts now. Once in effect only `name` and `valid_to` can
+    change, and only to end the list now or later: scope, priority, start and activation
+    are fixed so past prices stay as they were (create a new list instead).
+    """
+    price_list = await db.get(PriceList, price_list_id)
+    if not price_list:
+        raise HTTPException(status_code=404, detail="Price list not found")
+    changes = data.model_dump(exclude_unset=True)
+    now = datetime.utcnow()
+    was_in_effect = _in_effect(price_list, now)
+    if was_in_effect:
+        fixed = sorted(key for key, value in changes.items()
+                       if key not in LIVE_PRICE_LIST_FIELDS and value != getattr(price_list, key))
+        if fixed:
+            raise HTTPException(status_code=409, detail=f"Price list is already in effect; cannot change: {', '.join(fixed)}")
+        if "valid_to" in changes and changes["valid_to"] != price_list.valid_to:
+            ended = price_list.valid_to is not None and price_list.valid_to <= now
+            if ended or (changes["valid_to"] is not None and changes["valid_to"] < now):
+                raise HTTPException(status_code=409, detail="valid_to of a list in effect can only move to now or later")
+    for key, value in changes.items():
+        setattr(price_list, key, value)
+    if not was_in_effect and _in_effect(price_list, now):
+        # It never applied before: it must not apply retroactively either
+        price_list.valid_from = now
+    _check_window(price_list.valid_from, price_list.valid_to)
+    await db.commit()
+    price_resolver.invalidate()
+    return await db.get(PriceList, price_list_id, populate_existing=True)
+
+@router.put("/price-lists/{price_list_id}/items", response_model=PriceListRead, dependencies=[Depends(RoleChecker([UserRole.ADMIN, UserRole.SUPERVISOR]))])
+async def upsert_price_list_items(price_list_id: int, items: List[PriceListItemData], db: AsyncSession = Depends(get_db)):
+    """
+    Adds or re-prices items in bulk from now on; products not listed keep their current
+    entry. Earlier prices stay on record for past dates.
+    """
+    if not await db.get(PriceList, price_list_id):
+        raise HTTPException(status_code=404, detail="Price list not found")
+    await _check_products(db, [item.product_id for item in items])
+    await _write_price_items(db, price_list_id, items, since=datetime.utcnow())
+    await _commit_price_items(db)
+    price_resolver.invalidate()
+    return await db.get(PriceList, price_list_id, populate_existing=True)
+
+@router.delete("/price-lists/{price_list_id}/items/{product_id}", dependencies=[Depends(RoleChecker([UserRole.ADMIN, UserRole.SUPERVISOR]))])
+async def delete_price_list_item(price_list_id: int, product_id: int, db: AsyncSession = Depends(get_db)):
+    """Ends the product's price in the list from now on; past dates keep resolving to it."""
+    result = await db.execute(
+        update(PriceListItem)
+        .where(
+            PriceListItem.price_list_id == price_list_id,
+            PriceListItem.product_id == product_id,
+            PriceListItem.valid_to == None,
+        )
+        .values(valid_to=datetime.utcnow())
+    )
+    if not result.rowcount:
+        raise HTTPException(status_code=404, detail="Price list item not found")
+    await db.commit()
+    price_resolver.invalidate()
+    return {"message": "Price list item deleted successfully"}
+
+@router.delete("/price-lists/{price_list_id}", dependencies=[Depends(RoleChecker([UserRole.ADMIN]))])
+async def delete_price_list(price_list_id: int, db: AsyncSession = Depends(get_db)):
+    price_list = await db.get(PriceList, price_list_id)
+    if not price_list:
+        raise HTTPException(status_code=404, detail="Price list not found")
+    await db.delete(price_list)
+    await db.commit()
+    price_resolver.invalidate()
+    return {"message": "Price list deleted successfully"}
+
+@router.post("/prices/resolve", response_model=list[ResolvedPrice])
+async def resolve_prices(data: PriceResolveRequest, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Effective prices for a whole cart: most specific price list, then priority, then newest window; else Product.price."""
+    prices = await price_resolver.resolve_many(db, data.product_ids, data.customer_id, data.warehouse_id, data.at)
+    return [{"product_id": pid, **price} for pid, price in prices.items()]
+
 @router.get("/{product_id}", response_model=ProductRead)
 async def get_product(product_id: int, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
     product = await db.get(Product, product_id)
@@ -115,39 +599,32 @@ async def get_product(product_id: int, db: AsyncSession = Depends(get_db), curre
 
 @router.put("/{product_id}", response_model=ProductRead, dependencies=[Depends(RoleChecker([UserRole.ADMIN, UserRole.SUPERVISOR]))])
 async def update_product(product_id: int, product_data: ProductCreate, db: AsyncSession = Depends(get_db)):
-    db_product = await db.get(Product, product_id)
-    if not db_product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    
     data = product_data.model_dump()
-    supplier_ids = data.pop("supplier_ids", None) # Optional update
+    if "cost_components" not in product_data.model_fields_set:
+        data.pop("cost_components")  # Not sent: keep the current components
+    changed = await _apply_product_changes(db, {product_id: data})
+    await _commit_product_changes(db, changed)
+    return await db.get(Product, product_id, populate_existing=True)
 
-    for key, value in data.items():
-        setattr(db_product, key, value)
-    
-    if supplier_ids is not None:
-        stmt = select(Supplier).where(Supplier.id.in_(supplier_ids))
-        result = await db.execute(stmt)
-        suppliers = result.scalars().all()
-        db_product.suppliers = list(suppliers)
-    
-    try:
-        await db.commit()
-        await db.refresh(db_product)
-    except Exception as e:
-        await db.rollback()
-        raise HTTPException(status_code=400, detail="Error updating product. Check for duplicate SKU.")
-    
-    return db_product
+@router.patch("/{product_id}", response_model=ProductPatchResult, dependencies=[Depends(RoleChecker([UserRole.ADMIN, UserRole.SUPERVISOR]))])
+async def patch_product(product_id: int, product_data: ProductUpdate, db: AsyncSession = Depends(get_db)):
+    """Partial update: only the fields sent are compared, and only the ones that differ are written."""
+    changed = await _apply_product_changes(db, {product_id: product_data.model_dump(exclude_unset=True)})
+    await _commit_product_changes(db, changed)
+    return {"id": product_id, "changed": changed[product_id]}
 
 @router.delete("/{product_id}", dependencies=[Depends(RoleChecker([UserRole.ADMIN]))])
 async def delete_product(product_id: int, db: AsyncSession = Depends(get_db)):
-    db_product = await db.get(Product, product_id)
-    if not db_product:
+    try:
+        await ProductWriteService(db).delete(product_id)
+    except ProductNotFoundError:
         raise HTTPException(status_code=404, detail="Product not found")
-    
-    await db.delete(db_product)
+    except ProductInUseError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     await db.commit()
+    barcode_index.invalidate_product(product_id)
+    cost_engine.invalidate([product_id])
+    price_resolver.invalidate()
     return {"message": "Product deleted successfully"}
 
 class BarcodeCreate(BaseModel):
@@ -155,16 +632,31 @@ class BarcodeCreate(BaseModel):
 
 @router.post("/{product_id}/barcodes", response_model=BarcodeCreate)
 async def add_barcode(product_id: int, data: BarcodeCreate, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    product = await db.get(Product, product_id)
+    product = (await db.execute(
+        select(Product.id, Product.name, Product.sku, Product.price, Product.is_inventory_tracked)
+        .where(Product.id == product_id)
+    )).first()
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    # Check if barcode exists
-    existing = await db.execute(select(ProductBarcode).where(ProductBarcode.barcode == data.barcode))
-    if existing.scalar_one_or_none():
+    # Known barcode: reject without touching the database
+    if barcode_index.get(data.barcode):
         raise HTTPException(status_code=400, detail="Barcode already assigned")
 
+    # Otherwise the unique index on product_barcodes.barcode is the duplicate check
     new_barcode = ProductBarcode(product_id=product_id, barcode=data.barcode)
     db.add(new_barcode)
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Barcode already assigned")
+
+    barcode_index.put(data.barcode, ProductRef(
+        id=product.id,
+        name=product.name,
+        sku=product.sku,
+        price=product.price or 0.0,
+        is_inventory_tracked=product.is_inventory_tracked if product.is_inventory_tracked is not None else True,
+    ))
     return data
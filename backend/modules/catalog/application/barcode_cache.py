@@ -0,0 +1,122 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from core.config import get_settings
+from modules.catalog.domain.models import Product, ProductBarcode
+
+@dataclass(frozen=True, slots=True)
+class ProductRef:
+    # Compact product record for scan paths (POS, picking)
+    id: int
+    name: str
+    sku: str
+    price: float
+    is_inventory_tracked: bool
+
+_REF_COLUMNS = (
+    ProductBarcode.barcode,
+    Product.id,
+    Product.name,
+    Product.sku,
+    Product.price,
+    Product.is_inventory_tracked,
+)
+
+def _ref_from_row(row) -> ProductRef:
+    return ProductRef(
+        id=row.id,
+        name=row.name,
+        sku=row.sku,
+        price=row.price or 0.0,
+        is_inventory_tracked=row.is_inventory_tracked if row.is_inventory_tracked is not None else True,
+    )
+
+class BarcodeIndex:
+    """
+    Process-local LRU map barcode -> ProductRef.
+    Only positive hits are cached, so a miss always falls through to the database;
+    writers in this process call invalidate_* after changing barcodes or products.
+    """
+    def __init__(self, maxsize: int = 50000):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, ProductRef] = OrderedDict()
+        self._by_product: dict[int, set] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, barcode: str) -> ProductRef | None:
+        ref = self._entries.get(barcode)
+        if ref is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(barcode)
+        self.hits += 1
+        return ref
+
+    def put(self, barcode: str, ref: ProductRef):
+        previous = self._entries.pop(barcode, None)
+        if previous is not None:
+            self._forget(barcode, previous.id)
+        self._entries[barcode] = ref
+        self._by_product.setdefault(ref.id, set()).add(barcode)
+        while len(self._entries) > self.maxsize:
+            evicted, evicted_ref = self._entries.popitem(last=False)
+            self._forget(evicted, evicted_ref.id)
+
+    def _forget(self, barcode: str, product_id: int):
+        codes = self._by_product.get(product_id)
+        if codes is not None:
+            codes.discard(barcode)
+            if not codes:
+                del self._by_product[product_id]
+
+    def invalidate_barcode(self, barcode: str):
+        ref = self._entries.pop(barcode, None)
+        if ref is not None:
+            self._forget(barcode, ref.id)
+
+    def invalidate_product(self, product_id: int):
+        for barcode in self._by_product.pop(product_id, set()):
+            self._entries.pop(barcode, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._by_product.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+    async def resolve(self, db: AsyncSession, barcode: str) -> ProductRef | None:
+        """Cache hit costs a dict lookup; a miss is one joined query (instead of barcode + product loads)."""
+        ref = self.get(barcode)
+        if ref is not None:
+            return ref
+        stmt = (
+            select(*_REF_COLUMNS)
+            .join(Product, Product.id == ProductBarcode.product_id)
+            .where(ProductBarcode.barcode == barcode)
+        )
+        row = (await db.execute(stmt)).first()
+        if row is None:
+            return None
+        ref = _ref_from_row(row)
+        self.put(barcode, ref)
+        return ref
+
+    async def warm(self, db: AsyncSession) -> int:
+        """Preloads up to `maxsize` barcodes in a single query (called at startup)."""
+        stmt = (
+            select(*_REF_COLUMNS)
+            .join(Product, Product.id == ProductBarcode.product_id)
+            .order_by(ProductBarcode.id.desc())
+            .limit(self.maxsize)
+        )
+        for row in (await db.execute(stmt)).all():
+            self.put(row.barcode, _ref_from_row(row))
+        return len(self._entries)
+
+barcode_index = BarcodeIndex(maxsize=get_settings().BARCODE_CACHE_SIZE)
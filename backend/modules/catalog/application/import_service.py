@@ -0,0 +1,301 @@
+import csv
+import io
+from datetime import datetime
+from typing import Iterator
+from pydantic import BaseModel, ValidationError, field_validator
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func
+from sqlalchemy.exc import SQLAlchemyError
+from core.database import dialect_insert
+from modules.catalog.domain.models import Product, ProductBarcode, product_supplier_association
+
+# Rows validated and written per transaction
+IMPORT_CHUNK = 1000
+# Multi-valued cells (barcodes, supplier_ids) use this separator
+LIST_SEPARATOR = "|"
+# Header prefix for cost component columns: "cost:<category_id>"
+COST_PREFIX = "cost:"
+
+# Product columns an import file may set
+IMPORT_COLUMNS = (
+    "name", "description", "price", "cost_price", "track_expiry", "is_batch_tracked",
+    "is_inventory_tracked", "min_stock_level", "unit_of_measure", "product_type",
+    "measurement_value", "measurement_unit",
+)
+
+class ImportRow(BaseModel):
+    sku: str
+    name: str | None = None
+    description: str | None = None
+    price: float | None = None
+    cost_price: float | None = None
+    track_expiry: bool | None = None
+    is_batch_tracked: bool | None = None
+    is_inventory_tracked: bool | None = None
+    min_stock_level: float | None = None
+    unit_of_measure: str | None = None
+    product_type: str | None = None
+    measurement_value: float | None = None
+    measurement_unit: str | None = None
+    barcodes: list[str] = []
+    supplier_ids: list[int] = []
+    costs: dict[int, float] = {}
+
+    @field_validator("sku")
+    @classmethod
+    def sku_not_blank(cls, v: str) -> str:
+        v = v.strip()
+        if not v:
+            raise ValueError("sku is required")
+        return v
+
+    @field_validator("barcodes", "supplier_ids", mode="before")
+    @classmethod
+    def split_list(cls, v):
+        if isinstance(v, str):
+            return [item.strip() for item in v.split(LIST_SEPARATOR) if item.strip()]
+        return v or []
+
+def _cell(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+def parse_record(record: dict) -> ImportRow:
+    """Builds an ImportRow from a raw header -> cell mapping. Blank cells mean "leave unchanged"."""
+    data, costs = {}, {}
+    for key, value in record.items():
+        if key is None:
+            continue
+        key = key.strip()
+        value = _cell(value)
+        if value is None:
+            continue
+        if key.startswith(COST_PREFIX):
+            costs[key[len(COST_PREFIX):]] = value
+        else:
+            data[key] = value
+    if costs:
+        data["costs"] = costs
+    return ImportRow.model_validate(data)
+
+def iter_csv(stream) -> Iterator[dict]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    yield from csv.DictReader(text)
+
+def iter_xlsx(stream) -> Iterator[dict]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("XLSX import requires the optional 'openpyxl' package (the 'xlsx' extra); upload a CSV instead")
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    rows = workbook.active.iter_rows(values_only=True)
+    header = [str(h).strip() if h is not None else None for h in next(rows, [])]
+    for values in rows:
+        if values is None or all(v is None for v in values):
+            continue
+        yield {h: (str(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else v)
+               for h, v in zip(header, values) if h}
+
+def _format_error(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in e.errors())
+
+def _database_error(e: SQLAlchemyError) -> str:
+    # The driver's message (constraint, value) without the SQL statement and parameters
+    cause = getattr(e, "orig", None) or e
+    return f"{cause.__class__.__name__}: {cause}"
+
+class ProductImportService:
+    """
+    Bulk product upsert keyed by SKU. Rows are validated and written IMPORT_CHUNK at
+    a time with batched (executemany) INSERT ... ON CONFLICT statements, one
+    transaction per chunk.
+    Barcodes and supplier links are added (existing ones kept); a cost:<category_id>
+    cell replaces that component.
+    A chunk the database rejects is written again one row per transaction, so only the
+    offending rows fail.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.errors = []
+        # Rows written with something left out (e.g. a barcode owned by another product)
+        self.warnings = []
+        # Rows replaced by a later row with the same SKU in the same chunk (not errors)
+        self.superseded = []
+        # Row number -> created / updated / superseded / failed
+        self.statuses = {}
+        self.skus = {}
+        self.created = 0
+        self.updated = 0
+
+    def _status(self, row_number: int, sku: str | None, status: str):
+        self.statuses[row_number] = status
+        self.skus[row_number] = sku
+
+    def _error(self, row_number: int, sku: str | None, message: str):
+        self.errors.append({"row": row_number, "sku": sku, "error": message})
+        self._status(row_number, sku, "failed")
+
+    async def run(self, records: Iterator[dict]) -> dict:
+        chunk, total = [], 0
+        # Header is line 1; data rows are numbered as they appear in the file
+        for row_number, record in enumerate(records, start=2):
+            total += 1
+            try:
+                chunk.append((row_number, parse_record(record)))
+            except ValidationError as e:
+                self._error(row_number, _cell(record.get("sku")), _format_error(e))
+            if len(chunk) >= IMPORT_CHUNK:
+                await self._write_chunk(chunk)
+                chunk = []
+        if chunk:
+            await self._write_chunk(chunk)
+
+        return {
+            "rows": total,
+            "created": self.created,
+            "updated": self.updated,
+            "superseded": len(self.superseded),
+            "failed": len(self.errors),
+            "errors": sorted(self.errors, key=lambda e: e["row"]),
+            "warnings": sorted(self.warnings, key=lambda e: e["row"]),
+            "superseded_rows": sorted(self.superseded, key=lambda e: e["row"]),
+            "results": [
+                {"row": row_number, "sku": self.skus[row_number], "status": self.statuses[row_number]}
+                for row_number in sorted(self.statuses)
+            ],
+        }
+
+    async def _lookup(self, key_column, value_column, keys) -> dict:
+        if not keys:
+            return {}
+        rows = (await self.db.execute(select(key_column, value_column).where(key_column.in_(keys)))).all()
+        return {key: value for key, value in rows}
+
+    async def _write_chunk(self, chunk: list):
+        from modules.suppliers.domain.models import Supplier
+        from modules.finance.domain.models import CostCategory
+
+        # Last occurrence of a SKU wins (one statement cannot touch the same row twice)
+        by_sku = {}
+        for row_number, row in chunk:
+            if row.sku in by_sku:
+                self.superseded.append({"row": by_sku[row.sku][0], "sku": row.sku, "superseded_by": row_number})
+                self._status(by_sku[row.sku][0], row.sku, "superseded")
+            by_sku[row.sku] = (row_number, row)
+
+        supplier_ids = {sid for _, row in by_sku.values() for sid in row.supplier_ids}
+        category_ids = {cid for _, row in by_sku.values() for cid in row.costs}
+        known_suppliers = set(await self._lookup(Supplier.id, Supplier.id, supplier_ids))
+        known_categories = set(await self._lookup(CostCategory.id, CostCategory.id, category_ids))
+        existing_names = await self._lookup(Product.sku, Product.name, list(by_sku))
+
+        accepted = []
+        for row_number, row in by_sku.values():
+            missing_suppliers = set(row.supplier_ids) - known_suppliers
+            missing_categories = set(row.costs) - known_categories
+            if missing_suppliers:
+                self._error(row_number, row.sku, f"Unknown supplier ids: {sorted(missing_suppliers)}")
+            elif missing_categories:
+                self._error(row_number, row.sku, f"Unknown cost categories: {sorted(missing_categories)}")
+            elif row.sku not in existing_names and not row.name:
+                self._error(row_number, row.sku, "name is required for new products")
+            else:
+                accepted.append((row_number, row))
+        if accepted:
+            await self._write(accepted, existing_names)
+
+    async def _write(self, accepted: list, existing_names: dict):
+        try:
+            warnings = await self._upsert(accepted, existing_names)
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            if len(accepted) == 1:
+                row_number, row = accepted[0]
+                self._error(row_number, row.sku, f"Rejected by database: {_database_error(e)}")
+                return
+            # Isolate the offending rows instead of failing the whole chunk
+            for item in accepted:
+                await self._write([item], existing_names)
+            return
+
+        self.warnings.extend(warnings)
+        for row_number, row in accepted:
+            if row.sku in existing_names:
+                self.updated += 1
+                self._status(row_number, row.sku, "updated")
+            else:
+                self.created += 1
+                self._status(row_number, row.sku, "created")
+
+    async def _upsert(self, accepted: list, existing_names: dict) -> list:
+        """Writes the rows (uncommitted); returns the warnings to report once committed."""
+        from modules.finance.domain.models import ProductCostComponent
+
+        now = datetime.utcnow()
+        values = []
+        for _, row in accepted:
+            item = {"sku": row.sku, "updated_at": now}
+            for column in IMPORT_COLUMNS:
+                value = getattr(row, column)
+                if value is None and row.sku not in existing_names:
+                    default = Product.__table__.c[column].default
+                    value = default.arg if default is not None else None
+                item[column] = value
+            if item["name"] is None:
+                # NOT NULL is checked before the conflict is resolved
+                item["name"] = existing_names[row.sku]
+            values.append(item)
+
+        stmt = dialect_insert(self.db, Product)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Product.sku],
+            set_={
+                **{c: func.coalesce(stmt.excluded[c], Product.__table__.c[c]) for c in IMPORT_COLUMNS},
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        await self.db.execute(stmt, values)
+
+        ids = await self._lookup(Product.sku, Product.id, [row.sku for _, row in accepted])
+
+        warnings = []
+        barcodes = [
+            {"product_id": ids[row.sku], "barcode": code, "updated_at": now}
+            for _, row in accepted for code in row.barcodes
+        ]
+        if barcodes:
+            await self.db.execute(
+                dialect_insert(self.db, ProductBarcode).on_conflict_do_nothing(index_elements=[ProductBarcode.barcode]),
+                barcodes
+            )
+            owners = await self._lookup(ProductBarcode.barcode, ProductBarcode.product_id, [b["barcode"] for b in barcodes])
+            for row_number, row in accepted:
+                taken = [code for code in row.barcodes if owners.get(code) != ids[row.sku]]
+                if taken:
+                    warnings.append({"row": row_number, "sku": row.sku,
+                                     "warning": f"Barcodes already assigned to another product (skipped): {taken}"})
+
+        links = {(ids[row.sku], sid) for _, row in accepted for sid in row.supplier_ids}
+        if links:
+            await self.db.execute(
+                dialect_insert(self.db, product_supplier_association).on_conflict_do_nothing(),
+                [{"product_id": pid, "supplier_id": sid} for pid, sid in links]
+            )
+
+        costs = [(ids[row.sku], cid, value) for _, row in accepted for cid, value in row.costs.items()]
+        if costs:
+            for category_id in {cid for _, cid, _ in costs}:
+                await self.db.execute(delete(ProductCostComponent).where(
+                    ProductCostComponent.cost_category_id == category_id,
+                    ProductCostComponent.product_id.in_([pid for pid, cid, _ in costs if cid == category_id]),
+                ))
+            await self.db.execute(ProductCostComponent.__table__.insert(), [
+                {"product_id": pid, "cost_category_id": cid, "value": value, "updated_at": now}
+                for pid, cid, value in costs
+            ])
+        return warnings
@@ -0,0 +1,125 @@
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from core.config import get_settings
+from modules.catalog.domain.models import Product, PriceList, PriceListItem
+
+@dataclass(frozen=True, slots=True)
+class PriceEntry:
+    price_list_id: int
+    customer_id: int | None
+    warehouse_id: int | None
+    priority: int
+    valid_from: datetime | None
+    valid_to: datetime | None
+    price: float
+    # Item version window (the price was revised at `since` / replaced at `until`)
+    since: datetime | None = None
+    until: datetime | None = None
+
+    @property
+    def specificity(self) -> int:
+        return (2 if self.customer_id is not None else 0) + (1 if self.warehouse_id is not None else 0)
+
+    def applies(self, customer_id, warehouse_id, at: datetime) -> bool:
+        if self.customer_id is not None and self.customer_id != customer_id:
+            return False
+        if self.warehouse_id is not None and self.warehouse_id != warehouse_id:
+            return False
+        if self.valid_from is not None and at < self.valid_from:
+            return False
+        if self.valid_to is not None and at >= self.valid_to:
+            return False
+        if self.since is not None and at < self.since:
+            return False
+        if self.until is not None and at >= self.until:
+            return False
+        return True
+
+def precedence(entry: PriceEntry):
+    """Sort key (descending): most specific scope, then priority, then the most recent window."""
+    return (entry.specificity, entry.priority, entry.valid_from or datetime.min, entry.price_list_id)
+
+def build_index(entries) -> dict:
+    """product_id -> entries in precedence order."""
+    index = {}
+    for product_id, entry in entries:
+        index.setdefault(product_id, []).append(entry)
+    for bucket in index.values():
+        bucket.sort(key=precedence, reverse=True)
+    return index
+
+def pick(bucket: list, customer_id, warehouse_id, at: datetime) -> PriceEntry | None:
+    for entry in bucket:
+        if entry.applies(customer_id, warehouse_id, at):
+            return entry
+    return None
+
+class PriceResolver:
+    """
+    Answers "price for (product, customer, warehouse, time)" from an in-memory index
+    of active price list items; Product.price is the fallback. Validity windows are
+    evaluated at lookup time, so scheduled lists take effect without a reload and
+    past dates resolve against the lists (and item price versions) that were valid then.
+    Price list writers call `invalidate()`; the index also expires after
+    PRICE_INDEX_TTL_SECONDS so changes made by other workers show up.
+    """
+    def __init__(self, ttl_seconds: int = 60):
+        self.ttl_seconds = ttl_seconds
+        self._index = {}
+        self._loaded_at = None
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    async def _load(self, db: AsyncSession) -> dict:
+        stmt = (
+            select(
+                PriceListItem.product_id, PriceListItem.price,
+                PriceList.id, PriceList.customer_id, PriceList.warehouse_id,
+                PriceList.priority, PriceList.valid_from, PriceList.valid_to,
+                PriceListItem.valid_from, PriceListItem.valid_to,
+            )
+            .join(PriceList, PriceList.id == PriceListItem.price_list_id)
+            .where(PriceList.is_active == True)
+        )
+        rows = (await db.execute(stmt)).all()
+        return build_index(
+            (r[0], PriceEntry(r[2], r[3], r[4], r[5] or 0, r[6], r[7], r[1], r[8], r[9])) for r in rows
+        )
+
+    async def _get_index(self, db: AsyncSession) -> dict:
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl_seconds:
+            self._index = await self._load(db)
+            self._loaded_at = time.monotonic()
+        return self._index
+
+    async def resolve_many(self, db: AsyncSession, product_ids, customer_id: int | None = None,
+                           warehouse_id: int | None = None, at: datetime | None = None) -> dict:
+        """
+        Prices a whole cart with one base-price query.
+        Returns product_id -> {price, base_price, price_list_id}; unknown products are omitted.
+        """
+        at = at or datetime.utcnow()
+        ids = list(dict.fromkeys(product_ids))
+        if not ids:
+            return {}
+        index = await self._get_index(db)
+        base_prices = dict((await db.execute(select(Product.id, Product.price).where(Product.id.in_(ids)))).all())
+
+        result = {}
+        for product_id in ids:
+            if product_id not in base_prices:
+                continue
+            base = base_prices[product_id] or 0.0
+            entry = pick(index.get(product_id, ()), customer_id, warehouse_id, at)
+            result[product_id] = {
+                "price": entry.price if entry else base,
+                "base_price": base,
+                "price_list_id": entry.price_list_id if entry else None,
+            }
+        return result
+
+price_resolver = PriceResolver(ttl_seconds=get_settings().PRICE_INDEX_TTL_SECONDS)
@@ -0,0 +1,147 @@
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, delete, insert, exists
+from modules.catalog.domain.models import Product, ProductBarcode, PriceListItem, product_supplier_association
+from modules.catalog.application.sync_service import CatalogSyncService
+
+# Plain columns PATCH/PUT may write directly
+SCALAR_FIELDS = (
+    "name", "sku", "description", "price", "cost_price", "track_expiry", "is_batch_tracked",
+    "is_inventory_tracked", "min_stock_level", "unit_of_measure", "product_type",
+    "measurement_value", "measurement_unit",
+)
+
+class ProductNotFoundError(LookupError):
+    pass
+
+class ProductInUseError(Exception):
+    def __init__(self, references: list):
+        self.references = references
+        super().__init__(f"Product is referenced by: {', '.join(references)}")
+
+def _history_tables():
+    """Rows that must keep pointing at the product; any of them blocks a delete."""
+    from modules.sales.domain.models import SaleItem
+    from modules.inventory.domain.models import StockMovement, Batch
+    from modules.picking.domain.models import PickScanEvent
+    return {
+        "sale_items": SaleItem.product_id,
+        "stock_movements": StockMovement.product_id,
+        "batches": Batch.product_id,
+        "pick_scan_events": PickScanEvent.product_id,
+    }
+
+class ProductWriteService:
+    """
+    Change-detecting product writes: only columns whose value differs are updated, and
+    supplier links / cost components are diffed row by row. No relationship graph is
+    loaded or refreshed.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def apply_changes(self, product_id: int, changes: dict) -> list:
+        """Writes `changes` (PATCH semantics: only keys present). Returns the names of fields that changed."""
+        columns = [getattr(Product, f) for f in SCALAR_FIELDS]
+        current = (await self.db.execute(select(*columns).where(Product.id == product_id))).mappings().first()
+        if current is None:
+            raise ProductNotFoundError(product_id)
+
+        dirty = {f: changes[f] for f in SCALAR_FIELDS if f in changes and changes[f] != current[f]}
+        changed = list(dirty)
+
+        if changes.get("supplier_ids") is not None and await self._sync_suppliers(product_id, changes["supplier_ids"]):
+            changed.append("supplier_ids")
+        if changes.get("cost_components") is not None and await self._sync_cost_components(product_id, changes["cost_components"]):
+            changed.append("cost_components")
+
+        if changed:
+            # Association changes do not touch the products row; stamp it for delta sync
+            await self.db.execute(
+                update(Product).where(Product.id == product_id).values(**dirty, updated_at=datetime.utcnow())
+            )
+        return changed
+
+    async def _sync_suppliers(self, product_id: int, supplier_ids) -> bool:
+        from modules.suppliers.domain.models import Supplier
+
+        wanted = set(supplier_ids)
+        assoc = product_supplier_association.c
+        current = set((await self.db.execute(
+            select(assoc.supplier_id).where(assoc.product_id == product_id)
+        )).scalars().all())
+        to_add, to_remove = wanted - current, current - wanted
+
+        if to_add:
+            # Unknown supplier ids are ignored, as on create
+            to_add = set((await self.db.execute(select(Supplier.id).where(Supplier.id.in_(to_add)))).scalars().all())
+        if to_remove:
+            await self.db.execute(
+                delete(product_supplier_association)
+                .where(assoc.product_id == product_id, assoc.supplier_id.in_(to_remove))
+            )
+        if to_add:
+            await self.db.execute(
+                insert(product_supplier_association),
+                [{"product_id": product_id, "supplier_id": sid} for sid in to_add]
+            )
+        return bool(to_add or to_remove)
+
+    async def _sync_cost_components(self, product_id: int, components) -> bool:
+        """`components`: [{category_id, value}] — the complete desired set."""
+        from modules.finance.domain.models import ProductCostComponent
+
+        wanted = {int(c["category_id"]): float(c["value"]) for c in components}
+        rows = (await self.db.execute(
+            select(ProductCostComponent.id, ProductCostComponent.cost_category_id, ProductCostComponent.value)
+            .where(ProductCostComponent.product_id == product_id)
+        )).all()
+
+        seen, to_delete, to_update = set(), [], []
+        for row_id, category_id, value in rows:
+            if category_id not in wanted or category_id in seen:
+                to_delete.append(row_id)  # Removed, or a duplicate row for the category
+            elif wanted[category_id] != value:
+                to_update.append({"id": row_id, "value": wanted[category_id]})
+            seen.add(category_id)
+        to_insert = [
+            {"product_id": product_id, "cost_category_id": cid, "value": value}
+            for cid, value in wanted.items() if cid not in seen
+        ]
+
+        if to_delete:
+            await self.db.execute(delete(ProductCostComponent).where(ProductCostComponent.id.in_(to_delete)))
+        if to_update:
+            await self.db.execute(update(ProductCostComponent), to_update)
+        if to_insert:
+            await self.db.execute(insert(ProductCostComponent), to_insert)
+        return bool(to_delete or to_update or to_insert)
+
+    async def delete(self, product_id: int):
+        """Targeted delete: refuses when history references the product, then removes owned rows."""
+        from modules.finance.domain.models import ProductCostComponent
+        from modules.inventory.domain.models import ProductLocation
+
+        found = (await self.db.execute(select(Product.id).where(Product.id == product_id))).scalar()
+        if found is None:
+            raise ProductNotFoundError(product_id)
+
+        checks = [
+            exists().where(column == product_id).label(table)
+            for table, column in _history_tables().items()
+        ]
+        flags = (await self.db.execute(select(*checks))).mappings().one()
+        references = [table for table, used in flags.items() if used]
+        if references:
+            raise ProductInUseError(references)
+
+        for stmt in (
+            delete(ProductBarcode).where(ProductBarcode.product_id == product_id),
+            delete(product_supplier_association).where(product_supplier_association.c.product_id == product_id),
+            delete(ProductCostComponent).where(ProductCostComponent.product_id == product_id),
+            delete(PriceListItem).where(PriceListItem.product_id == product_id),
+            delete(ProductLocation).where(ProductLocation.product_id == product_id),
+            delete(Product).where(Product.id == product_id),
+        ):
+            await self.db.execute(stmt)
+        CatalogSyncService(self.db).record_deletion(product_id)
@@ -0,0 +1,82 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from modules.catalog.domain.models import Product, ProductBarcode
+
+# Scalar columns exposed by the compact catalog view (no relationship loading)
+COMPACT_COLUMNS = {
+    "id": Product.id,
+    "name": Product.name,
+    "sku": Product.sku,
+    "description": Product.description,
+    "price": Product.price,
+    "cost_price": Product.cost_price,
+    "track_expiry": Product.track_expiry,
+    "is_batch_tracked": Product.is_batch_tracked,
+    "is_inventory_tracked": Product.is_inventory_tracked,
+    "min_stock_level": Product.min_stock_level,
+    "unit_of_measure": Product.unit_of_measure,
+    "product_type": Product.product_type,
+    "measurement_value": Product.measurement_value,
+    "measurement_unit": Product.measurement_unit,
+}
+COMPACT_FIELDS = tuple(COMPACT_COLUMNS) + ("barcodes",)
+
+# SQLite group_concat separator (ASCII unit separator never appears in barcodes)
+_SEPARATOR = "\x1f"
+
+def parse_fields(fields: str | None) -> list:
+    """Validates a `fields=` query value; raises ValueError on unknown names."""
+    if not fields:
+        return list(COMPACT_FIELDS)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in COMPACT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    if "id" not in requested:
+        requested.insert(0, "id")
+    return requested
+
+def _barcodes_column(db: AsyncSession):
+    if db.bind.dialect.name == "postgresql":
+        return func.array_remove(func.array_agg(ProductBarcode.barcode), None)
+    return func.group_concat(ProductBarcode.barcode, _SEPARATOR)
+
+async def fetch_compact(db: AsyncSession, fields: list | None = None, where=None,
+                        skip: int = 0, limit: int | None = None) -> list:
+    """
+    One query returning plain dicts: scalar product columns plus an aggregated barcode list.
+    No ORM hydration, no selectin loads, no per-row Pydantic validation.
+    """
+    fields = fields or list(COMPACT_FIELDS)
+    with_barcodes = "barcodes" in fields
+    columns = [COMPACT_COLUMNS[f].label(f) for f in fields if f != "barcodes"]
+
+    stmt = select(*columns)
+    if with_barcodes:
+        stmt = (
+            stmt.add_columns(_barcodes_column(db).label("barcodes"))
+            .outerjoin(ProductBarcode, ProductBarcode.product_id == Product.id)
+            .group_by(Product.id)
+        )
+    if where is not None:
+        stmt = stmt.where(where)
+    stmt = stmt.order_by(Product.id).offset(skip)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+
+    rows = (await db.execute(stmt)).mappings().all()
+    if not with_barcodes:
+        return [dict(row) for row in rows]
+
+    result = []
+    for row in rows:
+        item = dict(row)
+        codes = item["barcodes"]
+        if codes is None:
+            item["barcodes"] = []
+        elif isinstance(codes, str):
+            item["barcodes"] = codes.split(_SEPARATOR)
+        else:
+            item["barcodes"] = list(codes)
+        result.append(item)
+    return result
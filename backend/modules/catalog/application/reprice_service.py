@@ -0,0 +1,112 @@
+from datetime import datetime
+from typing import Literal
+from pydantic import BaseModel, model_validator
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, case, cast, or_, and_, Numeric, Float
+from modules.catalog.domain.models import Product, product_supplier_association
+
+class RepriceRule(BaseModel):
+    # Selectors (combined with AND); a rule without selectors matches every product
+    supplier_id: int | None = None
+    cost_category_id: int | None = None
+    sku_pattern: str | None = None  # glob: * any run, ? one character
+    # percent: price * (1 + value / 100); fixed: price + value;
+    # markup: landed cost * (1 + value / 100)
+    mode: Literal["percent", "fixed", "markup"] = "percent"
+    value: float
+
+class RepriceRequest(BaseModel):
+    rules: list[RepriceRule]
+    dry_run: bool = True
+    decimals: int = 2
+    preview_limit: int = 100
+
+    @model_validator(mode="after")
+    def check_rules(self):
+        if not self.rules:
+            raise ValueError("At least one rule is required")
+        return self
+
+def glob_to_like(pattern: str) -> str:
+    escaped = pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped.replace("*", "%").replace("?", "_")
+
+def rule_condition(rule: RepriceRule):
+    from modules.finance.domain.models import ProductCostComponent
+
+    conditions = []
+    if rule.supplier_id is not None:
+        conditions.append(Product.id.in_(
+            select(product_supplier_association.c.product_id)
+            .where(product_supplier_association.c.supplier_id == rule.supplier_id)
+        ))
+    if rule.cost_category_id is not None:
+        conditions.append(Product.id.in_(
+            select(ProductCostComponent.product_id)
+            .where(ProductCostComponent.cost_category_id == rule.cost_category_id)
+        ))
+    if rule.sku_pattern:
+        conditions.append(Product.sku.like(glob_to_like(rule.sku_pattern), escape="\\"))
+    return and_(*conditions) if conditions else Product.id.isnot(None)
+
+class RepriceService:
+    """
+    Set-based repricing: the rules compile into one CASE expression (first matching
+    rule wins), previewed with a SELECT and applied with a single UPDATE.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _expressions(self, request: RepriceRequest):
+        from modules.finance.application.cost_engine import landed_cost_sql
+
+        current = func.coalesce(Product.price, 0.0)
+
+        def target(rule: RepriceRule):
+            if rule.mode == "percent":
+                return current * (1 + rule.value / 100.0)
+            if rule.mode == "markup":
+                return landed_cost_sql() * (1 + rule.value / 100.0)
+            return current + rule.value
+
+        conditions = [rule_condition(rule) for rule in request.rules]
+        raw = case(*[(condition, target(rule)) for condition, rule in zip(conditions, request.rules)])
+        rounded = cast(func.round(cast(raw, Numeric), request.decimals), Float)
+        new_price = case((rounded < 0, 0.0), else_=rounded)
+        return current, new_price, or_(*conditions)
+
+    async def run(self, request: RepriceRequest) -> dict:
+        current, new_price, matched = self._expressions(request)
+        changed = and_(matched, new_price != current)
+
+        counts = (await self.db.execute(
+            select(
+                func.count(Product.id),
+                func.sum(case((new_price != current, 1), else_=0)),
+            ).where(matched)
+        )).one()
+
+        preview_rows = (await self.db.execute(
+            select(Product.id, Product.sku, Product.name, current.label("old_price"), new_price.label("new_price"))
+            .where(changed)
+            .order_by(Product.id)
+            .limit(request.preview_limit)
+        )).mappings().all()
+
+        result = {
+            "dry_run": request.dry_run,
+            "matched": counts[0] or 0,
+            "changed": counts[1] or 0,
+            "preview": [dict(row) for row in preview_rows],
+        }
+        if request.dry_run:
+            return result
+
+        await self.db.execute(
+            update(Product)
+            .where(changed)
+            .values(price=new_price, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        return result
@@ -0,0 +1,129 @@
+import re
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, or_, case, desc, func, text
+from modules.catalog.domain.models import Product, ProductBarcode
+
+SEARCH_COLUMNS = (
+    Product.id,
+    Product.name,
+    Product.sku,
+    Product.price,
+    Product.unit_of_measure,
+    Product.product_type,
+    Product.measurement_value,
+    Product.measurement_unit,
+    Product.is_inventory_tracked,
+)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def fts5_query(q: str) -> str | None:
+    """Turns user input into an FTS5 expression: every token must match as a prefix."""
+    tokens = _TOKEN_RE.findall(q)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+# products_fts presence per database URL, checked once per process
+_fts_available: dict = {}
+
+def _like_prefix(q: str) -> str:
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+class ProductSearchService:
+    """
+    Typeahead search over name prefix, SKU and barcode.
+    Postgres: pg_trgm GIN indexes (prefix ILIKE + similarity ranking).
+    SQLite: products_fts FTS5 table kept in sync by triggers (bm25 ranking).
+    Both are created by the product_search_index migration.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _fetch(self, ids: list) -> list:
+        if not ids:
+            return []
+        rows = (await self.db.execute(select(*SEARCH_COLUMNS).where(Product.id.in_(ids)))).mappings().all()
+        by_id = {row["id"]: dict(row) for row in rows}
+        return [by_id[i] for i in ids if i in by_id]
+
+    async def _exact_ids(self, q: str) -> list:
+        # Scanner input: exact SKU / barcode hits are resolved through their unique indexes
+        stmt = select(Product.id).where(Product.sku == q).union(
+            select(ProductBarcode.product_id).where(ProductBarcode.barcode == q)
+        )
+        return [row[0] for row in (await self.db.execute(stmt)).all()]
+
+    async def _postgres_ids(self, q: str, limit: int) -> list:
+        prefix = _like_prefix(q)
+        barcode_prefix = select(ProductBarcode.product_id).where(ProductBarcode.barcode.like(prefix, escape="\\"))
+        is_prefix = case(
+            (or_(Product.name.ilike(prefix, escape="\\"), Product.sku.ilike(prefix, escape="\\")), 1),
+            else_=0
+        )
+        similarity = func.greatest(func.similarity(Product.name, q), func.similarity(Product.sku, q))
+        stmt = (
+            select(Product.id)
+            .where(or_(
+                Product.name.ilike(prefix, escape="\\"),
+                Product.sku.ilike(prefix, escape="\\"),
+                Product.name.op("%")(q),
+                Product.id.in_(barcode_prefix),
+            ))
+            .order_by(desc(is_prefix), desc(similarity), Product.name)
+            .limit(limit)
+        )
+        return [row[0] for row in (await self.db.execute(stmt)).all()]
+
+    async def _has_fts(self) -> bool:
+        key = str(self.db.bind.url)
+        if key not in _fts_available:
+            found = await self.db.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'")
+            )
+            _fts_available[key] = found.first() is not None
+            if not _fts_available[key]:
+                print("products_fts not found (database not migrated): product search falls back to LIKE")
+        return _fts_available[key]
+
+    async def _sqlite_ids(self, q: str, limit: int) -> list:
+        match = fts5_query(q)
+        if not match:
+            return []
+        if not await self._has_fts():
+            return await self._like_ids(q, limit)
+        stmt = text("SELECT rowid FROM products_fts WHERE products_fts MATCH :match ORDER BY rank LIMIT :limit")
+        result = await self.db.execute(stmt, {"match": match, "limit": limit})
+        return [row[0] for row in result.all()]
+
+    async def _like_ids(self, q: str, limit: int) -> list:
+        prefix = _like_prefix(q)
+        stmt = (
+            select(Product.id)
+            .where(or_(
+                Product.name.ilike(prefix, escape="\\"),
+                Product.sku.ilike(prefix, escape="\\"),
+                Product.id.in_(select(ProductBarcode.product_id).where(ProductBarcode.barcode.like(prefix, escape="\\"))),
+            ))
+            .order_by(Product.name)
+            .limit(limit)
+        )
+        return [row[0] for row in (await self.db.execute(stmt)).all()]
+
+    async def search(self, q: str, limit: int = 20) -> list:
+        q = q.strip()
+        if not q:
+            return []
+
+        ids = await self._exact_ids(q)
+        if len(ids) < limit:
+            dialect = self.db.bind.dialect.name
+            if dialect == "postgresql":
+                ranked = await self._postgres_ids(q, limit)
+            elif dialect == "sqlite":
+                ranked = await self._sqlite_ids(q, limit)
+            else:
+                ranked = await self._like_ids(q, limit)
+            ids += [i for i in ranked if i not in ids]
+
+        return await self._fetch(ids[:limit])
@@ -0,0 +1,130 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import get_settings
+from modules.catalog.domain.models import Product
+from modules.catalog.application.read_model import fetch_compact, COMPACT_FIELDS
+from modules.catalog.application.sync_service import encode_cursor
+
+SNAPSHOT_FORMAT = 1
+# Products read per query while building
+BUILD_CHUNK = 5000
+# Snapshot files kept on disk (the current one plus older ones still being downloaded)
+KEEP_SNAPSHOTS = 3
+_POINTER = "current.json"
+# One build at a time per process: concurrent stale requests share it
+_build_lock = asyncio.Lock()
+
+def build_payload(products: list, fields=COMPACT_FIELDS) -> dict:
+    """Columnar layout: field names once, then one array per field."""
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "fields": list(fields),
+        "columns": {f: [p[f] for p in products] for f in fields},
+    }
+
+def encode_snapshot(payload: dict, meta: dict) -> tuple:
+    """Returns (etag, gzip bytes). The ETag only depends on catalog content."""
+    body = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+    etag = hashlib.sha256(body).hexdigest()[:32]
+    # Splice the already-encoded catalog body instead of serializing it twice
+    document = json.dumps({**meta, "etag": etag}, separators=(",", ":"))[:-1].encode() + b',"catalog":' + body + b"}"
+    # mtime=0 keeps the compressed bytes reproducible
+    return etag, gzip.compress(document, compresslevel=6, mtime=0)
+
+class CatalogSnapshotService:
+    """
+    Builds a gzip-compressed, columnar JSON snapshot of the catalog (products,
+    barcodes, current prices) for terminal cold start. The snapshot embeds a delta
+    sync cursor, so terminals continue with /products/changes after loading it.
+    A snapshot older than CATALOG_SNAPSHOT_MAX_AGE_SECONDS is stale: `refresh()`
+    rebuilds it, so catalog, barcode and price changes reach new terminals in time.
+    """
+    def __init__(self, db: AsyncSession | None = None, directory: str | None = None):
+        self.db = db
+        self.directory = directory or get_settings().CATALOG_SNAPSHOT_DIR
+
+    async def _load_products(self) -> list:
+        products, last_id = [], 0
+        while True:
+            chunk = await fetch_compact(self.db, where=Product.id > last_id, limit=BUILD_CHUNK)
+            if not chunk:
+                return products
+            products.extend(chunk)
+            last_id = chunk[-1]["id"]
+
+    async def build(self) -> dict:
+        now = datetime.utcnow()
+        # Anything changed after this point is replayed by the delta feed
+        until = now - timedelta(seconds=get_settings().CATALOG_SYNC_LAG_SECONDS)
+        products = await self._load_products()
+
+        meta = {
+            "generated_at": now.isoformat(),
+            "product_count": len(products),
+            "cursor": encode_cursor(until),
+        }
+        etag, data = await asyncio.to_thread(encode_snapshot, build_payload(products), meta)
+        info = {**meta, "etag": etag, "file": f"catalog-{etag}.json.gz", "size": len(data)}
+        await asyncio.to_thread(self._publish, info, data)
+        return info
+
+    def is_stale(self, info: dict, now: datetime | None = None) -> bool:
+        age = (now or datetime.utcnow()) - datetime.fromisoformat(info["generated_at"])
+        return age > timedelta(seconds=get_settings().CATALOG_SNAPSHOT_MAX_AGE_SECONDS)
+
+    async def refresh(self, wait: bool = True) -> bool:
+        """
+        Builds a snapshot if there is none or it is stale; returns True if it built one.
+        With `wait=False` it gives up when another build is already running.
+        """
+        if not wait and _build_lock.locked():
+            return False
+        async with _build_lock:
+            # Re-check: the build we waited for may have published a fresh one
+            info = self.current()
+            if info is not None and not self.is_stale(info):
+                return False
+            await self.build()
+            return True
+
+    def _publish(self, info: dict, data: bytes):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, info["file"])
+        if not os.path.exists(path):
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+
+        pointer = os.path.join(self.directory, _POINTER)
+        with open(pointer + ".tmp", "w") as f:
+            json.dump(info, f)
+        os.replace(pointer + ".tmp", pointer)
+        self._prune(keep=info["file"])
+
+    def _prune(self, keep: str):
+        files = [
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if name.startswith("catalog-") and name.endswith(".json.gz") and name != keep
+        ]
+        files.sort(key=os.path.getmtime, reverse=True)
+        for path in files[KEEP_SNAPSHOTS - 1:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def current(self) -> dict | None:
+        """Metadata of the published snapshot (with its absolute `path`), or None."""
+        try:
+            with open(os.path.join(self.directory, _POINTER)) as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            return None
+        info["path"] = os.path.join(self.directory, info["file"])
+        return info if os.path.exists(info["path"]) else None
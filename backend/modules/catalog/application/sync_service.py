@@ -0,0 +1,93 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, union
+from core.config import get_settings
+from modules.catalog.domain.models import Product, ProductBarcode, CatalogTombstone
+from modules.catalog.application.read_model import fetch_compact
+
+def encode_cursor(since: datetime | None, until: datetime | None = None, after_id: int = 0) -> str:
+    payload = {
+        "since": since.isoformat() if since else None,
+        "until": until.isoformat() if until else None,
+        "after_id": after_id,
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode()
+
+def decode_cursor(cursor: str | None) -> tuple:
+    """Returns (since, until, after_id); raises ValueError on a malformed cursor."""
+    if not cursor:
+        return None, None, 0
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        since = datetime.fromisoformat(payload["since"]) if payload.get("since") else None
+        until = datetime.fromisoformat(payload["until"]) if payload.get("until") else None
+        return since, until, int(payload.get("after_id") or 0)
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid sync cursor") from e
+
+class CatalogSyncService:
+    """
+    Changed-since feed for POS terminals.
+    A product is reported when its own row, one of its barcodes or one of its cost
+    components changed inside the cursor window; products that no longer exist are
+    reported through their tombstone. Pages are ordered by product id so a bulk
+    change (e.g. a repricing) streams out in fixed-size pages within one window.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def record_deletion(self, product_id: int):
+        self.db.add(CatalogTombstone(entity_type="product", entity_id=product_id, deleted_at=datetime.utcnow()))
+
+    def _changed_ids(self, since: datetime | None, until: datetime):
+        from modules.finance.domain.models import ProductCostComponent
+
+        def window(stmt, column):
+            stmt = stmt.where(column <= until)
+            return stmt.where(column > since) if since else stmt
+
+        return union(
+            window(select(Product.id.label("product_id")), Product.updated_at),
+            window(select(ProductBarcode.product_id), ProductBarcode.updated_at),
+            window(select(ProductCostComponent.product_id), ProductCostComponent.updated_at),
+            window(
+                select(CatalogTombstone.entity_id).where(CatalogTombstone.entity_type == "product"),
+                CatalogTombstone.deleted_at
+            ),
+        ).subquery()
+
+    async def changes(self, cursor: str | None = None, limit: int = 500, now: datetime | None = None) -> dict:
+        since, until, after_id = decode_cursor(cursor)
+        if until is None:
+            # Open a new window; the lag leaves room for transactions that stamped
+            # updated_at earlier but have not committed yet
+            now = now or datetime.utcnow()
+            until = max(now - timedelta(seconds=get_settings().CATALOG_SYNC_LAG_SECONDS), since or datetime.min)
+
+        changed = self._changed_ids(since, until)
+        stmt = (
+            select(changed.c.product_id)
+            .where(changed.c.product_id > after_id)
+            .order_by(changed.c.product_id)
+            .limit(limit + 1)
+        )
+        ids = [row[0] for row in (await self.db.execute(stmt)).all()]
+        has_more = len(ids) > limit
+        ids = ids[:limit]
+
+        products = await fetch_compact(self.db, where=Product.id.in_(ids)) if ids else []
+        alive = {p["id"] for p in products}
+
+        if has_more:
+            next_cursor = encode_cursor(since, until, ids[-1])
+        else:
+            next_cursor = encode_cursor(until)
+
+        return {
+            "products": products,
+            "deleted": [i for i in ids if i not in alive],
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+        }
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float, Text, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Boolean, Float, Text, ForeignKey, Table, DateTime, Index, text
 from sqlalchemy.orm import relationship
+from datetime import datetime
 from core.database import Base
 
 # Association Table for Many-to-Many
@@ -32,6 +33,9 @@ class Product(Base):
     product_type = Column(String, default="unitary") # unitary, fractional, pack
     measurement_value = Column(Float, nullable=True) # e.g. 500, 1.5
     measurement_unit = Column(String, nullable=True) # e.g. g, L, ml
+
+    # Delta sync watermark (see /products/changes)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     # Many-to-Many Relationship
     suppliers = relationship("Supplier", secondary=product_supplier_association, backref="products", lazy="selectin")
@@ -45,5 +49,68 @@ class ProductBarcode(Base):
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
     barcode = Column(String, unique=True, index=True, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     product = relationship("Product", back_populates="barcodes")
+
+# Deleted catalog rows, kept so POS terminals can drop them during delta sync
+class CatalogTombstone(Base):
+    __tablename__ = "catalog_tombstones"
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity_type = Column(String, nullable=False) # product
+    entity_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_catalog_tombstones_type_deleted_at", "entity_type", "deleted_at"),
+    )
+
+# Scheduled and scoped prices; Product.price remains the base (fallback) price.
+# A new promotion or price revision is a new list with its own validity window.
+# Once a list is in effect its scope and start are fixed; item prices are versioned,
+# so past dates keep resolving to the price that applied then.
+class PriceList(Base):
+    __tablename__ = "price_lists"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=True, index=True) # None = any customer
+    warehouse_id = Column(Integer, ForeignKey("warehouses.id"), nullable=True, index=True) # None = any warehouse
+    priority = Column(Integer, default=0) # Higher wins among equally specific lists
+    valid_from = Column(DateTime, nullable=True) # None = always
+    valid_to = Column(DateTime, nullable=True) # Exclusive; None = open-ended
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Every item version, history included (deleted with the list)
+    item_versions = relationship("PriceListItem", back_populates="price_list", lazy="selectin", cascade="all, delete-orphan")
+    # Prices in effect now
+    items = relationship(
+        "PriceListItem",
+        primaryjoin="and_(PriceList.id == PriceListItem.price_list_id, PriceListItem.valid_to == None)",
+        viewonly=True,
+        lazy="selectin",
+    )
+
+class PriceListItem(Base):
+    __tablename__ = "price_list_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    price_list_id = Column(Integer, ForeignKey("price_lists.id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
+    price = Column(Float, nullable=False)
+    # Version window inside the list's own window: a new price closes the current row
+    valid_from = Column(DateTime, nullable=True) # None = since the list was created
+    valid_to = Column(DateTime, nullable=True) # Exclusive; None = current price
+
+    price_list = relationship("PriceList", back_populates="item_versions")
+
+    __table_args__ = (
+        # At most one current price per product and list
+        Index(
+            "uq_price_list_items_current", "price_list_id", "product_id", unique=True,
+            postgresql_where=text("valid_to IS NULL"), sqlite_where=text("valid_to IS NULL"),
+        ),
+    )
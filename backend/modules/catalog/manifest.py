@@ -6,5 +6,5 @@ module = Module(
     name="catalog",
     display_name="Products",
     router=router,
-    models=[models.Product]
+    models=[models.Product, models.CatalogTombstone, models.PriceList, models.PriceListItem]
 )
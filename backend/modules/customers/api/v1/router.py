@@ -92,3 +92,33 @@ async def get_customer_analytics(
         "new_customers": new_customers,
         "new_customers_trend": trend
     }
+
+from modules.customers.application.scoring_service import CustomerScoringService
+
+@router.get("/analytics/rfm")
+async def get_rfm_segments(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    Customer count and average RFM metrics per segment (from the precomputed customer_scores table).
+    """
+    service = CustomerScoringService(db)
+    return await service.get_segment_summary()
+
+@router.get("/analytics/rfm/customers")
+async def list_rfm_scores(
+    segment: str | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    service = CustomerScoringService(db)
+    return await service.list_scores(segment=segment, skip=skip, limit=limit)
+
+@router.post("/analytics/rfm/refresh", dependencies=[Depends(RoleChecker([UserRole.ADMIN, UserRole.SUPERVISOR]))])
+async def refresh_rfm_scores(full: bool = False, db: AsyncSession = Depends(get_db)):
+    """
+    Recomputes metrics for customers with sales confirmed since the last run and rescores everyone.
+    Intended to be called periodically (cron / scheduler).
+    """
+    service = CustomerScoringService(db)
+    return await service.refresh(full=full)
@@ -0,0 +1,196 @@
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func
+from core.config import get_settings
+from core.database import dialect_insert
+from modules.customers.domain.models import CustomerScore
+from modules.sales.domain.models import Sale, SaleStatus
+from modules.sales.application.checkpoint_service import CheckpointService
+
+CHECKPOINT_NAME = "customer_scores"
+SCORE_BINS = 5
+CHUNK = 500
+
+def quantile_scores(values: list, bins: int = SCORE_BINS) -> list:
+    """
+    Rank-based quantile scores (1..bins, higher value -> higher score).
+    Ties get the score of their average rank, so equal values always score the same.
+    """
+    n = len(values)
+    if n == 0:
+        return []
+    order = sorted(range(n), key=lambda i: values[i])
+    scores = [0] * n
+    start = 0
+    while start < n:
+        end = start
+        while end + 1 < n and values[order[end + 1]] == values[order[start]]:
+            end += 1
+        score = 1 + int(((start + end) / 2) * bins // n)
+        for rank in range(start, end + 1):
+            scores[order[rank]] = score
+        start = end + 1
+    return scores
+
+def segment_for(r: int, f: int, m: int) -> str:
+    if r >= 4 and f >= 4:
+        return "Champions"
+    if r >= 3 and f >= 3:
+        return "Loyal"
+    if r >= 4:
+        return "New"
+    if r <= 2 and f >= 3:
+        return "At Risk"
+    if r == 1:
+        return "Lost"
+    if r == 2:
+        return "Hibernating"
+    return "Needs Attention"
+
+class CustomerScoringService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.checkpoints = CheckpointService(db)
+
+    async def _changed_customers(self, since: datetime | None, until: datetime):
+        stmt = select(Sale.customer_id).distinct().where(
+            Sale.status == SaleStatus.CONFIRMED.value,
+            Sale.customer_id != None,
+            Sale.confirmed_at <= until,
+        )
+        if since:
+            stmt = stmt.where(Sale.confirmed_at > since)
+        return [row[0] for row in (await self.db.execute(stmt)).all()]
+
+    async def _update_metrics(self, customer_ids: list):
+        """Recomputes raw RFM metrics for the given customers in one grouped query per chunk."""
+        now = datetime.utcnow()
+        for i in range(0, len(customer_ids), CHUNK):
+            chunk = customer_ids[i:i + CHUNK]
+            stmt = (
+                select(
+                    Sale.customer_id,
+                    func.max(Sale.created_at).label("last_purchase_at"),
+                    func.count(Sale.id).label("frequency"),
+                    func.coalesce(func.sum(Sale.total), 0.0).label("monetary"),
+                )
+                .where(Sale.status == SaleStatus.CONFIRMED.value, Sale.customer_id.in_(chunk))
+                .group_by(Sale.customer_id)
+            )
+            rows = [
+                {
+                    "customer_id": r.customer_id,
+                    "last_purchase_at": r.last_purchase_at,
+                    "frequency": r.frequency,
+                    "monetary": r.monetary,
+                    "updated_at": now,
+                }
+                for r in (await self.db.execute(stmt)).all()
+            ]
+            if not rows:
+                continue
+            insert_stmt = dialect_insert(self.db, CustomerScore).values(rows)
+            insert_stmt = insert_stmt.on_conflict_do_update(
+                index_elements=["customer_id"],
+                set_={
+                    "last_purchase_at": insert_stmt.excluded.last_purchase_at,
+                    "frequency": insert_stmt.excluded.frequency,
+                    "monetary": insert_stmt.excluded.monetary,
+                    "updated_at": insert_stmt.excluded.updated_at,
+                },
+            )
+            await self.db.execute(insert_stmt)
+
+    async def _rescore_all(self):
+        """
+        Quantile scores depend on the whole distribution (and recency on the clock),
+        so every customer is rescored from the compact customer_scores table.
+        """
+        now = datetime.utcnow()
+        rows = (await self.db.execute(
+            select(CustomerScore.customer_id, CustomerScore.last_purchase_at,
+                   CustomerScore.frequency, CustomerScore.monetary)
+        )).all()
+        if not rows:
+            return 0
+
+        recency = [(now - r.last_purchase_at).days if r.last_purchase_at else None for r in rows]
+        # Fewer days since last purchase is better: score on the negated value
+        worst = max((d for d in recency if d is not None), default=0) + 1
+        r_scores = quantile_scores([-(d if d is not None else worst) for d in recency])
+        f_scores = quantile_scores([r.frequency or 0 for r in rows])
+        m_scores = quantile_scores([r.monetary or 0.0 for r in rows])
+
+        params = [
+            {
+                "customer_id": row.customer_id,
+                "recency_days": recency[i],
+                "r_score": r_scores[i],
+                "f_score": f_scores[i],
+                "m_score": m_scores[i],
+                "segment": segment_for(r_scores[i], f_scores[i], m_scores[i]),
+            }
+            for i, row in enumerate(rows)
+        ]
+        for i in range(0, len(params), CHUNK):
+            await self.db.execute(update(CustomerScore), params[i:i + CHUNK])
+        return len(params)
+
+    async def refresh(self, full: bool = False):
+        checkpoint = await self.checkpoints.acquire(CHECKPOINT_NAME)
+        since = None if full else checkpoint.last_processed_at
+        # Lagging watermark: sales still committing are picked up by the next run
+        lag = timedelta(seconds=get_settings().ANALYTICS_COMMIT_LAG_SECONDS)
+        until = max(datetime.utcnow() - lag, since or datetime.min)
+
+        changed = await self._changed_customers(since, until)
+        await self._update_metrics(changed)
+        scored = await self._rescore_all()
+
+        self.checkpoints.advance(checkpoint, processed_at=until, processed=len(changed))
+        await self.db.commit()
+        return {"customers_updated": len(changed), "customers_scored": scored}
+
+    async def get_segment_summary(self):
+        stmt = (
+            select(
+                CustomerScore.segment,
+                func.count(CustomerScore.customer_id).label("customers"),
+                func.avg(CustomerScore.monetary).label("avg_monetary"),
+                func.avg(CustomerScore.frequency).label("avg_frequency"),
+                func.avg(CustomerScore.recency_days).label("avg_recency_days"),
+            )
+            .group_by(CustomerScore.segment)
+            .order_by(func.count(CustomerScore.customer_id).desc())
+        )
+        return [dict(row._mapping) for row in (await self.db.execute(stmt)).all()]
+
+    async def list_scores(self, segment: str | None = None, skip: int = 0, limit: int = 100):
+        from modules.customers.domain.models import Customer
+
+        stmt = (
+            select(CustomerScore, Customer.name, Customer.email)
+            .join(Customer, Customer.id == CustomerScore.customer_id)
+            .order_by(CustomerScore.monetary.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        if segment:
+            stmt = stmt.where(CustomerScore.segment == segment)
+        rows = (await self.db.execute(stmt)).all()
+        return [
+            {
+                "customer_id": score.customer_id,
+                "name": name,
+                "email": email,
+                "last_purchase_at": score.last_purchase_at,
+                "recency_days": score.recency_days,
+                "frequency": score.frequency,
+                "monetary": score.monetary,
+                "r_score": score.r_score,
+                "f_score": score.f_score,
+                "m_score": score.m_score,
+                "segment": score.segment,
+            }
+            for score, name, email in rows
+        ]
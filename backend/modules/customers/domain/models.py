@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
 from core.database import Base
 from datetime import datetime
 
@@ -11,3 +11,20 @@ class Customer(Base):
     email = Column(String, nullable=True)
     
     created_at = Column(DateTime, default=datetime.utcnow)
+
+# RFM (recency, frequency, monetary) metrics and 1-5 quantile scores per customer
+class CustomerScore(Base):
+    __tablename__ = "customer_scores"
+
+    customer_id = Column(Integer, ForeignKey("customers.id"), primary_key=True)
+    last_purchase_at = Column(DateTime, nullable=True)
+    frequency = Column(Integer, default=0) # Confirmed sales
+    monetary = Column(Float, default=0.0) # Sum of confirmed sale totals
+
+    recency_days = Column(Integer, nullable=True)
+    r_score = Column(Integer, nullable=True)
+    f_score = Column(Integer, nullable=True)
+    m_score = Column(Integer, nullable=True)
+    segment = Column(String, index=True, nullable=True)
+
+    updated_at = Column(DateTime, default=datetime.utcnow)
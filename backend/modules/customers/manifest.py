@@ -5,5 +5,5 @@ from .domain import models
 module = Module(
     name="customers",
     router=router,
-    models=[models.Customer]
+    models=[models.Customer, models.CustomerScore]
 )
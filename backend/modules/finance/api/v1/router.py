@@ -85,3 +85,97 @@ async def list_payments(skip: int = 0, limit: int = 100, db: AsyncSession = Depe
     stmt = select(Payment).order_by(Payment.created_at.desc()).offset(skip).limit(limit)
     result = await db.execute(stmt)
     return result.scalars().all()
+
+# --- Cost Engine Section ---
+
+from modules.finance.application.cost_engine import cost_engine
+from modules.iam.api.v1.router import get_current_user
+from modules.iam.domain.models import User
+
+def _cost_row(cost, product=None) -> dict:
+    row = {
+        "product_id": cost.product_id,
+        "base_cost": cost.base_cost,
+        "fixed_costs": cost.fixed_costs,
+        "percentage_rate": cost.percentage_rate,
+        "landed_cost": cost.landed_cost,
+        "price": cost.price,
+        "margin": cost.margin,
+        "margin_pct": cost.margin_pct,
+    }
+    if product is not None:
+        row["sku"] = product.sku
+        row["name"] = product.name
+    return row
+
+async def _products_by_id(db: AsyncSession, product_ids) -> dict:
+    from modules.catalog.domain.models import Product
+    if not product_ids:
+        return {}
+    rows = (await db.execute(select(Product.id, Product.sku, Product.name).where(Product.id.in_(product_ids)))).all()
+    return {r.id: r for r in rows}
+
+@router.get("/landed-costs")
+async def get_landed_costs(
+    product_ids: str | None = None,
+    skip: int = 0,
+    limit: int = 500,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Landed cost per product: base + fixed components + base * percentage components."""
+    if product_ids:
+        try:
+            ids = [int(i) for i in product_ids.split(",") if i.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="product_ids must be a comma-separated list of integers")
+        costs = list((await cost_engine.get_many(db, ids)).values())
+    else:
+        costs = sorted((await cost_engine.get_all(db)).values(), key=lambda c: c.product_id)[skip:skip + limit]
+    return [_cost_row(c) for c in costs]
+
+@router.get("/margins", dependencies=[Depends(RoleChecker([UserRole.ADMIN, UserRole.SUPERVISOR]))])
+async def get_margin_report(
+    max_margin_pct: float | None = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db)
+):
+    """Products with the thinnest margin over landed cost first (optionally only those below `max_margin_pct`)."""
+    costs = [c for c in (await cost_engine.get_all(db)).values() if c.margin_pct is not None]
+    if max_margin_pct is not None:
+        costs = [c for c in costs if c.margin_pct <= max_margin_pct]
+    costs.sort(key=lambda c: c.margin_pct)
+    costs = costs[:limit]
+    products = await _products_by_id(db, [c.product_id for c in costs])
+    return [_cost_row(c, products.get(c.product_id)) for c in costs]
+
+@router.get("/valuation", dependencies=[Depends(RoleChecker([UserRole.ADMIN, UserRole.SUPERVISOR]))])
+async def get_inventory_valuation(warehouse_id: int | None = None, db: AsyncSession = Depends(get_db)):
+    """On-hand stock valued at landed cost."""
+    from sqlalchemy import func
+    from modules.inventory.domain.models import StockMovement
+    from modules.inventory.application.replenishment_service import signed_qty
+
+    stmt = select(StockMovement.product_id, func.sum(signed_qty).label("quantity")).group_by(StockMovement.product_id)
+    if warehouse_id is not None:
+        stmt = stmt.where(StockMovement.warehouse_id == warehouse_id)
+    stock = (await db.execute(stmt)).all()
+
+    costs = await cost_engine.get_all(db)
+    items = []
+    for product_id, quantity in stock:
+        cost = costs.get(product_id)
+        if cost is None or not quantity:
+            continue
+        items.append({
+            "product_id": product_id,
+            "quantity": quantity,
+            "unit_cost": cost.landed_cost,
+            "value": quantity * cost.landed_cost,
+        })
+    items.sort(key=lambda i: i["value"], reverse=True)
+    return {
+        "warehouse_id": warehouse_id,
+        "total_value": sum(i["value"] for i in items),
+        "items": items,
+    }
@@ -0,0 +1,128 @@
+import time
+from dataclasses import dataclass
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, case
+from core.config import get_settings
+from modules.finance.domain.models import CostCategory, ProductCostComponent, CostCalculationType
+
+FIXED = CostCalculationType.FIXED_AMOUNT.value
+PERCENTAGE = CostCalculationType.PERCENTAGE_OF_BASE.value
+
+@dataclass(frozen=True, slots=True)
+class LandedCost:
+    product_id: int
+    base_cost: float
+    fixed_costs: float       # Sum of FIXED_AMOUNT components
+    percentage_rate: float   # Sum of PERCENTAGE_OF_BASE components, as a fraction (0.21 = 21%)
+    landed_cost: float
+    price: float
+
+    @property
+    def margin(self) -> float:
+        return self.price - self.landed_cost
+
+    @property
+    def margin_pct(self) -> float | None:
+        return self.margin / self.price * 100.0 if self.price else None
+
+def landed_cost(base_cost: float, fixed_costs: float, percentage_rate: float) -> float:
+    """base + fixed amounts + base * sum(percentages)."""
+    return base_cost + fixed_costs + base_cost * percentage_rate
+
+def compute_landed_costs(products: list, components: list) -> dict:
+    """
+    `products`: (product_id, cost_price, price) rows.
+    `components`: (product_id, fixed_total, percentage_total) rows, already aggregated.
+    Returns product_id -> LandedCost in a single pass over both lists.
+    """
+    totals = {pid: (fixed or 0.0, pct or 0.0) for pid, fixed, pct in components}
+    result = {}
+    for pid, cost_price, price in products:
+        base = cost_price or 0.0
+        fixed, pct = totals.get(pid, (0.0, 0.0))
+        result[pid] = LandedCost(pid, base, fixed, pct, landed_cost(base, fixed, pct), price or 0.0)
+    return result
+
+def _component_totals():
+    """Per-product component sums split by calculation type (active categories only)."""
+    return (
+        select(
+            ProductCostComponent.product_id,
+            func.sum(case((CostCategory.default_type == FIXED, ProductCostComponent.value), else_=0.0)).label("fixed"),
+            func.sum(case((CostCategory.default_type == PERCENTAGE, ProductCostComponent.value), else_=0.0)).label("percentage"),
+        )
+        .join(CostCategory, CostCategory.id == ProductCostComponent.cost_category_id)
+        .where(CostCategory.is_active == True)
+        .group_by(ProductCostComponent.product_id)
+    )
+
+def landed_cost_sql():
+    """Landed cost of the enclosing Product row as a SQL expression (for set-based queries)."""
+    from modules.catalog.domain.models import Product
+
+    def component_sum(kind):
+        return (
+            select(func.coalesce(func.sum(ProductCostComponent.value), 0.0))
+            .join(CostCategory, CostCategory.id == ProductCostComponent.cost_category_id)
+            .where(
+                ProductCostComponent.product_id == Product.id,
+                CostCategory.default_type == kind,
+                CostCategory.is_active == True,
+            )
+            .scalar_subquery()
+        )
+
+    base = func.coalesce(Product.cost_price, 0.0)
+    return base + component_sum(FIXED) + base * component_sum(PERCENTAGE)
+
+class CostEngine:
+    """
+    Process-local landed cost table for the whole catalog, built from two queries
+    (products and aggregated components). Writers call `invalidate()`; entries also
+    expire after COST_CACHE_TTL_SECONDS so changes made by other workers show up.
+    """
+    def __init__(self, ttl_seconds: int = 300):
+        self.ttl_seconds = ttl_seconds
+        self._costs = {}
+        self._loaded_at = None
+        self._dirty = set()
+
+    def invalidate(self, product_ids=None):
+        """Drops the given products (or everything) from the table."""
+        if product_ids is None:
+            self._loaded_at = None
+            self._dirty.clear()
+        else:
+            self._dirty.update(product_ids)
+
+    async def _load(self, db: AsyncSession, product_ids=None) -> dict:
+        from modules.catalog.domain.models import Product
+
+        product_stmt = select(Product.id, Product.cost_price, Product.price)
+        component_stmt = _component_totals()
+        if product_ids is not None:
+            product_stmt = product_stmt.where(Product.id.in_(product_ids))
+            component_stmt = component_stmt.where(ProductCostComponent.product_id.in_(product_ids))
+        products = (await db.execute(product_stmt)).all()
+        components = (await db.execute(component_stmt)).all()
+        return compute_landed_costs(products, components)
+
+    async def get_all(self, db: AsyncSession) -> dict:
+        expired = self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl_seconds
+        if expired:
+            self._costs = await self._load(db)
+            self._loaded_at = time.monotonic()
+            self._dirty.clear()
+        elif self._dirty:
+            dirty = list(self._dirty)
+            self._dirty.clear()
+            for pid in dirty:
+                self._costs.pop(pid, None)
+            self._costs.update(await self._load(db, dirty))
+        return self._costs
+
+    async def get_many(self, db: AsyncSession, product_ids) -> dict:
+        costs = await self.get_all(db)
+        return {pid: costs[pid] for pid in product_ids if pid in costs}
+
+cost_engine = CostEngine(ttl_seconds=get_settings().COST_CACHE_TTL_SECONDS)
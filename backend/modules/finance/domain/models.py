@@ -21,10 +21,11 @@ class ProductCostComponent(Base):
     __tablename__ = "product_cost_components"
 
     id = Column(Integer, primary_key=True, index=True)
-    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
     cost_category_id = Column(Integer, ForeignKey("cost_categories.id"), nullable=False)
     
     value = Column(Float, default=0.0) # The amount ($10) or percentage (0.21)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     # Relationships
     product = relationship("modules.catalog.domain.models.Product", back_populates="cost_components")
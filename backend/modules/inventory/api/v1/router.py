@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, delete
 from core.database import get_db
-from modules.inventory.domain.models import Warehouse, StockMovement, Batch, StockMovementType
+from modules.inventory.domain.models import Warehouse, StockMovement, Batch, StockMovementType, Location, ProductLocation
 from modules.catalog.domain.models import Product
 from pydantic import BaseModel
 from datetime import datetime
@@ -31,6 +31,86 @@ async def create_warehouse(warehouse: WarehouseCreate, db: AsyncSession = Depend
     await db.refresh(db_wh)
     return db_wh
 
+class LocationCreate(BaseModel):
+    warehouse_id: int
+    code: str
+    aisle: int
+    rack: int = 0
+    level: int = 0
+    bin: str | None = None
+    x: float | None = None
+    y: float | None = None
+
+class LocationRead(LocationCreate):
+    id: int
+    is_active: bool = True
+
+    class Config:
+        from_attributes = True
+
+class ProductLocationAssign(BaseModel):
+    product_id: int
+    is_primary: bool = True
+
+@router.post("/locations", response_model=LocationRead, dependencies=[Depends(RoleChecker([UserRole.ADMIN, UserRole.SUPERVISOR]))])
+async def create_location(data: LocationCreate, db: AsyncSession = Depends(get_db)):
+    if not await db.get(Warehouse, data.warehouse_id):
+        raise HTTPException(status_code=404, detail="Warehouse not found")
+    existing = await db.execute(
+        select(Location.id).where(Location.warehouse_id == data.warehouse_id, Location.code == data.code)
+    )
+    if existing.first():
+        raise HTTPException(status_code=409, detail="Location code already exists in this warehouse")
+    location = Location(**data.model_dump())
+    db.add(location)
+    await db.commit()
+    await db.refresh(location)
+    return location
+
+@router.get("/locations", response_model=list[LocationRead])
+async def list_locations(warehouse_id: int | None = None, db: AsyncSession = Depends(get_db),
+                         current_user: User = Depends(get_current_user)):
+    stmt = select(Location).order_by(Location.warehouse_id, Location.aisle, Location.rack, Location.level, Location.bin)
+    if warehouse_id is not None:
+        stmt = stmt.where(Location.warehouse_id == warehouse_id)
+    return (await db.execute(stmt)).scalars().all()
+
+@router.post("/locations/{location_id}/products", dependencies=[Depends(RoleChecker([UserRole.ADMIN, UserRole.SUPERVISOR]))])
+async def assign_product_location(location_id: int, data: ProductLocationAssign, db: AsyncSession = Depends(get_db)):
+    """Slots a product into a bin. A new primary assignment demotes the product's other bins in the same warehouse."""
+    location = await db.get(Location, location_id)
+    if not location:
+        raise HTTPException(status_code=404, detail="Location not found")
+    if not await db.get(Product, data.product_id):
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    if data.is_primary:
+        same_warehouse = select(Location.id).where(Location.warehouse_id == location.warehouse_id)
+        await db.execute(
+            update(ProductLocation)
+            .where(ProductLocation.product_id == data.product_id, ProductLocation.location_id.in_(same_warehouse))
+            .values(is_primary=False)
+        )
+    assignment = (await db.execute(
+        select(ProductLocation).where(ProductLocation.product_id == data.product_id, ProductLocation.location_id == location_id)
+    )).scalar_one_or_none()
+    if assignment:
+        assignment.is_primary = data.is_primary
+    else:
+        db.add(ProductLocation(product_id=data.product_id, location_id=location_id, is_primary=data.is_primary))
+    await db.commit()
+    return {"status": "assigned", "product_id": data.product_id, "location_id": location_id, "is_primary": data.is_primary}
+
+@router.delete("/locations/{location_id}/products/{product_id}", dependencies=[Depends(RoleChecker([UserRole.ADMIN, UserRole.SUPERVISOR]))])
+async def unassign_product_location(location_id: int, product_id: int, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(
+        delete(ProductLocation).where(ProductLocation.product_id == product_id, ProductLocation.location_id == location_id)
+    )
+    if not result.rowcount:
+        raise HTTPException(status_code=404, detail="Assignment not found")
+    await db.commit()
+    return {"status": "unassigned"}
+
 @router.post("/receive", dependencies=[Depends(RoleChecker([UserRole.ADMIN, UserRole.SUPERVISOR]))])
 async def receive_stock(data: ReceiveStock, db: AsyncSession = Depends(get_db)):
     # 1. Get Product
@@ -368,3 +448,28 @@ async def get_expiring_batches(days: int = 7, db: AsyncSession = Depends(get_db)
         })
     
     return expiring
+
+from modules.inventory.application.replenishment_service import ReplenishmentService
+
+@router.get("/replenishment")
+async def get_replenishment_report(
+    warehouse_id: int | None = None,
+    lead_time_days: int = 7,
+    coverage_days: int = 30,
+    safety_days: int = 3,
+    only_reorder: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Per product/warehouse sales velocity (7/30/90 days), days of cover and reorder suggestions.
+    Products without recent sales fall back to their static min_stock_level.
+    """
+    service = ReplenishmentService(db)
+    return await service.get_report(
+        warehouse_id=warehouse_id,
+        lead_time_days=lead_time_days,
+        coverage_days=coverage_days,
+        safety_days=safety_days,
+        only_reorder=only_reorder,
+    )
@@ -0,0 +1,28 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from modules.inventory.domain.models import Location, ProductLocation
+
+class LocationService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def pick_locations(self, product_ids, warehouse_id: int | None = None) -> dict:
+        """
+        Pick face per product in one query: the primary active assignment, else the first active one.
+        Products without a location are missing from the result.
+        """
+        if not product_ids:
+            return {}
+        stmt = (
+            select(ProductLocation.product_id, Location)
+            .join(Location, Location.id == ProductLocation.location_id)
+            .where(ProductLocation.product_id.in_(product_ids), Location.is_active == True)
+            .order_by(ProductLocation.is_primary.desc(), Location.id)
+        )
+        if warehouse_id is not None:
+            stmt = stmt.where(Location.warehouse_id == warehouse_id)
+
+        locations = {}
+        for product_id, location in (await self.db.execute(stmt)).all():
+            locations.setdefault(product_id, location)
+        return locations
@@ -0,0 +1,142 @@
+import math
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, case
+from modules.inventory.domain.models import StockMovement, StockMovementType
+
+# Rolling windows (days) used for sales velocity
+VELOCITY_WINDOWS = (7, 30, 90)
+# Blend weights: recent demand dominates, longer windows damp spikes
+VELOCITY_WEIGHTS = {7: 0.5, 30: 0.3, 90: 0.2}
+
+# Signed stock delta per movement (same convention as /inventory/stock)
+signed_qty = case(
+    (StockMovement.type == StockMovementType.IN.value, StockMovement.qty),
+    (StockMovement.type == StockMovementType.ADJUST.value, StockMovement.qty),
+    (StockMovement.type == StockMovementType.OUT.value, -StockMovement.qty),
+    (StockMovement.type == StockMovementType.COMMIT.value, -StockMovement.qty),
+    else_=0
+)
+
+def blended_velocity(units: dict) -> float:
+    """Daily units sold, blending the 7/30/90-day windows. `units` maps window -> units sold."""
+    return sum(VELOCITY_WEIGHTS[w] * (units.get(w, 0.0) / w) for w in VELOCITY_WINDOWS)
+
+def plan_replenishment(stock: float, units: dict, min_stock_level: float | None,
+                       lead_time_days: int, coverage_days: int, safety_days: int) -> dict:
+    """
+    Days of cover and reorder suggestion for one product/warehouse.
+    Products without sales in the longest window fall back to the static `min_stock_level`.
+    """
+    velocity = blended_velocity(units)
+    days_of_cover = stock / velocity if velocity > 0 else None
+
+    if units.get(VELOCITY_WINDOWS[-1], 0.0) > 0:
+        reorder_point = velocity * (lead_time_days + safety_days)
+        target_stock = velocity * (lead_time_days + safety_days + coverage_days)
+    else:
+        reorder_point = min_stock_level if min_stock_level is not None else 10.0
+        target_stock = reorder_point
+
+    needs_reorder = stock <= reorder_point
+    suggested_qty = max(0, math.ceil(target_stock - stock)) if needs_reorder else 0
+
+    return {
+        "daily_velocity": velocity,
+        "days_of_cover": days_of_cover,
+        "reorder_point": reorder_point,
+        "needs_reorder": needs_reorder,
+        "suggested_qty": suggested_qty,
+    }
+
+class ReplenishmentService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _units_sold(self, now: datetime, warehouse_id: int | None):
+        """Units sold per (product, warehouse) for every window, in a single pass over the daily rollup."""
+        from modules.sales.domain.models import ProductSalesDaily
+        from modules.sales.application.rollup_service import SalesRollupService
+
+        today = await SalesRollupService(self.db).local_day(now)
+        # Window w covers the last w local days, today included
+        window_sums = [
+            func.sum(case(
+                (ProductSalesDaily.day > today - timedelta(days=w), ProductSalesDaily.quantity),
+                else_=0
+            )).label(f"units_{w}")
+            for w in VELOCITY_WINDOWS
+        ]
+        stmt = (
+            select(ProductSalesDaily.product_id, ProductSalesDaily.warehouse_id, *window_sums)
+            .where(ProductSalesDaily.day > today - timedelta(days=max(VELOCITY_WINDOWS)))
+            .group_by(ProductSalesDaily.product_id, ProductSalesDaily.warehouse_id)
+        )
+        if warehouse_id is not None:
+            stmt = stmt.where(ProductSalesDaily.warehouse_id == warehouse_id)
+
+        rows = (await self.db.execute(stmt)).all()
+        return {
+            (r.product_id, r.warehouse_id): {w: float(getattr(r, f"units_{w}") or 0.0) for w in VELOCITY_WINDOWS}
+            for r in rows
+        }
+
+    async def _stock_levels(self, warehouse_id: int | None):
+        stmt = (
+            select(StockMovement.product_id, StockMovement.warehouse_id, func.sum(signed_qty).label("quantity"))
+            .group_by(StockMovement.product_id, StockMovement.warehouse_id)
+        )
+        if warehouse_id is not None:
+            stmt = stmt.where(StockMovement.warehouse_id == warehouse_id)
+        rows = (await self.db.execute(stmt)).all()
+        return {(r.product_id, r.warehouse_id): float(r.quantity or 0.0) for r in rows}
+
+    async def get_report(self, warehouse_id: int | None = None, lead_time_days: int = 7,
+                         coverage_days: int = 30, safety_days: int = 3,
+                         only_reorder: bool = False, now: datetime | None = None):
+        from modules.catalog.domain.models import Product
+
+        now = now or datetime.utcnow()
+        units = await self._units_sold(now, warehouse_id)
+        stock = await self._stock_levels(warehouse_id)
+
+        product_rows = (await self.db.execute(
+            select(Product.id, Product.name, Product.sku, Product.min_stock_level)
+            .where(func.coalesce(Product.is_inventory_tracked, True) == True)
+        )).all()
+        products = {r.id: r for r in product_rows}
+
+        report = []
+        for key in stock.keys() | units.keys():
+            product_id, wh_id = key
+            product = products.get(product_id)
+            if not product:
+                continue  # Untracked or deleted product
+
+            plan = plan_replenishment(
+                stock=stock.get(key, 0.0),
+                units=units.get(key, {}),
+                min_stock_level=product.min_stock_level,
+                lead_time_days=lead_time_days,
+                coverage_days=coverage_days,
+                safety_days=safety_days,
+            )
+            if only_reorder and not plan["needs_reorder"]:
+                continue
+
+            sold = units.get(key, {})
+            report.append({
+                "product_id": product_id,
+                "warehouse_id": wh_id,
+                "name": product.name,
+                "sku": product.sku,
+                "stock": stock.get(key, 0.0),
+                "units_7d": sold.get(7, 0.0),
+                "units_30d": sold.get(30, 0.0),
+                "units_90d": sold.get(90, 0.0),
+                **plan,
+            })
+
+        # Most urgent first; products that do not sell (no cover figure) go last
+        report.sort(key=lambda r: (r["days_of_cover"] is None, r["days_of_cover"] or 0.0))
+        return report
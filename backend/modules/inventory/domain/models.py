@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Boolean, Float, ForeignKey, DateTime, Enum, UniqueConstraint
 from sqlalchemy.orm import relationship
 from core.database import Base
 from datetime import datetime
@@ -19,6 +19,37 @@ class Warehouse(Base):
     name = Column(String, unique=True, index=True, nullable=False)
     is_default = Column(Boolean, default=False)
 
+# Storage position inside a warehouse; the aisle/rack/level/bin tuple drives pick-path ordering
+class Location(Base):
+    __tablename__ = "locations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    warehouse_id = Column(Integer, ForeignKey("warehouses.id"), nullable=False, index=True)
+    code = Column(String, nullable=False) # Label printed on the bin, e.g. "A03-R12-L2-B4"
+    aisle = Column(Integer, nullable=False)
+    rack = Column(Integer, nullable=False, default=0) # Position along the aisle
+    level = Column(Integer, nullable=False, default=0)
+    bin = Column(String, nullable=True)
+    x = Column(Float, nullable=True) # Optional floor coordinates (meters); enable nearest-neighbor routing
+    y = Column(Float, nullable=True)
+    is_active = Column(Boolean, default=True)
+
+    __table_args__ = (
+        UniqueConstraint("warehouse_id", "code", name="uq_locations_warehouse_code"),
+    )
+
+class ProductLocation(Base):
+    __tablename__ = "product_locations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
+    location_id = Column(Integer, ForeignKey("locations.id"), nullable=False, index=True)
+    is_primary = Column(Boolean, default=True) # Pick face; other assignments are overflow/reserve
+
+    __table_args__ = (
+        UniqueConstraint("product_id", "location_id", name="uq_product_locations_product_location"),
+    )
+
 class Batch(Base):
     __tablename__ = "batches"
 
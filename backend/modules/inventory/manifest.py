@@ -5,5 +5,5 @@ from .domain import models
 module = Module(
     name="inventory",
     router=router,
-    models=[models.Warehouse, models.Batch, models.StockMovement]
+    models=[models.Warehouse, models.Location, models.ProductLocation, models.Batch, models.StockMovement]
 )
@@ -4,7 +4,7 @@ from sqlalchemy import select
 from core.database import get_db
 from modules.invoicing.domain.models import Document, DocumentStatus
 from modules.sales.domain.models import Sale
-from modules.inventory.application.service import StockService
+from modules.invoicing.application.service import InvoicingService, AlreadyInvoicedError
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/documents", tags=["Invoicing"])
@@ -17,55 +17,14 @@ async def issue_document(data: IssueDocumentRequest, db: AsyncSession = Depends(
     sale = await db.get(Sale, data.sale_id)
     if not sale:
         raise HTTPException(status_code=404, detail="Sale not found")
-    
-    # Create Document
-    # Calculate total from sale items (simplified)
-    # In a real app, we might recalculate or use stored total
-    total = sum(item.qty * item.price for item in sale.items)
-    
-    # Fetch current store settings for snapshot
-    from modules.admin.domain.models import SystemSetting
-    
-    settings_stmt = select(SystemSetting).where(SystemSetting.key.in_([
-        'store_name', 'store_address', 'store_cuit', 'store_iva_status'
-    ]))
-    settings_res = await db.execute(settings_stmt)
-    settings_dict = {s.key: s.value for s in settings_res.scalars().all()}
-    
-    doc = Document(
-        sale_id=sale.id,
-        status=DocumentStatus.ISSUED.value,
-        total=total,
-        store_name=settings_dict.get('store_name', ''),
-        store_address=settings_dict.get('store_address', ''),
-        store_cuit=settings_dict.get('store_cuit', ''),
-        store_iva_status=settings_dict.get('store_iva_status', '')
-    )
-    db.add(doc)
-    await db.flush()
 
-    # Commit Stock using Inventory Service
-    stock_service = StockService(db)
-    for item in sale.items:
-        await stock_service.commit_stock(
-            product_id=item.product_id,
-            warehouse_id=sale.warehouse_id,
-            qty=item.qty,
-            reference_id=f"DOC-{doc.id}"
-        )
-    
-    # Update Accounts Receivable if customer exists
-    if sale.customer_id:
-        from modules.accounts_receivable.application.service import AccountService
-        account_service = AccountService(db)
-        await account_service.posting_invoice(
-            customer_id=sale.customer_id,
-            amount=total,
-            document_id=doc.id
-        )
+    try:
+        doc = await InvoicingService(db).issue_for_sale(sale)
+    except AlreadyInvoicedError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
     await db.commit()
-    return {"status": DocumentStatus.ISSUED.value, "document_id": doc.id, "total": total}
+    return {"status": DocumentStatus.ISSUED.value, "document_id": doc.id, "total": doc.total}
 
 @router.get("/")
 async def list_documents(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
@@ -75,18 +34,18 @@ async def list_documents(skip: int = 0, limit: int = 100, db: AsyncSession = Dep
 
 @router.get("/{document_id}")
 async def get_document(document_id: int, db: AsyncSession = Depends(get_db)):
-    # In a real app, this would return PDF data or full details
-    # For now, we return the document meta + linked sale items for rendering
+    # Document meta + its billed lines for rendering
     stmt = select(Document).where(Document.id == document_id)
     result = await db.execute(stmt)
     doc = result.scalar()
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    # Fetch sale to get items (quick workaround, ideally Document has its own snapshot)
     sale = await db.get(Sale, doc.sale_id)
+    # Older documents have no stored lines: they billed the whole sale
+    items = doc.items or (sale.items if sale else [])
     return {
         "document": doc,
-        "items": sale.items if sale else [],
+        "items": items,
         "customer_id": sale.customer_id if sale else None
     }
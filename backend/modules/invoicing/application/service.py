@@ -0,0 +1,91 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert
+from modules.invoicing.domain.models import Document, DocumentItem, DocumentStatus
+from modules.inventory.domain.models import StockMovement, StockMovementType
+
+STORE_SNAPSHOT_KEYS = ('store_name', 'store_address', 'store_cuit', 'store_iva_status')
+
+class AlreadyInvoicedError(Exception):
+    def __init__(self, document_id: int):
+        super().__init__(f"Sale already invoiced (document {document_id})")
+        self.document_id = document_id
+
+def billed_quantities(items, quantities: dict | None) -> list:
+    """
+    (item, qty to bill) per sale item. `quantities` (product id -> units, e.g. what was picked)
+    caps the billed units; it is consumed in item order when a product appears on several lines.
+    """
+    if quantities is None:
+        return [(item, item.qty) for item in items]
+    remaining = dict(quantities)
+    billed = []
+    for item in items:
+        qty = min(item.qty, max(remaining.get(item.product_id, 0), 0))
+        remaining[item.product_id] = remaining.get(item.product_id, 0) - qty
+        billed.append((item, qty))
+    return billed
+
+class InvoicingService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def issued_document_id(self, sale_id: int) -> int | None:
+        return (await self.db.execute(
+            select(Document.id).where(Document.sale_id == sale_id, Document.status == DocumentStatus.ISSUED.value)
+        )).scalar()
+
+    async def issue_for_sale(self, sale, quantities: dict | None = None, stock_committed: bool = False) -> Document:
+        """
+        Issues the fiscal document of a sale (flushed, not committed) with its billed lines.
+        `quantities` bills only those units (pick completion); `stock_committed` skips the
+        COMMIT movements when the caller already took the stock out.
+        Raises AlreadyInvoicedError if the sale has an issued document.
+        """
+        existing = await self.issued_document_id(sale.id)
+        if existing:
+            raise AlreadyInvoicedError(existing)
+
+        billed = billed_quantities(sale.items, quantities)
+        total = sum(qty * (item.price or 0.0) for item, qty in billed)
+
+        # Fiscal snapshot of the current store settings
+        from modules.admin.domain.models import SystemSetting
+
+        settings_res = await self.db.execute(select(SystemSetting).where(SystemSetting.key.in_(STORE_SNAPSHOT_KEYS)))
+        settings_dict = {s.key: s.value for s in settings_res.scalars().all()}
+
+        doc = Document(
+            sale_id=sale.id,
+            status=DocumentStatus.ISSUED.value,
+            total=total,
+            **{key: settings_dict.get(key, '') for key in STORE_SNAPSHOT_KEYS}
+        )
+        self.db.add(doc)
+        await self.db.flush()
+
+        lines = [
+            {"document_id": doc.id, "sale_item_id": item.id, "product_id": item.product_id,
+             "qty": qty, "price": item.price or 0.0}
+            for item, qty in billed if qty > 0
+        ]
+        if lines:
+            await self.db.execute(insert(DocumentItem), lines)
+
+        if not stock_committed:
+            movements = [
+                {"product_id": item.product_id, "warehouse_id": sale.warehouse_id, "qty": qty,
+                 "type": StockMovementType.COMMIT.value, "reference_id": f"DOC-{doc.id}"}
+                for item, qty in billed if qty > 0
+            ]
+            if movements:
+                await self.db.execute(insert(StockMovement), movements)
+
+        # Update Accounts Receivable if customer exists
+        if sale.customer_id:
+            from modules.accounts_receivable.application.service import AccountService
+            await AccountService(self.db).posting_invoice(
+                customer_id=sale.customer_id,
+                amount=total,
+                document_id=doc.id
+            )
+        return doc
@@ -1,4 +1,5 @@
 from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Enum
+from sqlalchemy.orm import relationship
 from core.database import Base
 from datetime import datetime
 import enum
@@ -23,3 +24,19 @@ class Document(Base):
     store_iva_status = Column(String, nullable=True)
     
     created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Billed lines (documents issued before lines were stored have none: they billed the whole sale)
+    items = relationship("DocumentItem", back_populates="document", lazy="selectin", order_by="DocumentItem.id")
+
+class DocumentItem(Base):
+    """What a document billed per sale line: a short-picked sale bills fewer units than it sold."""
+    __tablename__ = "document_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False, index=True)
+    sale_item_id = Column(Integer, ForeignKey("sale_items.id"), nullable=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    qty = Column(Float, nullable=False)
+    price = Column(Float, default=0.0) # Unit price at issuance
+
+    document = relationship("Document", back_populates="items")
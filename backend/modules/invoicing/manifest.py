@@ -5,5 +5,5 @@ from .domain import models
 module = Module(
     name="invoicing",
     router=router,
-    models=[models.Document]
+    models=[models.Document, models.DocumentItem]
 )
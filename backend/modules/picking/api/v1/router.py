@@ -1,12 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from core.database import get_db
-from modules.picking.domain.models import PickTask, PickScanEvent, PickTaskStatus
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from core.database import get_db, SessionLocal
+from core.config import get_settings
+from modules.picking.domain.models import PickTask, PickTaskStatus, PickScanResult, PickWave, PickWaveOrder, PickWaveStatus
 from modules.sales.domain.models import Sale, SaleStatus
-from modules.catalog.domain.models import Product, ProductBarcode
-from pydantic import BaseModel
-from typing import List
+from modules.catalog.application.barcode_cache import barcode_index
+from modules.picking.application.scan_context import scan_contexts
+from modules.picking.application.scan_channel import ScanChannel
+from modules.picking.application.wave_service import WaveService
+from modules.picking.application.completion_service import PickCompletionService, ShortPickError
+from modules.picking.application.metrics_service import PickMetricsService
+from modules.picking.application.route_optimizer import route_lines
+from modules.inventory.application.location_service import LocationService
+from modules.catalog.domain.models import Product
+from modules.iam.api.v1.router import get_user_from_token, get_current_user, RoleChecker
+from modules.iam.domain.models import User, UserRole
+from pydantic import BaseModel, Field
+from typing import List, Literal
 
 router = APIRouter(prefix="/picking", tags=["Picking"])
 
@@ -29,8 +44,11 @@ async def create_pick_task(sale_id: int, db: AsyncSession = Depends(get_db)):
     existing = await db.execute(select(PickTask).where(PickTask.sale_id == sale_id))
     if existing.scalar_one_or_none():
         raise HTTPException(status_code=409, detail="Picking task already exists for this sale")
+    in_wave = await db.execute(select(PickWaveOrder.wave_id).where(PickWaveOrder.sale_id == sale_id))
+    if in_wave.first():
+        raise HTTPException(status_code=409, detail="Sale is already being picked in a wave")
 
-    task = PickTask(sale_id=sale_id, status=PickTaskStatus.PENDING.value)
+    task = PickTask(sale_id=sale_id, status=PickTaskStatus.PENDING.value, scan_counts="{}", scanned_total=0)
     db.add(task)
     await db.commit()
     await db.refresh(task)
@@ -45,58 +63,376 @@ class ScanResponse(BaseModel):
     status: str # MATCH, MISMATCH, NOT_FOUND
     product_name: str | None = None
     scanned_qty: int
-    required_qty: int
+    required_qty: float
 
 @router.post("/scan", response_model=ScanResponse)
-async def register_scan(data: ScanRequest, db: AsyncSession = Depends(get_db)):
-    task = await db.get(PickTask, data.task_id)
-    if not task:
+async def register_scan(data: ScanRequest, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    # 1. Task context (required units + counters), cached after the first scan
+    ctx = await scan_contexts.get(db, data.task_id)
+    if not ctx:
         raise HTTPException(status_code=404, detail="Pick task not found")
+
+    if ctx.status == PickTaskStatus.COMPLETED.value:
+        raise HTTPException(status_code=409, detail="Pick task already completed")
+
+    # 2. Lookup Barcode (in-process index, one query on a miss)
+    product = await barcode_index.resolve(db, data.barcode)
     
-    # 1. Lookup Barcode
-    barcode_entry = await db.execute(select(ProductBarcode).where(ProductBarcode.barcode == data.barcode))
-    barcode_row = barcode_entry.scalar_one_or_none()
-    
-    if not barcode_row:
+    if not product:
+        await scan_contexts.record_rejects(db, ctx.task_id, [(None, data.barcode, datetime.utcnow(), PickScanResult.NOT_FOUND.value)], user_id=current_user.id)
         return {"status": "NOT_FOUND", "scanned_qty": 0, "required_qty": 0}
     
-    product = await db.get(Product, barcode_row.product_id)
-    
-    # 2. Check if product is in Sale
-    sale = await db.get(Sale, task.sale_id)
-    # Lazy load items if needed (already configured joined usually)
-    
-    target_item = next((item for item in sale.items if item.product_id == product.id), None)
-    
-    if not target_item:
+    # 3. Check if product is in Sale
+    if product.id not in ctx.required:
+        await scan_contexts.record_rejects(db, ctx.task_id, [(product.id, data.barcode, datetime.utcnow(), PickScanResult.MISMATCH.value)], user_id=current_user.id)
         return {"status": "MISMATCH", "product_name": product.name, "scanned_qty": 0, "required_qty": 0}
 
-    # 3. Register Scan Event
-    event = PickScanEvent(
-        task_id=task.id,
-        barcode_scanned=data.barcode,
-        product_id=product.id
-    )
-    db.add(event)
-    
-    # Update Task Status
-    if task.status == PickTaskStatus.PENDING.value:
-        task.status = PickTaskStatus.IN_PROGRESS.value
-    
-    await db.commit()
-    
-    # 4. Calculate Progress
-    # Count how many times this product has been scanned in this task
-    scan_count_res = await db.execute(
-        select(func.count(PickScanEvent.id))
-        .where(PickScanEvent.task_id == task.id)
-        .where(PickScanEvent.product_id == product.id)
-    )
-    scanned_qty = scan_count_res.scalar()
+    # 4. Register Scan Event + counters (one insert, one version-checked update)
+    try:
+        await scan_contexts.record_scan(db, ctx, product.id, data.barcode, user_id=current_user.id)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Pick task not found")
+    except (ValueError, RuntimeError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
+    scanned_qty, required_qty = ctx.progress(product.id)
     return {
         "status": "MATCH",
         "product_name": product.name,
         "scanned_qty": scanned_qty,
-        "required_qty": int(target_item.qty)
+        "required_qty": required_qty
     }
+
+class ProductProgress(BaseModel):
+    product_id: int
+    scanned_qty: int
+    required_qty: float
+
+class PickTaskProgress(BaseModel):
+    id: int
+    sale_id: int
+    status: str
+    scan_count: int
+    items: List[ProductProgress]
+
+class PickListLine(BaseModel):
+    product_id: int
+    sku: str | None = None
+    name: str
+    location: str | None = None
+    required_qty: float
+    scanned_qty: int
+
+class PickList(BaseModel):
+    id: int
+    sale_id: int
+    status: str
+    lines: List[PickListLine] # Walking order
+
+@router.get("/tasks/{task_id}/progress", response_model=PickTaskProgress)
+async def get_pick_task_progress(task_id: int, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    ctx = await scan_contexts.get(db, task_id)
+    if not ctx:
+        raise HTTPException(status_code=404, detail="Pick task not found")
+    return {
+        "id": ctx.task_id,
+        "sale_id": ctx.sale_id,
+        "status": ctx.status,
+        "scan_count": sum(ctx.scanned.values()),
+        "items": [
+            {"product_id": pid, "scanned_qty": ctx.scanned.get(pid, 0), "required_qty": qty}
+            for pid, qty in ctx.required.items()
+        ],
+    }
+
+class PickedLine(BaseModel):
+    product_id: int
+    qty: float
+
+class ShortLine(BaseModel):
+    product_id: int
+    required_qty: float
+    short_qty: float
+
+class PickCompletion(BaseModel):
+    id: int
+    sale_id: int
+    status: str
+    picked: List[PickedLine]
+    shorts: List[ShortLine]
+    document_id: int | None = None
+    invoiced: bool # False when the sale had been invoiced before picking, or nothing was picked
+
+@router.post("/tasks/{task_id}/complete", response_model=PickCompletion)
+async def complete_pick_task(task_id: int, allow_short: bool = True, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    Closes the task: records short picks, commits the picked stock, releases the reservation
+    of the shorts and invoices the picked units. `allow_short=false` refuses to close with shorts.
+    """
+    try:
+        return await PickCompletionService(db).complete(task_id, allow_short=allow_short)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Pick task not found")
+    except ShortPickError as e:
+        raise HTTPException(status_code=409, detail={
+            "message": str(e),
+            "shorts": [{"product_id": pid, "short_qty": qty} for pid, qty in e.shorts.items()],
+        })
+    except (ValueError, RuntimeError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.get("/metrics")
+async def get_picking_metrics(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    user_id: int | None = None,
+    group_by: Literal["user", "hour"] = "user",
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Picker throughput (lines/units per hour, mismatch rate, time between scans) from the hourly
+    rollup; defaults to the last 24 hours. Run /picking/metrics/refresh to fold in new scans.
+    """
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(hours=24)
+    return await PickMetricsService(db).get_metrics(start, end, user_id=user_id, group_by=group_by)
+
+@router.post("/metrics/refresh", dependencies=[Depends(RoleChecker([UserRole.ADMIN, UserRole.SUPERVISOR]))])
+async def refresh_picking_metrics(db: AsyncSession = Depends(get_db)):
+    """
+    Rolls new scan events into the hourly metrics and prunes rolled-up events past the retention window.
+    Intended to be called periodically (cron / scheduler).
+    """
+    return await PickMetricsService(db).refresh()
+
+@router.get("/tasks/{task_id}/pick-list", response_model=PickList)
+async def get_pick_list(task_id: int, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Lines of the task in walking order (serpentine over aisles, or nearest neighbor when bins have coordinates)."""
+    ctx = await scan_contexts.get(db, task_id)
+    if not ctx:
+        raise HTTPException(status_code=404, detail="Pick task not found")
+    sale = await db.get(Sale, ctx.sale_id)
+    products = (await db.execute(
+        select(Product.id, Product.sku, Product.name).where(Product.id.in_(list(ctx.required))).order_by(Product.sku)
+    )).all()
+    lines = [
+        {"product_id": p.id, "sku": p.sku, "name": p.name,
+         "required_qty": ctx.required[p.id], "scanned_qty": ctx.scanned.get(p.id, 0)}
+        for p in products
+    ]
+    locations = await LocationService(db).pick_locations(list(ctx.required), sale.warehouse_id)
+    return {"id": ctx.task_id, "sale_id": ctx.sale_id, "status": ctx.status, "lines": route_lines(lines, locations)}
+
+@router.websocket("/tasks/{task_id}/ws")
+async def picking_scan_socket(websocket: WebSocket, task_id: int, token: str | None = None):
+    """
+    Scan stream for handheld terminals. Authenticate once with `?token=<jwt>` (or an
+    Authorization: Bearer header), then send barcodes as text frames (plain or
+    {"barcode": ..., "seq": ...}). Every scan is answered immediately; scans are
+    persisted in batches every PICK_WS_FLUSH_MS or PICK_WS_FLUSH_BATCH scans.
+    """
+    settings = get_settings()
+    if token is None:
+        auth = websocket.headers.get("authorization", "")
+        token = auth[7:] if auth.lower().startswith("bearer ") else None
+
+    async with SessionLocal() as db:
+        user = await get_user_from_token(token, db)
+        if user is None:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        ctx = await scan_contexts.get(db, task_id)
+        if ctx is None:
+            await websocket.close(code=4404)
+            return
+        if ctx.status == PickTaskStatus.COMPLETED.value:
+            await websocket.close(code=4409)
+            return
+
+        await websocket.accept()
+        channel = ScanChannel(db, ctx, user_id=user.id)
+        interval = settings.PICK_WS_FLUSH_MS / 1000.0
+        loop = asyncio.get_running_loop()
+        deadline = None
+
+        async def flush():
+            nonlocal deadline
+            try:
+                persisted = await channel.flush()
+            except LookupError:
+                await websocket.send_json({"type": "error", "detail": "Pick task not found"})
+                raise WebSocketDisconnect(code=4404)
+            except ValueError as e:
+                # Completed from another terminal: the queued scans are dropped
+                channel.pending.clear()
+                channel.rejects.clear()
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                raise WebSocketDisconnect(code=4409)
+            except (SQLAlchemyError, RuntimeError):
+                # Rolled back and kept in the queue; retried on the next tick
+                deadline = loop.time() + interval
+                return
+            deadline = None
+            if persisted:
+                await websocket.send_json({"type": "flushed", "persisted": persisted, "scan_count": sum(ctx.scanned.values())})
+
+        try:
+            while True:
+                timeout = None if deadline is None else max(0.0, deadline - loop.time())
+                try:
+                    message = await asyncio.wait_for(websocket.receive_text(), timeout)
+                except asyncio.TimeoutError:
+                    await flush()
+                    continue
+
+                seq = None
+                barcode = message.strip()
+                if barcode.startswith("{"):
+                    try:
+                        payload = json.loads(barcode)
+                        barcode, seq = str(payload.get("barcode", "")).strip(), payload.get("seq")
+                    except ValueError:
+                        barcode = ""
+                if not barcode:
+                    await websocket.send_json({"type": "error", "seq": seq, "detail": "Empty or malformed scan"})
+                    continue
+
+                reply = await channel.handle(barcode)
+                await websocket.send_json({"type": "scan", "seq": seq, **reply})
+                if channel.queued and deadline is None:
+                    deadline = loop.time() + interval
+                if len(channel.pending) >= settings.PICK_WS_FLUSH_BATCH:
+                    await flush()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            if channel.queued:
+                # Shielded: the server may cancel the handler once the peer is gone
+                try:
+                    await asyncio.shield(channel.flush())
+                except (SQLAlchemyError, LookupError, ValueError, RuntimeError):
+                    pass
+
+class WaveCreate(BaseModel):
+    max_orders: int = Field(50, ge=1, le=1000)
+    warehouse_id: int # Waves never span warehouses
+    sale_ids: List[int] | None = None # Explicit selection; all of them must be eligible
+
+class WaveLine(BaseModel):
+    product_id: int
+    sku: str | None = None
+    name: str
+    location: str | None = None
+    required_qty: float
+    picked_qty: float
+
+class WaveOrder(BaseModel):
+    sale_id: int
+    slot: int # Put-wall cubby
+
+class WaveRead(BaseModel):
+    id: int
+    warehouse_id: int | None = None
+    status: str
+    created_at: datetime
+    completed_at: datetime | None = None
+    lines: List[WaveLine]
+    orders: List[WaveOrder]
+
+class WaveScanRequest(BaseModel):
+    barcode: str
+
+class WavePickResponse(BaseModel):
+    status: str # MATCH, MISMATCH, OVERPICK, NOT_FOUND
+    product_name: str | None = None
+    picked_qty: float = 0
+    required_qty: float = 0
+
+class WaveSortResponse(BaseModel):
+    status: str # SORTED, MISMATCH, NOT_PICKED, NO_DEMAND, NOT_FOUND
+    product_name: str | None = None
+    sale_id: int | None = None
+    slot: int | None = None
+    order_qty: float | None = None
+    sorted_qty: float | None = None
+    wave_completed: bool = False
+
+@router.post("/waves", response_model=WaveRead)
+async def create_wave(data: WaveCreate, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Groups confirmed sales of one warehouse without a pick task into a wave with one consolidated pick list."""
+    service = WaveService(db)
+    try:
+        wave_id = await service.create_wave(data.warehouse_id, max_orders=data.max_orders, sale_ids=data.sale_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return await service.get_wave(wave_id)
+
+@router.get("/waves/{wave_id}", response_model=WaveRead)
+async def get_wave(wave_id: int, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    wave = await WaveService(db).get_wave(wave_id)
+    if not wave:
+        raise HTTPException(status_code=404, detail="Wave not found")
+    return wave
+
+async def _wave_product(db: AsyncSession, wave_id: int, barcode: str):
+    wave = await db.get(PickWave, wave_id)
+    if not wave:
+        raise HTTPException(status_code=404, detail="Wave not found")
+    if wave.status == PickWaveStatus.COMPLETED.value:
+        raise HTTPException(status_code=409, detail="Wave already completed")
+    return await barcode_index.resolve(db, barcode)
+
+@router.post("/waves/{wave_id}/scan", response_model=WavePickResponse)
+async def scan_wave_pick(wave_id: int, data: WaveScanRequest, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Pick step: one unit taken from the shelf for the whole wave."""
+    product = await _wave_product(db, wave_id, data.barcode)
+    result = await WaveService(db).register_pick(wave_id, product.id if product else None, data.barcode, user_id=current_user.id)
+    return {"product_name": product.name if product else None, **result}
+
+@router.post("/waves/{wave_id}/sort", response_model=WaveSortResponse)
+async def scan_wave_sort(wave_id: int, data: WaveScanRequest, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Put-wall step: tells the operator which slot the scanned unit goes to."""
+    product = await _wave_product(db, wave_id, data.barcode)
+    if not product:
+        return {"status": "NOT_FOUND"}
+    try:
+        result = await WaveService(db).sort_unit(wave_id, product.id)
+    except (ValueError, RuntimeError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"product_name": product.name, **result}
+
+class WaveOrderCompletion(BaseModel):
+    sale_id: int
+    shorts: List[ShortLine]
+    document_id: int | None = None
+    invoiced: bool
+
+class WaveCompletion(BaseModel):
+    id: int
+    status: str
+    orders: List[WaveOrderCompletion]
+
+@router.post("/waves/{wave_id}/complete", response_model=WaveCompletion)
+async def complete_wave(wave_id: int, allow_short: bool = True, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    Closes a wave with units still missing (a fully sorted wave completes by itself): each sale
+    is billed for what reached its slot and the rest is recorded as short and released.
+    `allow_short=false` refuses to close with shorts.
+    """
+    try:
+        return await WaveService(db).complete(wave_id, allow_short=allow_short)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Wave not found")
+    except ShortPickError as e:
+        raise HTTPException(status_code=409, detail={
+            "message": str(e),
+            "shorts": [
+                {"sale_id": sale_id, "product_id": pid, "short_qty": qty}
+                for sale_id, shorts in e.shorts.items() for pid, qty in shorts.items()
+            ],
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
@@ -0,0 +1,136 @@
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, update, func
+from modules.picking.domain.models import PickTask, PickTaskStatus, PickShortPick
+from modules.picking.application.scan_context import scan_contexts
+from modules.inventory.domain.models import StockMovement, StockMovementType
+
+def reconcile(required: dict, scanned: dict) -> tuple:
+    """
+    Splits required units (product id -> qty) into picked and short quantities.
+    Scans above the requirement are not billed nor taken from stock.
+    """
+    picked = {pid: min(qty, scanned.get(pid, 0)) for pid, qty in required.items()}
+    shorts = {pid: qty - picked[pid] for pid, qty in required.items() if picked[pid] < qty}
+    return picked, shorts
+
+class ShortPickError(Exception):
+    """`shorts`: product id -> missing units (a wave keys them by sale id first)."""
+    def __init__(self, shorts: dict):
+        super().__init__("Some required units were not picked")
+        self.shorts = shorts
+
+class PickCompletionService:
+    """
+    Closes a pick task from its aggregated scan counters (no per-product COUNT over the
+    event log): records short picks, takes the picked units out of stock, releases the
+    reservation of the shorts and issues the invoice for the picked units, all in one
+    transaction. Nothing picked means nothing to bill: no invoice is issued.
+    Waves close each of their sales through `close_sale` as well.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def required_units(self, sale_ids) -> tuple:
+        """({sale_id: {product_id: units}}, tracked product ids) from the sale lines."""
+        from modules.sales.domain.models import SaleItem
+        from modules.catalog.domain.models import Product
+
+        rows = (await self.db.execute(
+            select(SaleItem.sale_id, SaleItem.product_id, func.sum(SaleItem.qty), Product.is_inventory_tracked)
+            .join(Product, Product.id == SaleItem.product_id)
+            .where(SaleItem.sale_id.in_(sale_ids))
+            .group_by(SaleItem.sale_id, SaleItem.product_id, Product.is_inventory_tracked)
+        )).all()
+        required = {sale_id: {} for sale_id in sale_ids}
+        for sale_id, pid, qty, _ in rows:
+            required[sale_id][pid] = qty
+        return required, {pid for _, pid, _, is_tracked in rows if is_tracked}
+
+    async def close_sale(self, sale, required: dict, picked: dict, shorts: dict, tracked: set,
+                         source: dict, reference: str, now: datetime) -> tuple:
+        """
+        Short picks, stock movements and invoice of one picked sale (flushed, not committed).
+        `source` tags the short picks ({"task_id": ...} or {"wave_id": ...}) and `reference`
+        the COMMIT movements. Returns (document id, invoiced now).
+        """
+        from modules.invoicing.application.service import InvoicingService
+
+        if shorts:
+            await self.db.execute(insert(PickShortPick), [
+                {**source, "sale_id": sale.id, "product_id": pid, "required_qty": required[pid],
+                 "picked_qty": picked[pid], "short_qty": qty, "created_at": now}
+                for pid, qty in shorts.items()
+            ])
+
+        invoicing = InvoicingService(self.db)
+        document_id = await invoicing.issued_document_id(sale.id)
+        movements = []
+        if document_id is None:
+            # Not invoiced yet: the pick takes the stock out (the invoice below skips its COMMIT).
+            # A sale invoiced before picking had its stock taken out by that document.
+            movements += [
+                {"product_id": pid, "warehouse_id": sale.warehouse_id, "qty": qty,
+                 "type": StockMovementType.COMMIT.value, "reference_id": reference, "created_at": now}
+                for pid, qty in picked.items() if qty > 0 and pid in tracked
+            ]
+        # Same reference as the RESERVE written at confirmation
+        movements += [
+            {"product_id": pid, "warehouse_id": sale.warehouse_id, "qty": qty,
+             "type": StockMovementType.RELEASE.value, "reference_id": f"SALE-{sale.id}", "created_at": now}
+            for pid, qty in shorts.items() if pid in tracked
+        ]
+        if movements:
+            await self.db.execute(insert(StockMovement), movements)
+
+        invoiced = document_id is None and any(qty > 0 for qty in picked.values())
+        if invoiced:
+            doc = await invoicing.issue_for_sale(sale, quantities=picked, stock_committed=True)
+            document_id = doc.id
+        return document_id, invoiced
+
+    async def complete(self, task_id: int, allow_short: bool = True) -> dict:
+        from modules.sales.domain.models import Sale
+
+        counters = await scan_contexts.read_counters(self.db, task_id)
+        if counters is None:
+            raise LookupError(task_id)
+        status, scanned, version = counters
+        if status == PickTaskStatus.COMPLETED.value:
+            raise ValueError("Pick task already completed")
+
+        task = await self.db.get(PickTask, task_id)
+        sale = await self.db.get(Sale, task.sale_id)
+        required, tracked = await self.required_units([sale.id])
+        required = required[sale.id]
+
+        picked, shorts = reconcile(required, scanned)
+        if shorts and not allow_short:
+            raise ShortPickError(shorts)
+
+        # Claim the task; the version check rejects scans that landed after the counters were read
+        claimed = await self.db.execute(
+            update(PickTask)
+            .where(PickTask.id == task_id, PickTask.scanned_total == version,
+                   PickTask.status != PickTaskStatus.COMPLETED.value)
+            .values(status=PickTaskStatus.COMPLETED.value)
+        )
+        if claimed.rowcount != 1:
+            await self.db.rollback()
+            raise RuntimeError(f"Pick task {task_id} changed while completing; retry")
+
+        document_id, invoiced = await self.close_sale(
+            sale, required, picked, shorts, tracked,
+            source={"task_id": task_id}, reference=f"PICK-{task_id}", now=datetime.utcnow(),
+        )
+        await self.db.commit()
+        scan_contexts.evict(task_id)
+        return {
+            "id": task_id,
+            "sale_id": sale.id,
+            "status": PickTaskStatus.COMPLETED.value,
+            "picked": [{"product_id": pid, "qty": qty} for pid, qty in picked.items()],
+            "shorts": [{"product_id": pid, "required_qty": required[pid], "short_qty": qty} for pid, qty in shorts.items()],
+            "document_id": document_id,
+            "invoiced": invoiced,
+        }
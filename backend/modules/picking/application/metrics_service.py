@@ -0,0 +1,189 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, exists, func, and_, or_, tuple_
+from sqlalchemy.orm import aliased
+from core.config import get_settings
+from core.database import dialect_insert
+from modules.picking.domain.models import PickScanEvent, PickScanResult, PickTask, PickMetricsHourly
+from modules.sales.application.checkpoint_service import CheckpointService
+
+CHECKPOINT_NAME = "pick_metrics_hourly"
+READ_CHUNK = 20000
+UPSERT_CHUNK = 500
+# Longer pauses between two scans of the same picker are breaks, not pick time
+IDLE_GAP_SECONDS = 600
+METRIC_FIELDS = ("scans", "units", "lines", "mismatches", "gap_seconds", "gap_count")
+
+def aggregate_events(rows, last_seen: dict) -> dict:
+    """
+    Folds (user_id, result, is_first_line, timestamp) rows, ordered by timestamp, into
+    {(hour, user_id): {metric: value}}. `last_seen` (user -> last scan time) carries the
+    time-between-scans measurement across chunks and is updated in place.
+    """
+    buckets = defaultdict(lambda: dict.fromkeys(METRIC_FIELDS, 0))
+    for user_id, result, is_first_line, at in rows:
+        user_id = user_id or 0
+        bucket = buckets[(at.replace(minute=0, second=0, microsecond=0), user_id)]
+        bucket["scans"] += 1
+        if result == PickScanResult.MATCH.value:
+            bucket["units"] += 1
+            if is_first_line:
+                bucket["lines"] += 1
+        else:
+            bucket["mismatches"] += 1
+
+        previous = last_seen.get(user_id)
+        if previous is not None:
+            gap = (at - previous).total_seconds()
+            if 0 <= gap <= IDLE_GAP_SECONDS:
+                bucket["gap_seconds"] += gap
+                bucket["gap_count"] += 1
+        last_seen[user_id] = at
+    return buckets
+
+def summarize(row: dict, active_hours: int = 1) -> dict:
+    """Derived rates for one metrics row (a bucket, or buckets summed over `active_hours`)."""
+    hours = max(active_hours, 1)
+    return {
+        **row,
+        "lines_per_hour": row["lines"] / hours,
+        "units_per_hour": row["units"] / hours,
+        "mismatch_rate": row["mismatches"] / row["scans"] if row["scans"] else 0.0,
+        "avg_seconds_between_scans": row["gap_seconds"] / row["gap_count"] if row["gap_count"] else None,
+    }
+
+class PickMetricsService:
+    """
+    Rolls pick_scan_events into pick_metrics_hourly behind a lagging timestamp watermark, then prunes
+    rolled-up events older than PICK_EVENT_RETENTION_DAYS. Reads only touch the rollup.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.checkpoints = CheckpointService(db)
+
+    def _event_rows(self, since: datetime | None, until: datetime, after: tuple | None):
+        earlier = aliased(PickScanEvent)
+        # A line is the first matched scan of a product within a task or wave (only one of them is set)
+        is_first_line = ~exists().where(
+            or_(earlier.task_id == PickScanEvent.task_id, earlier.wave_id == PickScanEvent.wave_id),
+            earlier.product_id == PickScanEvent.product_id,
+            earlier.result == PickScanResult.MATCH.value,
+            earlier.id < PickScanEvent.id,
+        )
+        stmt = (
+            select(PickScanEvent.id, PickScanEvent.user_id, PickScanEvent.result,
+                   is_first_line.label("is_first_line"), PickScanEvent.timestamp)
+            .where(PickScanEvent.timestamp <= until)
+            .order_by(PickScanEvent.timestamp, PickScanEvent.id)
+            .limit(READ_CHUNK)
+        )
+        if since is not None:
+            stmt = stmt.where(PickScanEvent.timestamp > since)
+        if after is not None:
+            # Keyset over (timestamp, id) between chunks
+            stmt = stmt.where(tuple_(PickScanEvent.timestamp, PickScanEvent.id) > after)
+        return stmt
+
+    async def _last_seen(self, since: datetime | None) -> dict:
+        """Last rolled-up scan per picker, so the first gap of this run is measured too."""
+        if since is None:
+            return {}
+        rows = (await self.db.execute(
+            select(PickScanEvent.user_id, func.max(PickScanEvent.timestamp))
+            .where(PickScanEvent.timestamp <= since,
+                   PickScanEvent.timestamp >= since - timedelta(seconds=IDLE_GAP_SECONDS))
+            .group_by(PickScanEvent.user_id)
+        )).all()
+        return {user_id or 0: at for user_id, at in rows}
+
+    async def _upsert(self, buckets: dict):
+        rows = [{"hour": hour, "user_id": user_id, **values} for (hour, user_id), values in buckets.items()]
+        for i in range(0, len(rows), UPSERT_CHUNK):
+            stmt = dialect_insert(self.db, PickMetricsHourly).values(rows[i:i + UPSERT_CHUNK])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["hour", "user_id"],
+                set_={name: getattr(PickMetricsHourly, name) + getattr(stmt.excluded, name) for name in METRIC_FIELDS},
+            )
+            await self.db.execute(stmt)
+
+    async def refresh(self, now: datetime | None = None) -> dict:
+        """
+        Rolls up events stamped in (watermark, now - PICK_METRICS_LAG_SECONDS]. Scans are
+        stamped when read and persisted in batches, so recent ones may not be visible yet;
+        the lag leaves room for those transactions to commit.
+        """
+        now = now or datetime.utcnow()
+        checkpoint = await self.checkpoints.acquire(CHECKPOINT_NAME)
+        since = checkpoint.last_processed_at
+        until = max(now - timedelta(seconds=get_settings().PICK_METRICS_LAG_SECONDS), since or datetime.min)
+
+        processed = 0
+        last_seen = await self._last_seen(since)
+        after = None
+        while True:
+            rows = (await self.db.execute(self._event_rows(since, until, after))).all()
+            if not rows:
+                break
+            await self._upsert(aggregate_events(
+                ((r.user_id, r.result, bool(r.is_first_line), r.timestamp) for r in rows), last_seen
+            ))
+            after = (rows[-1].timestamp, rows[-1].id)
+            processed += len(rows)
+        self.checkpoints.advance(checkpoint, processed_at=until, processed=processed)
+
+        pruned = await self._prune(until, now)
+        await self.db.commit()
+        return {"processed_events": processed, "rolled_up_until": until, "pruned_events": pruned}
+
+    async def _prune(self, rolled_up_until: datetime, now: datetime) -> int:
+        """
+        Deletes events already rolled up and older than the retention window. Events of tasks
+        without persisted counters are kept: the legacy counter rebuild still reads them.
+        Wave scans are only a log (the wave lines hold the counts).
+        """
+        cutoff = min(now - timedelta(days=get_settings().PICK_EVENT_RETENTION_DAYS), rolled_up_until)
+        result = await self.db.execute(
+            delete(PickScanEvent)
+            .where(
+                PickScanEvent.timestamp < cutoff,
+                or_(
+                    PickScanEvent.wave_id.isnot(None),
+                    PickScanEvent.task_id.in_(select(PickTask.id).where(PickTask.scan_counts.isnot(None))),
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount or 0
+
+    async def get_metrics(self, start: datetime, end: datetime, user_id: int | None = None,
+                          group_by: str = "user") -> list:
+        """`group_by="user"`: totals per picker over [start, end); `"hour"`: one row per picker and hour."""
+        conditions = [PickMetricsHourly.hour >= start, PickMetricsHourly.hour < end]
+        if user_id is not None:
+            conditions.append(PickMetricsHourly.user_id == user_id)
+
+        if group_by == "hour":
+            rows = (await self.db.execute(
+                select(PickMetricsHourly).where(and_(*conditions))
+                .order_by(PickMetricsHourly.hour, PickMetricsHourly.user_id)
+            )).scalars().all()
+            return [
+                summarize({"hour": r.hour, "user_id": r.user_id, **{name: getattr(r, name) or 0 for name in METRIC_FIELDS}})
+                for r in rows
+            ]
+
+        totals = [func.sum(getattr(PickMetricsHourly, name)).label(name) for name in METRIC_FIELDS]
+        rows = (await self.db.execute(
+            select(PickMetricsHourly.user_id, func.count().label("active_hours"), *totals)
+            .where(and_(*conditions))
+            .group_by(PickMetricsHourly.user_id)
+            .order_by(PickMetricsHourly.user_id)
+        )).all()
+        return [
+            summarize(
+                {"user_id": r.user_id, "active_hours": r.active_hours, **{name: getattr(r, name) or 0 for name in METRIC_FIELDS}},
+                r.active_hours,
+            )
+            for r in rows
+        ]
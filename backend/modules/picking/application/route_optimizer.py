@@ -0,0 +1,73 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class Stop:
+    key: object # Whatever the caller needs back (product id, line index...)
+    aisle: int | None # None: product has no location
+    rack: int = 0
+    level: int = 0
+    bin: str | None = None
+    x: float | None = None
+    y: float | None = None
+
+def serpentine(stops: list) -> list:
+    """
+    S-shaped route: aisles in ascending order, walking every other aisle backwards so the
+    picker leaves each aisle at the end where the next one starts. Only aisles with stops count.
+    """
+    aisles = sorted({stop.aisle for stop in stops})
+    backwards = {aisle: i % 2 == 1 for i, aisle in enumerate(aisles)}
+
+    def key(stop):
+        rack = -stop.rack if backwards[stop.aisle] else stop.rack
+        return (stop.aisle, rack, stop.level, stop.bin or "")
+
+    return sorted(stops, key=key)
+
+def _distance(a: tuple, b: tuple) -> float:
+    # Rectilinear: pickers follow aisles, they do not cut through racks
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+def nearest_neighbor(stops: list, start: tuple = (0.0, 0.0)) -> list:
+    """Greedy route over floor coordinates, starting at `start` (the dock). O(n^2), a few ms for 300 stops."""
+    remaining = list(stops)
+    route = []
+    here = start
+    while remaining:
+        best = min(range(len(remaining)), key=lambda i: _distance(here, (remaining[i].x, remaining[i].y)))
+        stop = remaining.pop(best)
+        route.append(stop)
+        here = (stop.x, stop.y)
+    return route
+
+def walking_order(stops: list, start: tuple = (0.0, 0.0)) -> list:
+    """
+    Nearest neighbor when every stop has coordinates, serpentine otherwise.
+    Stops without a location (aisle None) are appended at the end in their original order.
+    """
+    located = [stop for stop in stops if stop.aisle is not None]
+    unlocated = [stop for stop in stops if stop.aisle is None]
+    if located and all(stop.x is not None and stop.y is not None for stop in located):
+        route = nearest_neighbor(located, start)
+    else:
+        route = serpentine(located)
+    return route + unlocated
+
+def route_lines(lines: list, locations: dict) -> list:
+    """
+    Orders pick-list lines (dicts with "product_id") by walking order and attaches "location".
+    `locations` maps product id -> Location (or None); see LocationService.pick_locations.
+    """
+    stops = []
+    for i, line in enumerate(lines):
+        loc = locations.get(line["product_id"])
+        if loc is None:
+            stops.append(Stop(key=i, aisle=None))
+        else:
+            stops.append(Stop(key=i, aisle=loc.aisle, rack=loc.rack, level=loc.level, bin=loc.bin, x=loc.x, y=loc.y))
+
+    ordered = []
+    for stop in walking_order(stops):
+        loc = locations.get(lines[stop.key]["product_id"])
+        ordered.append({**lines[stop.key], "location": loc.code if loc else None})
+    return ordered
@@ -0,0 +1,76 @@
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from modules.catalog.application.barcode_cache import barcode_index
+from modules.picking.application.scan_context import TaskContext, scan_contexts
+from modules.picking.domain.models import PickScanResult
+
+class ScanChannel:
+    """
+    Scan stream of one WebSocket connection. Replies are computed from the cached task
+    context plus the scans not yet persisted; `flush()` writes the pending scans as one batch.
+    """
+    def __init__(self, db: AsyncSession, ctx: TaskContext, user_id: int | None = None):
+        self.db = db
+        self.ctx = ctx
+        self.user_id = user_id
+        self.pending = []
+        self.rejects = [] # Unknown / wrong-product scans, logged for metrics
+
+    @property
+    def queued(self) -> int:
+        return len(self.pending) + len(self.rejects)
+
+    def _pending_count(self, product_id: int) -> int:
+        return sum(1 for pid, _, _ in self.pending if pid == product_id)
+
+    async def handle(self, barcode: str) -> dict:
+        product = await barcode_index.resolve(self.db, barcode)
+        if not product:
+            self.rejects.append((None, barcode, datetime.utcnow(), PickScanResult.NOT_FOUND.value))
+            return {"status": "NOT_FOUND", "barcode": barcode, "scanned_qty": 0, "required_qty": 0}
+        if product.id not in self.ctx.required:
+            self.rejects.append((product.id, barcode, datetime.utcnow(), PickScanResult.MISMATCH.value))
+            return {"status": "MISMATCH", "barcode": barcode, "product_id": product.id,
+                    "product_name": product.name, "scanned_qty": 0, "required_qty": 0}
+
+        self.pending.append((product.id, barcode, datetime.utcnow()))
+        scanned, required = self.ctx.progress(product.id)
+        return {
+            "status": "MATCH",
+            "barcode": barcode,
+            "product_id": product.id,
+            "product_name": product.name,
+            "scanned_qty": scanned + self._pending_count(product.id),
+            "required_qty": required,
+        }
+
+    async def flush(self) -> int:
+        """
+        Persists pending scans. On a database error the session is rolled back (so the
+        next flush starts a clean transaction) and the scans stay queued.
+        """
+        if self.rejects:
+            rejects = self.rejects
+            self.rejects = []
+            try:
+                await scan_contexts.record_rejects(self.db, self.ctx.task_id, rejects, user_id=self.user_id)
+            except SQLAlchemyError:
+                self.rejects = rejects + self.rejects
+                await self.db.rollback()
+                raise
+        if not self.pending:
+            return 0
+        batch = self.pending
+        self.pending = []
+        try:
+            await scan_contexts.record_scans(self.db, self.ctx, batch, user_id=self.user_id)
+        except SQLAlchemyError:
+            self.pending = batch + self.pending
+            await self.db.rollback()
+            raise
+        except RuntimeError:
+            # Lost the optimistic lock MAX_SCAN_RETRIES times (already rolled back)
+            self.pending = batch + self.pending
+            raise
+        return len(batch)
@@ -0,0 +1,152 @@
+import asyncio
+import json
+from datetime import datetime
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, insert, func
+from core.config import get_settings
+from modules.picking.domain.models import PickTask, PickScanEvent, PickTaskStatus, PickScanResult
+
+# Attempts before giving up when other workers keep winning the optimistic lock
+MAX_SCAN_RETRIES = 5
+
+@dataclass
+class TaskContext:
+    task_id: int
+    sale_id: int
+    status: str
+    required: dict            # product_id -> units required (summed over sale lines)
+    scanned: dict             # product_id -> units scanned
+    version: int              # PickTask.scanned_total as last read/written
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+    def progress(self, product_id: int) -> tuple:
+        # Required quantities stay fractional (weighed products)
+        return self.scanned.get(product_id, 0), float(self.required.get(product_id, 0.0))
+
+def encode_counts(scanned: dict) -> str:
+    return json.dumps({str(k): v for k, v in scanned.items()}, separators=(",", ":"))
+
+def decode_counts(raw: str | None) -> dict:
+    return {int(k): v for k, v in json.loads(raw).items()} if raw else {}
+
+class ScanContextCache:
+    """
+    Per-task picking context (required units per product plus running scan counters),
+    loaded once and kept in an LRU. A scan then costs one event insert and one
+    version-checked counter UPDATE on the task; progress is answered from memory.
+    """
+    def __init__(self, maxsize: int = 1000):
+        self.maxsize = maxsize
+        self._contexts = OrderedDict()
+
+    def evict(self, task_id: int):
+        self._contexts.pop(task_id, None)
+
+    def clear(self):
+        self._contexts.clear()
+
+    async def read_counters(self, db: AsyncSession, task_id: int):
+        """(status, counters, version) straight from the task row, bypassing the cache."""
+        row = (await db.execute(
+            select(PickTask.status, PickTask.scan_counts, PickTask.scanned_total).where(PickTask.id == task_id)
+        )).first()
+        if row is None:
+            return None
+        status, raw, total = row
+        if raw is None:
+            # Tasks scanned before counters existed: rebuild them from the event log once
+            rows = (await db.execute(
+                select(PickScanEvent.product_id, func.count(PickScanEvent.id))
+                .where(PickScanEvent.task_id == task_id, PickScanEvent.result == PickScanResult.MATCH.value)
+                .group_by(PickScanEvent.product_id)
+            )).all()
+            return status, {pid: count for pid, count in rows}, total or 0
+        return status, decode_counts(raw), total or 0
+
+    async def get(self, db: AsyncSession, task_id: int) -> TaskContext | None:
+        ctx = self._contexts.get(task_id)
+        if ctx is not None:
+            self._contexts.move_to_end(task_id)
+            return ctx
+
+        from modules.sales.domain.models import SaleItem
+
+        sale_id = (await db.execute(select(PickTask.sale_id).where(PickTask.id == task_id))).scalar()
+        if sale_id is None:
+            return None
+        required = dict((await db.execute(
+            select(SaleItem.product_id, func.sum(SaleItem.qty))
+            .where(SaleItem.sale_id == sale_id)
+            .group_by(SaleItem.product_id)
+        )).all())
+        status, scanned, version = await self.read_counters(db, task_id)
+
+        ctx = TaskContext(task_id, sale_id, status, required, scanned, version)
+        self._contexts[task_id] = ctx
+        if len(self._contexts) > self.maxsize:
+            self._contexts.popitem(last=False)
+        return ctx
+
+    async def record_scan(self, db: AsyncSession, ctx: TaskContext, product_id: int, barcode: str,
+                          user_id: int | None = None):
+        """Inserts the scan event and bumps the task counters in one transaction."""
+        await self.record_scans(db, ctx, [(product_id, barcode, datetime.utcnow())], user_id=user_id)
+
+    async def record_rejects(self, db: AsyncSession, task_id: int, rejects: list, user_id: int | None = None):
+        """
+        Logs scans that did not count towards the task: (product_id or None, barcode, timestamp, result).
+        Kept for picker metrics only; the counters are not touched.
+        """
+        if not rejects:
+            return
+        await db.execute(insert(PickScanEvent), [
+            {"task_id": task_id, "barcode_scanned": barcode, "product_id": product_id,
+             "user_id": user_id, "result": result, "timestamp": at}
+            for product_id, barcode, at, result in rejects
+        ])
+        await db.commit()
+
+    async def record_scans(self, db: AsyncSession, ctx: TaskContext, scans: list, user_id: int | None = None):
+        """
+        Persists a batch of (product_id, barcode, timestamp) scans: one multi-row event
+        insert plus one version-checked counter UPDATE, in a single transaction.
+        """
+        if not scans:
+            return
+        async with ctx.lock:
+            for _ in range(MAX_SCAN_RETRIES):
+                if ctx.status == PickTaskStatus.COMPLETED.value:
+                    raise ValueError(f"Pick task {ctx.task_id} already completed")
+                scanned = dict(ctx.scanned)
+                for product_id, _, _ in scans:
+                    scanned[product_id] = scanned.get(product_id, 0) + 1
+
+                await db.execute(insert(PickScanEvent), [
+                    {"task_id": ctx.task_id, "barcode_scanned": barcode, "product_id": product_id,
+                     "user_id": user_id, "result": PickScanResult.MATCH.value, "timestamp": at}
+                    for product_id, barcode, at in scans
+                ])
+                status = PickTaskStatus.IN_PROGRESS.value if ctx.status == PickTaskStatus.PENDING.value else ctx.status
+                result = await db.execute(
+                    update(PickTask)
+                    .where(PickTask.id == ctx.task_id, PickTask.scanned_total == ctx.version,
+                           PickTask.status != PickTaskStatus.COMPLETED.value)
+                    .values(scan_counts=encode_counts(scanned), scanned_total=sum(scanned.values()), status=status)
+                )
+                if result.rowcount == 1:
+                    await db.commit()
+                    ctx.scanned, ctx.version, ctx.status = scanned, sum(scanned.values()), status
+                    return
+
+                # Another worker scanned (or completed) this task: adopt its state and retry
+                await db.rollback()
+                counters = await self.read_counters(db, ctx.task_id)
+                if counters is None:
+                    self.evict(ctx.task_id)
+                    raise LookupError(ctx.task_id)
+                ctx.status, ctx.scanned, ctx.version = counters
+            raise RuntimeError(f"Pick task {ctx.task_id} is being updated concurrently; retry the scan")
+
+scan_contexts = ScanContextCache(maxsize=get_settings().PICK_CONTEXT_CACHE_SIZE)
@@ -0,0 +1,304 @@
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, update, func, literal, exists
+from sqlalchemy.exc import IntegrityError
+from core.database import dialect_insert
+from modules.picking.domain.models import (
+    PickTask, PickWave, PickWaveOrder, PickWaveLine, PickWaveSort, PickWaveStatus, PickScanEvent, PickScanResult
+)
+from modules.sales.domain.models import Sale, SaleItem, SaleStatus
+from modules.catalog.domain.models import Product
+from modules.inventory.application.location_service import LocationService
+from modules.picking.application.route_optimizer import route_lines
+from modules.picking.application.completion_service import PickCompletionService, ShortPickError, reconcile
+
+class WaveService:
+    """
+    Wave picking. Generation is set-based: one INSERT ... SELECT assigns eligible sales
+    to put-wall slots and one INSERT ... SELECT sums their lines per product.
+    A sale is either picked in a wave or through a single PickTask, never both.
+    Completing a wave closes each sale like a pick task: what was sorted into its slot
+    is committed and invoiced, the rest is recorded as short and released.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _eligible_sales(self, warehouse_id: int, sale_ids: list | None):
+        stmt = select(Sale.id).where(
+            Sale.status == SaleStatus.CONFIRMED.value,
+            Sale.warehouse_id == warehouse_id,
+            ~exists().where(PickTask.sale_id == Sale.id),
+            ~exists().where(PickWaveOrder.sale_id == Sale.id),
+        )
+        if sale_ids:
+            stmt = stmt.where(Sale.id.in_(sale_ids))
+        return stmt
+
+    async def create_wave(self, warehouse_id: int, max_orders: int = 50, sale_ids: list | None = None) -> int:
+        """A wave is walked in one building: only sales of `warehouse_id` are grouped."""
+        wave = PickWave(warehouse_id=warehouse_id, status=PickWaveStatus.OPEN.value)
+        self.db.add(wave)
+        await self.db.flush()
+
+        eligible = (
+            self._eligible_sales(warehouse_id, sale_ids)
+            .order_by(Sale.id)
+            .limit(len(sale_ids) if sale_ids else max_orders)
+            .subquery()
+        )
+        slots = select(
+            literal(wave.id),
+            eligible.c.id,
+            func.row_number().over(order_by=eligible.c.id),
+        )
+        try:
+            result = await self.db.execute(
+                insert(PickWaveOrder).from_select(["wave_id", "sale_id", "slot"], slots)
+            )
+        except IntegrityError:
+            await self.db.rollback()
+            raise RuntimeError("Another wave claimed some of these sales; retry")
+
+        added = result.rowcount
+        if sale_ids and added != len(set(sale_ids)):
+            await self.db.rollback()
+            raise ValueError("Some sales are not CONFIRMED, belong to another warehouse, already have a pick task, or are in another wave")
+        if not added:
+            await self.db.rollback()
+            raise ValueError("No eligible sales for a new wave")
+
+        lines = (
+            select(literal(wave.id), SaleItem.product_id, func.sum(SaleItem.qty), literal(0.0))
+            .join(PickWaveOrder, PickWaveOrder.sale_id == SaleItem.sale_id)
+            .where(PickWaveOrder.wave_id == wave.id)
+            .group_by(SaleItem.product_id)
+        )
+        await self.db.execute(
+            insert(PickWaveLine).from_select(["wave_id", "product_id", "required_qty", "picked_qty"], lines)
+        )
+        await self.db.commit()
+        return wave.id
+
+    async def get_wave(self, wave_id: int) -> dict | None:
+        wave = await self.db.get(PickWave, wave_id)
+        if not wave:
+            return None
+        lines = (await self.db.execute(
+            select(PickWaveLine.product_id, Product.sku, Product.name, PickWaveLine.required_qty, PickWaveLine.picked_qty)
+            .join(Product, Product.id == PickWaveLine.product_id)
+            .where(PickWaveLine.wave_id == wave_id)
+            .order_by(Product.sku)
+        )).mappings().all()
+        lines = [dict(line) for line in lines]
+        locations = await LocationService(self.db).pick_locations([line["product_id"] for line in lines], wave.warehouse_id)
+        orders = (await self.db.execute(
+            select(PickWaveOrder.sale_id, PickWaveOrder.slot)
+            .where(PickWaveOrder.wave_id == wave_id)
+            .order_by(PickWaveOrder.slot)
+        )).mappings().all()
+        return {
+            "id": wave.id,
+            "warehouse_id": wave.warehouse_id,
+            "status": wave.status,
+            "created_at": wave.created_at,
+            "completed_at": wave.completed_at,
+            "lines": route_lines(lines, locations), # Walking order
+            "orders": [dict(order) for order in orders],
+        }
+
+    async def _set_status(self, wave_id: int, status: str, only_from: tuple):
+        await self.db.execute(
+            update(PickWave)
+            .where(PickWave.id == wave_id, PickWave.status.in_(only_from))
+            .values(status=status)
+        )
+
+    async def register_pick(self, wave_id: int, product_id: int | None, barcode: str, user_id: int | None = None) -> dict:
+        """
+        One unit picked from the shelf into the wave tote (`product_id=None`: unknown barcode).
+        Every scan is logged as a PickScanEvent of the wave for picker metrics; an overpicked
+        unit is not taken and is logged as a mismatch.
+        """
+        status, line = "NOT_FOUND", None
+        if product_id is not None:
+            result = await self.db.execute(
+                update(PickWaveLine)
+                .where(
+                    PickWaveLine.wave_id == wave_id,
+                    PickWaveLine.product_id == product_id,
+                    PickWaveLine.picked_qty < PickWaveLine.required_qty,
+                )
+                .values(picked_qty=PickWaveLine.picked_qty + 1)
+            )
+            line = (await self.db.execute(
+                select(PickWaveLine.required_qty, PickWaveLine.picked_qty)
+                .where(PickWaveLine.wave_id == wave_id, PickWaveLine.product_id == product_id)
+            )).first()
+            status = "MISMATCH" if line is None else "MATCH" if result.rowcount else "OVERPICK"
+
+        event_result = {"MATCH": PickScanResult.MATCH, "NOT_FOUND": PickScanResult.NOT_FOUND}.get(status, PickScanResult.MISMATCH)
+        await self.db.execute(insert(PickScanEvent).values(
+            wave_id=wave_id, barcode_scanned=barcode, product_id=product_id, user_id=user_id,
+            result=event_result.value, timestamp=datetime.utcnow(),
+        ))
+        if status == "MATCH":
+            await self._set_status(wave_id, PickWaveStatus.PICKING.value, (PickWaveStatus.OPEN.value,))
+        await self.db.commit()
+        return {
+            "status": status,
+            "picked_qty": line.picked_qty if line else 0,
+            "required_qty": line.required_qty if line else 0,
+        }
+
+    async def sort_unit(self, wave_id: int, product_id: int) -> dict:
+        """
+        Put-wall step: assigns one scanned unit to the lowest slot whose order still
+        needs the product. The wave line is locked (FOR UPDATE) so concurrent sorts of the
+        same product are serialized; the slot upsert re-checks the remaining quantity and a
+        lost race raises RuntimeError (409, the operator rescans).
+        """
+        # Only units that went through the pick step can be sorted
+        line = (await self.db.execute(
+            select(
+                PickWaveLine.picked_qty,
+                select(func.coalesce(func.sum(PickWaveSort.qty), 0.0))
+                .where(PickWaveSort.wave_id == wave_id, PickWaveSort.product_id == product_id)
+                .scalar_subquery()
+                .label("sorted"),
+            )
+            .where(PickWaveLine.wave_id == wave_id, PickWaveLine.product_id == product_id)
+            .with_for_update(of=PickWaveLine)
+        )).first()
+        if line is None:
+            await self.db.rollback()
+            return {"status": "MISMATCH"}
+        if line.sorted >= line.picked_qty:
+            await self.db.rollback()
+            return {"status": "NOT_PICKED"}
+
+        sorted_qty = (
+            select(func.coalesce(func.sum(PickWaveSort.qty), 0.0))
+            .where(
+                PickWaveSort.wave_id == wave_id,
+                PickWaveSort.sale_id == PickWaveOrder.sale_id,
+                PickWaveSort.product_id == product_id,
+            )
+            .scalar_subquery()
+        )
+        needed = (
+            select(SaleItem.sale_id, func.sum(SaleItem.qty).label("qty"))
+            .where(
+                SaleItem.product_id == product_id,
+                SaleItem.sale_id.in_(select(PickWaveOrder.sale_id).where(PickWaveOrder.wave_id == wave_id)),
+            )
+            .group_by(SaleItem.sale_id)
+            .subquery()
+        )
+        target = (await self.db.execute(
+            select(PickWaveOrder.sale_id, PickWaveOrder.slot, needed.c.qty, sorted_qty.label("sorted"))
+            .join(needed, needed.c.sale_id == PickWaveOrder.sale_id)
+            .where(PickWaveOrder.wave_id == wave_id, needed.c.qty > sorted_qty)
+            .order_by(PickWaveOrder.slot)
+            .limit(1)
+        )).first()
+        if target is None:
+            await self.db.rollback()
+            return {"status": "NO_DEMAND"}
+
+        # Single upsert: no IntegrityError when two first units of an order race, and the
+        # guard refuses to overfill the slot if another sort got there first
+        upsert = dialect_insert(self.db, PickWaveSort).values(
+            wave_id=wave_id, sale_id=target.sale_id, product_id=product_id, qty=1
+        )
+        upsert = upsert.on_conflict_do_update(
+            index_elements=["wave_id", "sale_id", "product_id"],
+            set_={"qty": PickWaveSort.qty + 1},
+            where=PickWaveSort.qty < target.qty,
+        )
+        result = await self.db.execute(upsert)
+        if not result.rowcount:
+            await self.db.rollback()
+            raise RuntimeError("Slot filled by a concurrent sort; scan the unit again")
+        # Touching the wave row serializes this sort with a completion of the wave
+        moved = await self.db.execute(
+            update(PickWave)
+            .where(PickWave.id == wave_id, PickWave.status != PickWaveStatus.COMPLETED.value)
+            .values(status=PickWaveStatus.SORTING.value)
+        )
+        if not moved.rowcount:
+            await self.db.rollback()
+            raise ValueError("Wave already completed")
+        completed = await self._fully_sorted(wave_id)
+        if completed:
+            await self._close(wave_id, allow_short=False)
+        await self.db.commit()
+        return {
+            "status": "SORTED",
+            "sale_id": target.sale_id,
+            "slot": target.slot,
+            "order_qty": target.qty,
+            "sorted_qty": target.sorted + 1,
+            "wave_completed": completed,
+        }
+
+    async def _fully_sorted(self, wave_id: int) -> bool:
+        required = select(func.coalesce(func.sum(PickWaveLine.required_qty), 0.0)).where(PickWaveLine.wave_id == wave_id).scalar_subquery()
+        sorted_total = select(func.coalesce(func.sum(PickWaveSort.qty), 0.0)).where(PickWaveSort.wave_id == wave_id).scalar_subquery()
+        return bool((await self.db.execute(select(sorted_total >= required))).scalar())
+
+    async def complete(self, wave_id: int, allow_short: bool = True) -> dict:
+        """
+        Closes the wave before everything was sorted (missing units): each sale is billed
+        for what reached its slot. `allow_short=False` refuses to close with shorts.
+        """
+        summary = await self._close(wave_id, allow_short)
+        await self.db.commit()
+        return summary
+
+    async def _close(self, wave_id: int, allow_short: bool) -> dict:
+        """Claims the wave and closes every sale in it (flushed, not committed)."""
+        now = datetime.utcnow()
+        claimed = await self.db.execute(
+            update(PickWave)
+            .where(PickWave.id == wave_id, PickWave.status != PickWaveStatus.COMPLETED.value)
+            .values(status=PickWaveStatus.COMPLETED.value, completed_at=now)
+        )
+        if claimed.rowcount != 1:
+            await self.db.rollback()
+            if await self.db.get(PickWave, wave_id) is None:
+                raise LookupError(wave_id)
+            raise ValueError("Wave already completed")
+
+        # Read after the claim: sorts that got in first are committed and visible now
+        sale_ids = (await self.db.execute(
+            select(PickWaveOrder.sale_id).where(PickWaveOrder.wave_id == wave_id).order_by(PickWaveOrder.slot)
+        )).scalars().all()
+        sorted_units = {sale_id: {} for sale_id in sale_ids}
+        for sale_id, product_id, qty in (await self.db.execute(
+            select(PickWaveSort.sale_id, PickWaveSort.product_id, PickWaveSort.qty).where(PickWaveSort.wave_id == wave_id)
+        )).all():
+            sorted_units[sale_id][product_id] = qty
+
+        completion = PickCompletionService(self.db)
+        required, tracked = await completion.required_units(sale_ids)
+        closing = {sale_id: reconcile(required[sale_id], sorted_units[sale_id]) for sale_id in sale_ids}
+        shorts = {sale_id: s for sale_id, (_, s) in closing.items() if s}
+        if shorts and not allow_short:
+            await self.db.rollback()
+            raise ShortPickError(shorts)
+
+        orders = []
+        for sale_id, (picked, sale_shorts) in closing.items():
+            sale = await self.db.get(Sale, sale_id)
+            document_id, invoiced = await completion.close_sale(
+                sale, required[sale_id], picked, sale_shorts, tracked,
+                source={"wave_id": wave_id}, reference=f"WAVE-{wave_id}", now=now,
+            )
+            orders.append({
+                "sale_id": sale_id,
+                "shorts": [{"product_id": pid, "required_qty": required[sale_id][pid], "short_qty": qty}
+                           for pid, qty in sale_shorts.items()],
+                "document_id": document_id,
+                "invoiced": invoiced,
+            })
+        return {"id": wave_id, "status": PickWaveStatus.COMPLETED.value, "orders": orders}
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey, DateTime, Enum, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from core.database import Base
 from datetime import datetime
@@ -9,24 +9,126 @@ class PickTaskStatus(str, enum.Enum):
     IN_PROGRESS = "IN_PROGRESS"
     COMPLETED = "COMPLETED"
 
+class PickScanResult(str, enum.Enum):
+    MATCH = "MATCH"
+    MISMATCH = "MISMATCH" # Product not in the sale
+    NOT_FOUND = "NOT_FOUND" # Unknown barcode
+
 class PickTask(Base):
     __tablename__ = "pick_tasks"
 
     id = Column(Integer, primary_key=True, index=True)
     sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False, unique=True)
     status = Column(String, default=PickTaskStatus.PENDING.value)
+
+    # Running scan counters: JSON {product_id: units scanned}; scanned_total doubles as
+    # the optimistic-lock version when several workers update the same task
+    scan_counts = Column(Text, nullable=True)
+    scanned_total = Column(Integer, default=0, nullable=False)
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
     scan_events = relationship("PickScanEvent", back_populates="task", lazy="selectin")
 
+# One row per scan, of a single-order pick task or of a wave's pick step (exactly one of task_id / wave_id)
 class PickScanEvent(Base):
     __tablename__ = "pick_scan_events"
 
     id = Column(Integer, primary_key=True, index=True)
-    task_id = Column(Integer, ForeignKey("pick_tasks.id"), nullable=False, index=True)
+    task_id = Column(Integer, ForeignKey("pick_tasks.id"), nullable=True, index=True)
+    wave_id = Column(Integer, ForeignKey("pick_waves.id"), nullable=True, index=True)
     barcode_scanned = Column(String, nullable=False)
-    product_id = Column(Integer, ForeignKey("products.id"), nullable=False) # Resolved product
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=True, index=True) # Resolved product (None: unknown barcode)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True) # Picker
+    result = Column(String, default=PickScanResult.MATCH.value, nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
     
     task = relationship("PickTask", back_populates="scan_events")
+
+    # Metrics rollup window scan (timestamp watermark, keyset on id)
+    __table_args__ = (
+        Index("ix_pick_scan_events_timestamp_id", "timestamp", "id"),
+    )
+
+# Units a completed task or wave could not pick; the reservation for them is released
+class PickShortPick(Base):
+    __tablename__ = "pick_short_picks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(Integer, ForeignKey("pick_tasks.id"), nullable=True, index=True)
+    wave_id = Column(Integer, ForeignKey("pick_waves.id"), nullable=True, index=True)
+    sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
+    required_qty = Column(Float, nullable=False)
+    picked_qty = Column(Float, nullable=False)
+    short_qty = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+# Picker productivity per hour, rolled up from pick_scan_events (see PickMetricsService)
+class PickMetricsHourly(Base):
+    __tablename__ = "pick_metrics_hourly"
+
+    hour = Column(DateTime, primary_key=True) # UTC, truncated to the hour
+    user_id = Column(Integer, primary_key=True) # 0: scans recorded before pickers were attributed
+    scans = Column(Integer, default=0)
+    units = Column(Integer, default=0) # Matched scans
+    lines = Column(Integer, default=0) # First matched scan of a product within a task
+    mismatches = Column(Integer, default=0) # MISMATCH + NOT_FOUND
+    gap_seconds = Column(Float, default=0.0) # Sum of times between consecutive scans (idle breaks excluded)
+    gap_count = Column(Integer, default=0)
+
+class PickWaveStatus(str, enum.Enum):
+    OPEN = "OPEN"
+    PICKING = "PICKING"
+    SORTING = "SORTING"
+    COMPLETED = "COMPLETED"
+
+# Wave (batch) picking: many confirmed sales picked together, then sorted to orders at a put wall
+class PickWave(Base):
+    __tablename__ = "pick_waves"
+
+    id = Column(Integer, primary_key=True, index=True)
+    warehouse_id = Column(Integer, ForeignKey("warehouses.id"), nullable=True)
+    status = Column(String, default=PickWaveStatus.OPEN.value)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+
+class PickWaveOrder(Base):
+    __tablename__ = "pick_wave_orders"
+
+    id = Column(Integer, primary_key=True, index=True)
+    wave_id = Column(Integer, ForeignKey("pick_waves.id"), nullable=False, index=True)
+    sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False, unique=True) # A sale belongs to one wave at most
+    slot = Column(Integer, nullable=False) # Put-wall slot (1..N within the wave)
+
+    __table_args__ = (
+        UniqueConstraint("wave_id", "slot", name="uq_pick_wave_orders_wave_slot"),
+    )
+
+# Consolidated pick list: units of each product over all orders of the wave
+class PickWaveLine(Base):
+    __tablename__ = "pick_wave_lines"
+
+    id = Column(Integer, primary_key=True, index=True)
+    wave_id = Column(Integer, ForeignKey("pick_waves.id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    required_qty = Column(Float, nullable=False)
+    picked_qty = Column(Float, default=0.0, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("wave_id", "product_id", name="uq_pick_wave_lines_wave_product"),
+    )
+
+# Units placed into each order's put-wall slot
+class PickWaveSort(Base):
+    __tablename__ = "pick_wave_sorts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    wave_id = Column(Integer, ForeignKey("pick_waves.id"), nullable=False)
+    sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    qty = Column(Float, default=0.0, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("wave_id", "sale_id", "product_id", name="uq_pick_wave_sorts_wave_sale_product"),
+    )
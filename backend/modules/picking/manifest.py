@@ -5,5 +5,5 @@ from .domain import models
 module = Module(
     name="picking",
     router=router,
-    models=[models.PickTask, models.PickScanEvent]
+    models=[models.PickTask, models.PickScanEvent, models.PickShortPick, models.PickMetricsHourly, models.PickWave, models.PickWaveOrder, models.PickWaveLine, models.PickWaveSort]
 )
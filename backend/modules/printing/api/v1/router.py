@@ -1,23 +1,212 @@
-from fastapi import APIRouter, HTTPException
-from ...domain.schemas import PrintJobRequest, PrintJobResponse
+from typing import List, Literal
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from core.database import get_db
+from modules.iam.api.v1.router import get_current_user, RoleChecker
+from modules.iam.domain.models import User, UserRole
+from fastapi.responses import StreamingResponse
+from ...domain.models import Printer, PrintJob
+from ...domain.schemas import (
+    PrintJobRequest, PrintJobResponse, MultiPrintJobRequest, BatchPrintRequest,
+    PrinterCreate, PrinterResponse, SpoolJobRequest, SpoolJobResponse,
+)
 from ...application.service import ReceiptService
+from ...application.batch_service import ReceiptBatchService, render_receipts, build_zip
+from ...application.backends import BACKENDS, PrinterError
+from ...application.spooler import PrintQueueService, print_spooler
 import base64
 
 router = APIRouter(prefix="/printing", tags=["Printing"])
 
-@router.post("/generate-raw", response_model=PrintJobResponse)
-async def generate_raw_print_job(request: PrintJobRequest):
+RAW_MEDIA_TYPE = "application/octet-stream"
+
+def _wants_binary(request: Request, format: str | None) -> bool:
+    if format is not None:
+        return format == "binary"
+    return RAW_MEDIA_TYPE in request.headers.get("accept", "")
+
+@router.post(
+    "/generate-raw",
+    response_model=PrintJobResponse,
+    responses={200: {"content": {RAW_MEDIA_TYPE: {}}}},
+)
+async def generate_raw_print_job(
+    request: Request,
+    job: PrintJobRequest,
+    format: Literal["base64", "binary"] | None = None,
+    current_user: User = Depends(get_current_user),
+):
     """
     Generates RAW ESC/POS bytes for a given receipt and printer configuration.
-    Returns the bytes encoded in Base64.
+    Returns the bytes encoded in Base64, or as-is (application/octet-stream) with
+    `format=binary` or `Accept: application/octet-stream`.
     """
     try:
         # Generate bytes using the service
-        raw_bytes = ReceiptService.generate_receipt_bytes(request.receipt, request.config)
-        
-        # Encode to Base64 for transport
-        b64_str = base64.b64encode(raw_bytes).decode('utf-8')
-        
-        return PrintJobResponse(raw_bytes_base64=b64_str)
+        raw_bytes = ReceiptService.generate_receipt_bytes(job.receipt, job.config)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if _wants_binary(request, format):
+        return Response(content=raw_bytes, media_type=RAW_MEDIA_TYPE)
+
+    # Encode to Base64 for transport
+    b64_str = base64.b64encode(raw_bytes).decode('utf-8')
+    return PrintJobResponse(raw_bytes_base64=b64_str)
+
+@router.post("/generate-raw/multi", response_class=StreamingResponse, responses={200: {"content": {RAW_MEDIA_TYPE: {}}}})
+async def generate_raw_print_jobs(job: MultiPrintJobRequest, current_user: User = Depends(get_current_user)):
+    """
+    Streams the ESC/POS jobs of several receipts back to back (application/octet-stream).
+    Each job ends with its own cut, so the stream can be written to the printer as-is.
+    Every job is rendered before the response starts, so a bad receipt fails the whole
+    request with a 500 instead of cutting a 200 stream short.
+    """
+    try:
+        jobs = list(ReceiptService.iter_receipts_bytes(job.receipts, job.config))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+    return StreamingResponse(
+        iter(jobs),
+        media_type=RAW_MEDIA_TYPE,
+        headers={"X-Print-Job-Count": str(len(job.receipts))},
+    )
+
+@router.post("/batch", responses={200: {"content": {RAW_MEDIA_TYPE: {}, "application/zip": {}}}})
+async def print_batch(data: BatchPrintRequest, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    Renders the receipts of many sales and/or fiscal documents in one call (reprints,
+    end-of-day runs). `output=spool` returns one concatenated ESC/POS stream;
+    `output=zip` returns one `sale-<id>.bin` / `document-<id>.bin` entry per receipt.
+    """
+    if not data.sale_ids and not data.document_ids:
+        raise HTTPException(status_code=400, detail="Provide sale_ids and/or document_ids")
+
+    receipts, missing = await ReceiptBatchService(db).load(data.sale_ids, data.document_ids)
+    if missing["sale_ids"] or missing["document_ids"]:
+        raise HTTPException(status_code=404, detail={"message": "Some receipts were not found", **missing})
+
+    jobs = await render_receipts([receipt for _, receipt in receipts], data.config)
+    headers = {"X-Print-Job-Count": str(len(jobs))}
+    if data.output == "zip":
+        archive = build_zip([(name, job) for (name, _), job in zip(receipts, jobs)])
+        headers["Content-Disposition"] = 'attachment; filename="receipts.zip"'
+        return Response(content=archive, media_type="application/zip", headers=headers)
+    return Response(content=b"".join(jobs), media_type=RAW_MEDIA_TYPE, headers=headers)
+
+# --- Spooler: printers and queued jobs ---
+
+@router.post("/printers", response_model=PrinterResponse, dependencies=[Depends(RoleChecker([UserRole.ADMIN, UserRole.SUPERVISOR]))])
+async def create_printer(data: PrinterCreate, db: AsyncSession = Depends(get_db)):
+    printer = Printer(**data.model_dump())
+    db.add(printer)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="A printer with that name already exists")
+    await db.refresh(printer)
+    return printer
+
+@router.get("/printers", response_model=List[PrinterResponse])
+async def list_printers(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    result = await db.execute(select(Printer).order_by(Printer.name))
+    return result.scalars().all()
+
+@router.get("/printers/{printer_id}/status")
+async def get_printer_status(printer_id: int, probe: bool = False, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    Last delivery outcome and queue depth. `probe=true` also checks that the printer
+    answers right now (TCP connect / directory writable / OS printer opens).
+    """
+    printer = await db.get(Printer, printer_id)
+    if not printer:
+        raise HTTPException(status_code=404, detail="Printer not found")
+
+    status = {
+        "printer": PrinterResponse.model_validate(printer),
+        "queue": await PrintQueueService(db).queue_counts(printer_id),
+        "spooler_running": print_spooler.running,
+    }
+    if probe:
+        try:
+            await BACKENDS[printer.backend].probe(printer.target)
+            status["reachable"], status["probe_error"] = True, None
+        except PrinterError as e:
+            status["reachable"], status["probe_error"] = False, str(e)
+    return status
+
+@router.post("/jobs", response_model=List[SpoolJobResponse], status_code=202)
+async def enqueue_print_jobs(data: SpoolJobRequest, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    Queues one job per receipt on a printer and returns immediately; delivery, retries and
+    status happen in the spooler. Receipts can be sent as-is and/or loaded by sale / document id.
+    """
+    if not data.receipts and not data.sale_ids and not data.document_ids:
+        raise HTTPException(status_code=400, detail="Provide receipts, sale_ids and/or document_ids")
+
+    named = [(f"receipt-{receipt.sale_id}", receipt) for receipt in data.receipts]
+    if data.sale_ids or data.document_ids:
+        loaded, missing = await ReceiptBatchService(db).load(data.sale_ids, data.document_ids)
+        if missing["sale_ids"] or missing["document_ids"]:
+            raise HTTPException(status_code=404, detail={"message": "Some receipts were not found", **missing})
+        named += [(name.removesuffix(".bin"), receipt) for name, receipt in loaded]
+
+    payloads = await render_receipts([receipt for _, receipt in named], data.config)
+    try:
+        jobs = await PrintQueueService(db).enqueue(data.printer_id, [(ref, job) for (ref, _), job in zip(named, payloads)])
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    print_spooler.wake()
+    return jobs
+
+@router.post("/printers/{printer_id}/raw", response_model=SpoolJobResponse, status_code=202)
+async def enqueue_raw_print_job(printer_id: int, request: Request, reference: str | None = None, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Queues bytes already rendered by the client (application/octet-stream body)."""
+    body = await request.body()
+    if not body:
+        raise HTTPException(status_code=400, detail="Empty print job")
+    try:
+        jobs = await PrintQueueService(db).enqueue(printer_id, [(reference, body)])
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    print_spooler.wake()
+    return jobs[0]
+
+@router.get("/jobs", response_model=List[SpoolJobResponse])
+async def list_print_jobs(
+    status: Literal["QUEUED", "PRINTING", "DONE", "FAILED"] | None = None,
+    printer_id: int | None = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    stmt = select(PrintJob).order_by(PrintJob.id.desc()).limit(min(limit, 500))
+    if status:
+        stmt = stmt.where(PrintJob.status == status)
+    if printer_id is not None:
+        stmt = stmt.where(PrintJob.printer_id == printer_id)
+    result = await db.execute(stmt)
+    return result.scalars().all()
+
+@router.get("/jobs/{job_id}", response_model=SpoolJobResponse)
+async def get_print_job(job_id: int, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    job = await db.get(PrintJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Print job not found")
+    return job
+
+@router.post("/jobs/{job_id}/retry", response_model=SpoolJobResponse)
+async def retry_print_job(job_id: int, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Requeues a FAILED job (e.g. after fixing the paper / cable)."""
+    try:
+        job = await PrintQueueService(db).retry(job_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    print_spooler.wake()
+    return job
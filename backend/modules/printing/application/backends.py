@@ -0,0 +1,117 @@
+import asyncio
+import os
+import sys
+from core.config import get_settings
+
+class PrinterError(Exception):
+    """Delivery failed; the spooler retries the job with backoff."""
+
+def parse_host_port(target: str, default_port: int = 9100) -> tuple:
+    host, _, port = target.rpartition(":")
+    if not host:
+        return target, default_port
+    return host, int(port)
+
+class TcpBackend:
+    """Raw TCP (JetDirect / port 9100): most network thermal printers."""
+
+    async def send(self, target: str, job_id: int, data: bytes) -> None:
+        host, port = parse_host_port(target)
+        timeout = get_settings().PRINT_TCP_TIMEOUT_SECONDS
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise PrinterError(f"Cannot connect to {host}:{port}: {e or 'timeout'}") from e
+        try:
+            writer.write(data)
+            await asyncio.wait_for(writer.drain(), timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise PrinterError(f"Write to {host}:{port} failed: {e or 'timeout'}") from e
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def probe(self, target: str) -> None:
+        host, port = parse_host_port(target)
+        timeout = get_settings().PRINT_TCP_TIMEOUT_SECONDS
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise PrinterError(f"Cannot connect to {host}:{port}: {e or 'timeout'}") from e
+        writer.close()
+
+class FileBackend:
+    """One `job-<id>.bin` per job in the target directory (tests, print-to-file, shared folders)."""
+
+    @staticmethod
+    def _write(directory: str, job_id: int, data: bytes) -> None:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"job-{job_id}.bin")
+        # Write then rename: a watcher never sees a half-written job
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    async def send(self, target: str, job_id: int, data: bytes) -> None:
+        try:
+            await asyncio.to_thread(self._write, target, job_id, data)
+        except OSError as e:
+            raise PrinterError(f"Cannot write to {target}: {e}") from e
+
+    async def probe(self, target: str) -> None:
+        if not os.path.isdir(target) or not os.access(target, os.W_OK):
+            raise PrinterError(f"Directory {target} is not writable")
+
+class OsBackend:
+    """Windows spooler via pywin32 (same calls as tools/printer_bridge.py); only on the print server host."""
+
+    @staticmethod
+    def _win32print():
+        if sys.platform != "win32":
+            raise PrinterError("OS printers are only available on Windows")
+        try:
+            import win32print
+        except ImportError as e:
+            raise PrinterError("pywin32 is not installed") from e
+        return win32print
+
+    def _write(self, printer_name: str, data: bytes) -> None:
+        win32print = self._win32print()
+        try:
+            handle = win32print.OpenPrinter(printer_name)
+            try:
+                win32print.StartDocPrinter(handle, 1, ("AntiGravity Receipt", None, "RAW"))
+                try:
+                    win32print.StartPagePrinter(handle)
+                    win32print.WritePrinter(handle, data)
+                    win32print.EndPagePrinter(handle)
+                finally:
+                    win32print.EndDocPrinter(handle)
+            finally:
+                win32print.ClosePrinter(handle)
+        except PrinterError:
+            raise
+        except Exception as e:
+            raise PrinterError(f"{printer_name}: {e}") from e
+
+    async def send(self, target: str, job_id: int, data: bytes) -> None:
+        await asyncio.to_thread(self._write, target, data)
+
+    async def probe(self, target: str) -> None:
+        win32print = self._win32print()
+        try:
+            handle = win32print.OpenPrinter(target)
+            win32print.ClosePrinter(handle)
+        except Exception as e:
+            raise PrinterError(f"{target}: {e}") from e
+
+# PrinterBackend value -> backend
+BACKENDS = {
+    "tcp": TcpBackend(),
+    "file": FileBackend(),
+    "os": OsBackend(),
+}
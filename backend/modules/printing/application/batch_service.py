@@ -0,0 +1,184 @@
+import asyncio
+import io
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from core.config import get_settings
+from ..domain.schemas import ReceiptData, ReceiptItem
+from .service import ReceiptService
+
+# Thermal printers: longer item names are cut (ReceiptItem.name max length)
+ITEM_NAME_MAX = 24
+STORE_KEYS = ('store_name', 'store_address', 'store_cuit', 'store_iva_status')
+
+_pool = None
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=get_settings().PRINT_BATCH_WORKERS)
+    return _pool
+
+def _render_chunk(receipts, config) -> list:
+    return [ReceiptService.generate_receipt_bytes(receipt, config) for receipt in receipts]
+
+async def render_receipts(receipts: list, config) -> list:
+    """
+    ESC/POS bytes per receipt, in order. Small batches render inline; from
+    PRINT_BATCH_POOL_THRESHOLD receipts on, chunks are spread over a process pool.
+    """
+    settings = get_settings()
+    if settings.PRINT_BATCH_WORKERS < 1 or len(receipts) < settings.PRINT_BATCH_POOL_THRESHOLD:
+        return _render_chunk(receipts, config)
+
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    size = -(-len(receipts) // settings.PRINT_BATCH_WORKERS)
+    chunks = await asyncio.gather(*(
+        loop.run_in_executor(pool, _render_chunk, receipts[i:i + size], config)
+        for i in range(0, len(receipts), size)
+    ))
+    return [job for chunk in chunks for job in chunk]
+
+def build_zip(named_jobs: list) -> bytes:
+    """One entry per (file name, bytes) job."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, job in named_jobs:
+            archive.writestr(name, job)
+    return buffer.getvalue()
+
+class ReceiptBatchService:
+    """
+    Builds ReceiptData for many sales / fiscal documents with a fixed number of queries
+    (headers, items + product names, customers, store settings), whatever the batch size.
+    Documents print their billed lines, sales what was sold.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _store_settings(self) -> dict:
+        from modules.admin.domain.models import SystemSetting
+
+        rows = await self.db.execute(select(SystemSetting.key, SystemSetting.value).where(SystemSetting.key.in_(STORE_KEYS)))
+        return dict(rows.all())
+
+    async def _items(self, sale_ids) -> dict:
+        from modules.sales.domain.models import SaleItem
+        from modules.catalog.domain.models import Product
+
+        rows = (await self.db.execute(
+            select(SaleItem.sale_id, SaleItem.qty, SaleItem.price, Product.name, Product.measurement_unit)
+            .join(Product, Product.id == SaleItem.product_id)
+            .where(SaleItem.sale_id.in_(sale_ids))
+            .order_by(SaleItem.sale_id, SaleItem.id)
+        )).all()
+        return self._group(rows, "sale_id")
+
+    async def _document_items(self, document_ids) -> dict:
+        from modules.invoicing.domain.models import DocumentItem
+        from modules.catalog.domain.models import Product
+
+        rows = (await self.db.execute(
+            select(DocumentItem.document_id, DocumentItem.qty, DocumentItem.price, Product.name, Product.measurement_unit)
+            .join(Product, Product.id == DocumentItem.product_id)
+            .where(DocumentItem.document_id.in_(document_ids))
+            .order_by(DocumentItem.document_id, DocumentItem.id)
+        )).all()
+        return self._group(rows, "document_id")
+
+    @staticmethod
+    def _group(rows, key: str) -> dict:
+        items = {}
+        for r in rows:
+            price = r.price or 0.0
+            items.setdefault(getattr(r, key), []).append(ReceiptItem(
+                name=r.name[:ITEM_NAME_MAX], qty=r.qty, price=price, total=r.qty * price,
+                measurement_unit=r.measurement_unit,
+            ))
+        return items
+
+    async def _customers(self, customer_ids) -> dict:
+        from modules.customers.domain.models import Customer
+
+        ids = {cid for cid in customer_ids if cid is not None}
+        if not ids:
+            return {}
+        rows = await self.db.execute(select(Customer.id, Customer.name, Customer.tax_id).where(Customer.id.in_(ids)))
+        return {r.id: r for r in rows.all()}
+
+    @staticmethod
+    def _receipt(header: dict, items: list, customer, store: dict) -> ReceiptData:
+        return ReceiptData(
+            store_name=store.get('store_name') or "",
+            store_address=store.get('store_address') or None,
+            store_cuit=store.get('store_cuit') or None,
+            store_iva=store.get('store_iva_status') or None,
+            sale_id=str(header["sale_id"]),
+            date=header["date"],
+            customer_name=customer.name if customer else None,
+            customer_tax_id=customer.tax_id if customer else None,
+            items=items,
+            subtotal=header["total"],
+            total=header["total"],
+            payments=[], # Payments are not linked to sales
+        )
+
+    async def load(self, sale_ids: list = (), document_ids: list = ()) -> tuple:
+        """
+        Returns ([(file name, ReceiptData)] in request order, missing ids).
+        Documents print their fiscal snapshot (store data and total at issuance).
+        """
+        from modules.sales.domain.models import Sale
+        from modules.invoicing.domain.models import Document
+
+        headers, missing = [], {"sale_ids": [], "document_ids": []}
+        if sale_ids:
+            rows = (await self.db.execute(
+                select(Sale.id, Sale.created_at, Sale.total, Sale.customer_id).where(Sale.id.in_(sale_ids))
+            )).all()
+            by_id = {r.id: r for r in rows}
+            for sid in sale_ids:
+                r = by_id.get(sid)
+                if r is None:
+                    missing["sale_ids"].append(sid)
+                    continue
+                headers.append({"name": f"sale-{sid}.bin", "sale_id": sid, "document_id": None, "date": r.created_at,
+                                "total": r.total or 0.0, "customer_id": r.customer_id, "store": None})
+        if document_ids:
+            rows = (await self.db.execute(
+                select(Document.id, Document.sale_id, Document.created_at, Document.total,
+                       Document.store_name, Document.store_address, Document.store_cuit, Document.store_iva_status,
+                       Sale.customer_id)
+                .outerjoin(Sale, Sale.id == Document.sale_id)
+                .where(Document.id.in_(document_ids))
+            )).all()
+            by_id = {r.id: r for r in rows}
+            for did in document_ids:
+                r = by_id.get(did)
+                if r is None or r.sale_id is None:
+                    missing["document_ids"].append(did)
+                    continue
+                headers.append({"name": f"document-{did}.bin", "sale_id": r.sale_id, "document_id": did, "date": r.created_at,
+                                "total": r.total or 0.0, "customer_id": r.customer_id,
+                                "store": {key: getattr(r, key) for key in STORE_KEYS}})
+
+        if not headers:
+            return [], missing
+        document_items = {}
+        if any(h["document_id"] for h in headers):
+            document_items = await self._document_items({h["document_id"] for h in headers if h["document_id"]})
+        # Documents issued before billed lines were stored print the sale (they billed all of it)
+        for h in headers:
+            h["items"] = document_items.get(h["document_id"])
+        sale_ids = {h["sale_id"] for h in headers if h["items"] is None}
+        items = await self._items(sale_ids) if sale_ids else {}
+        customers = await self._customers(h["customer_id"] for h in headers)
+        store = await self._store_settings() if any(h["store"] is None for h in headers) else {}
+
+        receipts = [
+            (h["name"], self._receipt(h, h["items"] or items.get(h["sale_id"], []), customers.get(h["customer_id"]), h["store"] or store))
+            for h in headers
+        ]
+        return receipts, missing
@@ -97,80 +97,17 @@ class ReceiptService:
     def generate_receipt_bytes(data, config) -> bytes:
         """
         Generates RAW bytes for a receipt based on data and config.
+        Header and footer come pre-encoded from the compiled template cache
+        (see templates.py); only the variable sections are encoded per call.
         """
-        builder = EscPosBuilder(encoding=config.encoding)
-        w = 48 if config.paper_width == 80 else 32 # approx chars per line
-        
-        # 1. Init
-        builder.init()
-
-        # 2. Header
-        builder.align("center")
-        builder.set_size(1, 1).emphasize(True)
-        builder.text_ln(data.store_name)
-        builder.emphasize(False).set_size(1, 1)
-        if data.store_address: builder.text_ln(data.store_address)
-        if data.store_cuit: builder.text_ln(f"CUIT: {data.store_cuit}")
-        if data.store_iva: builder.text_ln(data.store_iva)
-        
-        builder.feed(1)
-        
-        # 3. Meta
-        builder.align("left")
-        builder.text_ln(f"Fecha: {data.date.strftime('%d/%m/%Y %H:%M')}")
-        builder.text_ln(f"Ticket: {data.sale_id}")
-        if data.customer_name: builder.text_ln(f"Cliente: {data.customer_name}")
-        
-        builder.product_separator(w)
+        from .templates import render_receipt
+        return render_receipt(data, config)
 
-        # 4. Items
-        builder.align("left")
-        # Header for items
-        # Qty x Price   Total
-        # Name
-        
-        for item in data.items:
-            # Line 1: Name (Truncated if too long, or wrapped)
-            builder.emphasize(True).text_ln(item.name).emphasize(False)
-            
-            # Line 2: Qty x Unit Price ... Total
-            qty_price = f"{item.qty:.2f} x ${item.price:.2f}"
-            total_str = f"${item.total:.2f}"
-            
-            # Calculate spaces for alignment
-            spaces = w - len(qty_price) - len(total_str)
-            if spaces < 1: spaces = 1
-            
-            builder.text_ln(qty_price + (" " * spaces) + total_str)
-            # builder.feed(1) # Optional spacing
-
-        builder.product_separator(w)
-
-        # 5. Totals
-        builder.align("right")
-        builder.emphasize(True).set_size(1, 2) # Double height
-        builder.text_ln(f"TOTAL: ${data.total:.2f}")
-        builder.set_size(1, 1).emphasize(False)
-        
-        builder.feed(1)
-        builder.align("left")
-        for pay in data.payments:
-             builder.text_ln(f"Pago: {pay.method} ${pay.amount:.2f}")
-
-        # 6. Footer / QR
-        builder.feed(1)
-        builder.align("center")
-        if data.qr_data:
-            builder.qr_code(data.qr_data)
-            builder.feed(1)
-        
-        builder.text_ln("GRACIAS POR SU COMPRA")
-        
-        # 7. Feed & Cut
-        builder.feed(config.feed_lines)
-        builder.cut(mode=config.cut_mode)
-        
-        return builder.get_bytes()
+    @staticmethod
+    def iter_receipts_bytes(receipts, config):
+        """Yields one ESC/POS job per receipt; concatenated they form a single spool (each job ends with its cut)."""
+        for receipt in receipts:
+            yield ReceiptService.generate_receipt_bytes(receipt, config)
 
     # Helper function added to builder dynamically or here
     def product_separator(self, w):
@@ -0,0 +1,226 @@
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, or_
+from core.config import get_settings
+from ..domain.models import Printer, PrintJob, PrintJobStatus
+from .backends import BACKENDS, PrinterError
+
+def retry_delay(attempts: int, base: float, cap: float) -> float:
+    """Exponential backoff after the `attempts`-th failed delivery: base, 2*base, 4*base... up to `cap`."""
+    return min(cap, base * 2 ** max(attempts - 1, 0))
+
+class PrintQueueService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def enqueue(self, printer_id: int, jobs: list) -> list:
+        """Queues one job per (reference, bytes) pair, in order. Raises LookupError for unknown / inactive printers."""
+        printer = await self.db.get(Printer, printer_id)
+        if not printer or not printer.is_active:
+            raise LookupError("Printer not found")
+
+        now = datetime.utcnow()
+        max_attempts = get_settings().PRINT_MAX_ATTEMPTS
+        queued = [
+            PrintJob(
+                printer_id=printer_id, payload=data, size=len(data), reference=reference,
+                status=PrintJobStatus.QUEUED.value, attempts=0, max_attempts=max_attempts,
+                created_at=now, updated_at=now,
+            )
+            for reference, data in jobs
+        ]
+        self.db.add_all(queued)
+        await self.db.commit()
+        return queued
+
+    async def retry(self, job_id: int) -> PrintJob:
+        """Requeues a FAILED job with a fresh attempt budget. LookupError / ValueError as the router expects."""
+        job = await self.db.get(PrintJob, job_id)
+        if not job:
+            raise LookupError("Print job not found")
+        if job.status != PrintJobStatus.FAILED.value:
+            raise ValueError(f"Only FAILED jobs can be retried (job is {job.status})")
+
+        job.status = PrintJobStatus.QUEUED.value
+        job.attempts = 0
+        job.next_attempt_at = None
+        job.completed_at = None
+        job.updated_at = datetime.utcnow()
+        await self.db.commit()
+        return job
+
+    async def queue_counts(self, printer_id: int) -> dict:
+        rows = await self.db.execute(
+            select(PrintJob.status, func.count(PrintJob.id), func.min(PrintJob.created_at))
+            .where(PrintJob.printer_id == printer_id, PrintJob.status != PrintJobStatus.DONE.value)
+            .group_by(PrintJob.status)
+        )
+        counts = {status.value.lower(): 0 for status in PrintJobStatus if status != PrintJobStatus.DONE}
+        oldest = None
+        for status, count, created_at in rows.all():
+            counts[status.lower()] = count
+            if status == PrintJobStatus.QUEUED.value:
+                oldest = created_at
+        return {**counts, "oldest_queued_at": oldest}
+
+class PrintSpooler:
+    """
+    Delivers queued PrintJobs in the background (started with the app).
+    Each pass requeues expired PRINTING leases, then claims due jobs per printer up to its
+    `concurrency` with a conditional UPDATE (safe if several processes poll the same table).
+    Failures are retried with exponential backoff until `max_attempts`, then marked FAILED.
+    Jobs of one printer are sent in id order, but a job waiting for its retry does not block the next ones.
+    """
+    def __init__(self, session_factory=None, backends: dict | None = None):
+        if session_factory is None:
+            from core.database import SessionLocal
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        self.backends = backends if backends is not None else BACKENDS
+        self._wake = asyncio.Event()
+        self._loop_task = None
+        # job id -> (printer id, delivery task)
+        self._running = {}
+
+    @property
+    def running(self) -> bool:
+        return self._loop_task is not None and not self._loop_task.done()
+
+    def wake(self) -> None:
+        """Skips the rest of the poll interval (new jobs, freed printer slot)."""
+        self._wake.set()
+
+    def start(self) -> None:
+        if not self.running:
+            self._wake = asyncio.Event()
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops polling and gives in-flight deliveries one TCP timeout to finish; leftovers are requeued by the lease."""
+        if self._loop_task:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+
+        tasks = [task for _, task in self._running.values()]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=get_settings().PRINT_TCP_TIMEOUT_SECONDS)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def drain(self) -> None:
+        """Waits for the deliveries started so far (tests, shutdown)."""
+        while self._running:
+            await asyncio.gather(*(task for _, task in list(self._running.values())), return_exceptions=True)
+
+    async def _run(self) -> None:
+        settings = get_settings()
+        while True:
+            self._wake.clear()
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"Print spooler pass failed: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.PRINT_SPOOLER_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    def _busy(self, printer_id: int) -> int:
+        return sum(1 for owner, _ in self._running.values() if owner == printer_id)
+
+    async def run_once(self, now: datetime | None = None) -> int:
+        """One poll pass. Returns the number of jobs claimed (their delivery runs as background tasks)."""
+        settings = get_settings()
+        now = now or datetime.utcnow()
+        claimed = []
+
+        async with self.session_factory() as db:
+            # A PRINTING job this process does not own and whose lease expired was left by a dead worker
+            lease_expired = update(PrintJob).where(
+                PrintJob.status == PrintJobStatus.PRINTING.value,
+                PrintJob.updated_at < now - timedelta(seconds=settings.PRINT_JOB_LEASE_SECONDS),
+            )
+            if self._running:
+                lease_expired = lease_expired.where(PrintJob.id.notin_(list(self._running)))
+            await db.execute(lease_expired.values(status=PrintJobStatus.QUEUED.value, next_attempt_at=None))
+
+            printers = (await db.execute(
+                select(Printer.id, Printer.concurrency).where(Printer.is_active == True)
+            )).all()
+            for printer_id, concurrency in printers:
+                free = max(concurrency or 1, 1) - self._busy(printer_id)
+                if free <= 0:
+                    continue
+                due = (await db.execute(
+                    select(PrintJob.id)
+                    .where(
+                        PrintJob.printer_id == printer_id,
+                        PrintJob.status == PrintJobStatus.QUEUED.value,
+                        or_(PrintJob.next_attempt_at == None, PrintJob.next_attempt_at <= now),
+                    )
+                    .order_by(PrintJob.id)
+                    .limit(free)
+                )).scalars().all()
+                for job_id in due:
+                    result = await db.execute(
+                        update(PrintJob)
+                        .where(PrintJob.id == job_id, PrintJob.status == PrintJobStatus.QUEUED.value)
+                        .values(status=PrintJobStatus.PRINTING.value, attempts=PrintJob.attempts + 1, updated_at=now)
+                    )
+                    if result.rowcount == 1:
+                        claimed.append((printer_id, job_id))
+            await db.commit()
+
+        for printer_id, job_id in claimed:
+            self._running[job_id] = (printer_id, asyncio.create_task(self._deliver(job_id)))
+        return len(claimed)
+
+    async def _deliver(self, job_id: int) -> None:
+        settings = get_settings()
+        try:
+            async with self.session_factory() as db:
+                job = await db.get(PrintJob, job_id)
+                printer = await db.get(Printer, job.printer_id)
+
+                error = None
+                try:
+                    backend = self.backends.get(printer.backend)
+                    if backend is None:
+                        raise PrinterError(f"Unknown printer backend '{printer.backend}'")
+                    await backend.send(printer.target, job.id, job.payload)
+                except Exception as e:
+                    error = str(e) or e.__class__.__name__
+
+                now = datetime.utcnow()
+                job.updated_at = now
+                job.last_error = error
+                if error is None:
+                    job.status = PrintJobStatus.DONE.value
+                    job.completed_at = now
+                    printer.last_status = "ok"
+                    printer.last_error = None
+                    printer.last_success_at = now
+                else:
+                    if job.attempts >= job.max_attempts:
+                        job.status = PrintJobStatus.FAILED.value
+                        job.completed_at = now
+                    else:
+                        job.status = PrintJobStatus.QUEUED.value
+                        job.next_attempt_at = now + timedelta(seconds=retry_delay(
+                            job.attempts, settings.PRINT_RETRY_BASE_SECONDS, settings.PRINT_RETRY_MAX_SECONDS
+                        ))
+                    printer.last_status = "error"
+                    printer.last_error = error
+                await db.commit()
+        except Exception as e:
+            # Bookkeeping failed (database down): the lease puts the job back in the queue
+            print(f"Print job {job_id} could not be recorded: {e}")
+        finally:
+            self._running.pop(job_id, None)
+            self.wake()
+
+# Process-wide spooler, started / stopped by the app lifespan
+print_spooler = PrintSpooler()
@@ -0,0 +1,135 @@
+import codecs
+from dataclasses import dataclass
+from functools import lru_cache
+from string import Formatter
+from ..domain.schemas import DEFAULT_TEMPLATE, TEMPLATE_FIELDS
+from .service import EscPosBuilder
+
+# Cached compiled templates (one per store settings + printer config + template)
+TEMPLATE_CACHE_SIZE = 256
+
+BOLD_ON = b'\x1bE\x01'
+BOLD_OFF = b'\x1bE\x00'
+FEED_1 = b'\x1bd\x01'
+QR_SETUP = b'\x1d(k\x04\x001A2\x00' + b'\x1d(k\x03\x001C\x06' + b'\x1d(k\x03\x001E1'
+QR_PRINT = b'\x1d(k\x03\x001Q0'
+
+@lru_cache(maxsize=64)
+def resolve_encoding(name: str) -> str:
+    """Codec lookup done once per name; unknown encodings fall back to UTF-8 like EscPosBuilder."""
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return "utf-8"
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """
+    Pre-encoded static segments of a receipt. Rendering only encodes the variable text
+    (meta, items, totals, payments, QR) between them.
+    """
+    encoding: str
+    width: int # Characters per line
+    header: bytes # init + header lines + feed, ends left aligned
+    separator: bytes # "-" * width line, ends left aligned
+    totals_open: bytes # separator + right align + bold + double height
+    totals_close: bytes # back to normal size, feed, left aligned
+    footer_open: bytes # feed + center align (QR goes here)
+    footer: bytes # footer lines + feed + cut
+
+def _compile_lines(builder: EscPosBuilder, lines, fields: dict, align: str | None) -> str | None:
+    for line in lines:
+        names = [name for _, name, _, _ in Formatter().parse(line.text) if name]
+        if line.optional and any(not fields.get(name) for name in names):
+            continue
+        if line.align != align:
+            builder.align(line.align)
+            align = line.align
+        styled = line.bold or line.width != 1 or line.height != 1
+        if styled:
+            builder.set_size(line.width, line.height).emphasize(line.bold)
+        builder.text_ln(line.text.format(**{name: fields.get(name) or "" for name in TEMPLATE_FIELDS}))
+        if styled:
+            builder.emphasize(False).set_size(1, 1)
+    return align
+
+def _segment(encoding: str, build) -> bytes:
+    builder = EscPosBuilder(encoding=encoding)
+    build(builder)
+    return builder.get_bytes()
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _compile(store: tuple, paper_width: int, encoding: str, cut_mode: str, feed_lines: int, template_json: str | None):
+    from ..domain.schemas import ReceiptTemplate
+
+    template = ReceiptTemplate.model_validate_json(template_json) if template_json else DEFAULT_TEMPLATE
+    fields = dict(zip(TEMPLATE_FIELDS, store))
+    encoding = resolve_encoding(encoding)
+    width = 48 if paper_width == 80 else 32
+
+    def header(b):
+        b.init()
+        _compile_lines(b, template.header, fields, None)
+        b.feed(1).align("left")
+
+    def separator(b):
+        b.text_ln("-" * width).align("left")
+
+    def totals_open(b):
+        b.text_ln("-" * width).align("right").emphasize(True).set_size(1, 2)
+
+    def totals_close(b):
+        b.set_size(1, 1).emphasize(False).feed(1).align("left")
+
+    def footer_open(b):
+        b.feed(1).align("center")
+
+    def footer(b):
+        _compile_lines(b, template.footer, fields, "center")
+        b.feed(feed_lines).cut(mode=cut_mode)
+
+    return CompiledTemplate(
+        encoding=encoding,
+        width=width,
+        header=_segment(encoding, header),
+        separator=_segment(encoding, separator),
+        totals_open=_segment(encoding, totals_open),
+        totals_close=_segment(encoding, totals_close),
+        footer_open=_segment(encoding, footer_open),
+        footer=_segment(encoding, footer),
+    )
+
+def compile_template(data, config) -> CompiledTemplate:
+    store = (data.store_name, data.store_address, data.store_cuit, data.store_iva)
+    template_json = config.template.model_dump_json() if config.template else None
+    return _compile(store, config.paper_width, config.encoding, config.cut_mode, config.feed_lines, template_json)
+
+def render_receipt(data, config) -> bytes:
+    compiled = compile_template(data, config)
+    encoding, w = compiled.encoding, compiled.width
+
+    def enc(text: str) -> bytes:
+        return text.encode(encoding, errors="replace")
+
+    meta = f"Fecha: {data.date.strftime('%d/%m/%Y %H:%M')}\nTicket: {data.sale_id}\n"
+    if data.customer_name:
+        meta += f"Cliente: {data.customer_name}\n"
+
+    parts = [compiled.header, enc(meta), compiled.separator]
+    for item in data.items:
+        qty_price = f"{item.qty:.2f} x ${item.price:.2f}"
+        total_str = f"${item.total:.2f}"
+        spaces = max(w - len(qty_price) - len(total_str), 1)
+        parts += (BOLD_ON, enc(item.name + "\n"), BOLD_OFF, enc(qty_price + " " * spaces + total_str + "\n"))
+
+    parts += (compiled.totals_open, enc(f"TOTAL: ${data.total:.2f}\n"), compiled.totals_close)
+    if data.payments:
+        parts.append(enc("".join(f"Pago: {pay.method} ${pay.amount:.2f}\n" for pay in data.payments)))
+    parts.append(compiled.footer_open)
+    if data.qr_data:
+        qr = enc(data.qr_data)
+        size = len(qr) + 3
+        parts += (QR_SETUP, b'\x1d(k' + bytes([size % 256, size // 256]) + b'1P0', qr, QR_PRINT, FEED_1)
+    parts.append(compiled.footer)
+    # Single allocation for the whole job
+    return b"".join(parts)
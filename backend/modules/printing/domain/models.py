@@ -0,0 +1,55 @@
+from sqlalchemy import Column, Integer, String, Boolean, LargeBinary, ForeignKey, DateTime, Index
+from core.database import Base
+from datetime import datetime
+import enum
+
+class PrinterBackend(str, enum.Enum):
+    OS = "os" # Windows spooler (win32print); target = printer name
+    TCP = "tcp" # Raw port 9100 (JetDirect); target = "host:port"
+    FILE = "file" # One file per job; target = directory
+
+class PrintJobStatus(str, enum.Enum):
+    QUEUED = "QUEUED"
+    PRINTING = "PRINTING"
+    DONE = "DONE"
+    FAILED = "FAILED" # Gave up after max_attempts; can be retried by hand
+
+class Printer(Base):
+    __tablename__ = "printers"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, nullable=False)
+    backend = Column(String, nullable=False)
+    target = Column(String, nullable=False)
+    concurrency = Column(Integer, default=1) # Jobs sent at the same time (thermal printers: 1)
+    is_active = Column(Boolean, default=True)
+
+    # Last delivery outcome, kept by the spooler
+    last_status = Column(String, nullable=True) # ok / error
+    last_error = Column(String, nullable=True)
+    last_success_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class PrintJob(Base):
+    __tablename__ = "print_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    printer_id = Column(Integer, ForeignKey("printers.id"), nullable=False, index=True)
+    status = Column(String, default=PrintJobStatus.QUEUED.value, nullable=False)
+    payload = Column(LargeBinary, nullable=False) # Raw ESC/POS bytes
+    size = Column(Integer, default=0)
+    reference = Column(String, nullable=True) # e.g. "sale-42", "document-7"
+
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=5)
+    next_attempt_at = Column(DateTime, nullable=True) # Backoff; None = as soon as possible
+    last_error = Column(String, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow) # PRINTING lease start
+    completed_at = Column(DateTime, nullable=True)
+
+    # Spooler poll: due jobs by status
+    __table_args__ = (
+        Index("ix_print_jobs_status_next_attempt_at", "status", "next_attempt_at"),
+    )
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Literal, Optional
+from string import Formatter
 from datetime import datetime
 
 class ReceiptItem(BaseModel):
@@ -28,15 +29,105 @@ class ReceiptData(BaseModel):
     payments: List[ReceiptPayment]
     qr_data: Optional[str] = None
 
+# Fields a template line may reference, e.g. "CUIT: {store_cuit}"
+TEMPLATE_FIELDS = ("store_name", "store_address", "store_cuit", "store_iva")
+
+class TemplateLine(BaseModel):
+    text: str
+    align: Literal["left", "center", "right"] = "left"
+    bold: bool = False
+    width: int = Field(1, ge=1, le=8)
+    height: int = Field(1, ge=1, le=8)
+    optional: bool = False # Skip the line when a referenced field is empty
+
+    @field_validator("text")
+    @classmethod
+    def known_fields(cls, v: str) -> str:
+        unknown = {name for _, name, _, _ in Formatter().parse(v) if name is not None} - set(TEMPLATE_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown template fields: {', '.join(sorted(unknown))}")
+        return v
+
+class ReceiptTemplate(BaseModel):
+    """Static receipt sections; items, totals and payments keep the fixed layout."""
+    header: List[TemplateLine]
+    footer: List[TemplateLine]
+
+DEFAULT_TEMPLATE = ReceiptTemplate(
+    header=[
+        TemplateLine(text="{store_name}", align="center", bold=True),
+        TemplateLine(text="{store_address}", align="center", optional=True),
+        TemplateLine(text="CUIT: {store_cuit}", align="center", optional=True),
+        TemplateLine(text="{store_iva}", align="center", optional=True),
+    ],
+    footer=[
+        TemplateLine(text="GRACIAS POR SU COMPRA", align="center"),
+    ],
+)
+
 class PrinterConfig(BaseModel):
     paper_width: int = 80 # 80 or 58 mm
     encoding: str = "cp850" # default western europe
     cut_mode: str = "partial" # full or partial
     feed_lines: int = 4
+    template: Optional[ReceiptTemplate] = None # None: DEFAULT_TEMPLATE
 
 class PrintJobRequest(BaseModel):
     receipt: ReceiptData
     config: PrinterConfig
 
+class MultiPrintJobRequest(BaseModel):
+    receipts: List[ReceiptData] = Field(..., min_length=1, max_length=500)
+    config: PrinterConfig
+
+class BatchPrintRequest(BaseModel):
+    sale_ids: List[int] = Field(default_factory=list, max_length=5000)
+    document_ids: List[int] = Field(default_factory=list, max_length=5000)
+    config: PrinterConfig = Field(default_factory=PrinterConfig)
+    output: str = Field("spool", pattern="^(spool|zip)$") # spool: one concatenated job; zip: one entry per receipt
+
 class PrintJobResponse(BaseModel):
     raw_bytes_base64: str
+
+class PrinterCreate(BaseModel):
+    name: str
+    backend: str = Field(..., pattern="^(os|tcp|file)$")
+    target: str # os: printer name, tcp: "host:port" (port defaults to 9100), file: directory
+    concurrency: int = Field(1, ge=1, le=16)
+
+class PrinterResponse(BaseModel):
+    id: int
+    name: str
+    backend: str
+    target: str
+    concurrency: int
+    is_active: bool
+    last_status: Optional[str] = None
+    last_error: Optional[str] = None
+    last_success_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class SpoolJobRequest(BaseModel):
+    printer_id: int
+    receipts: List[ReceiptData] = Field(default_factory=list, max_length=500)
+    sale_ids: List[int] = Field(default_factory=list, max_length=5000)
+    document_ids: List[int] = Field(default_factory=list, max_length=5000)
+    config: PrinterConfig = Field(default_factory=PrinterConfig)
+
+class SpoolJobResponse(BaseModel):
+    id: int
+    printer_id: int
+    status: str
+    reference: Optional[str] = None
+    size: int
+    attempts: int
+    max_attempts: int
+    next_attempt_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,10 @@
+from app.module_registry import Module
+from .api.v1.router import router
+from .domain import models
+
+module = Module(
+    name="printing",
+    display_name="Printing",
+    router=router,
+    models=[models.Printer, models.PrintJob]
+)
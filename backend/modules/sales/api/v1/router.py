@@ -4,17 +4,19 @@ from sqlalchemy import select
 from core.database import get_db
 from modules.sales.domain.models import Sale, SaleItem, SaleStatus
 from modules.inventory.application.service import StockService
-from modules.iam.api.v1.router import get_current_user
-from modules.iam.domain.models import User
+from modules.sales.application.rollup_service import SalesRollupService
+from modules.iam.api.v1.router import RoleChecker, get_current_user
+from modules.iam.domain.models import User, UserRole
 from pydantic import BaseModel
-from typing import List
+from typing import List, Literal
+from datetime import datetime
 
 router = APIRouter(prefix="/sales", tags=["Sales"])
 
 class SaleItemCreate(BaseModel):
     product_id: int
     qty: float
-    price: float
+    price: float | None = None # None: resolved from price lists / base price
 
 class SaleCreate(BaseModel):
     warehouse_id: int
@@ -26,6 +28,8 @@ class SaleRead(BaseModel):
     status: str
     warehouse_id: int
     customer_id: int | None
+    total: float | None = 0.0
+    created_at: datetime | None = None
     items: List[SaleItemCreate] # Simplified for response
 
     class Config:
@@ -33,10 +37,22 @@ class SaleRead(BaseModel):
 
 @router.post("/", response_model=SaleRead)
 async def create_sale(data: SaleCreate, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    unpriced = [item.product_id for item in data.items if item.price is None]
+    if unpriced:
+        from modules.catalog.application.price_resolver import price_resolver
+        prices = await price_resolver.resolve_many(db, unpriced, data.customer_id, data.warehouse_id)
+        missing = sorted(set(unpriced) - set(prices))
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Unknown product ids: {missing}")
+        for item in data.items:
+            if item.price is None:
+                item.price = prices[item.product_id]["price"]
+
     sale = Sale(
         warehouse_id=data.warehouse_id, 
         customer_id=data.customer_id,
-        status=SaleStatus.DRAFT.value
+        status=SaleStatus.DRAFT.value,
+        total=sum(item.qty * item.price for item in data.items)
     )
     db.add(sale)
     await db.flush()
@@ -70,6 +86,8 @@ async def confirm_sale(sale_id: int, db: AsyncSession = Depends(get_db), current
             )
     
     sale.status = SaleStatus.CONFIRMED.value
+    sale.confirmed_at = datetime.utcnow()
+    await SalesRollupService(db).apply_sale(sale)
     await db.commit()
     await db.refresh(sale)
     sale.status = SaleStatus.CONFIRMED.value
@@ -87,6 +105,47 @@ async def list_sales(skip: int = 0, limit: int = 50, db: AsyncSession = Depends(
     result = await db.execute(stmt)
     return result.scalars().all()
 
+class SaleSearchPage(BaseModel):
+    items: List[SaleRead]
+    next_cursor: int | None = None
+    count: int | None = None
+    count_is_estimate: bool | None = None
+
+from modules.sales.application.search_service import SaleSearchService
+
+@router.get("/search", response_model=SaleSearchPage)
+async def search_sales(
+    customer_id: int | None = None,
+    product_id: int | None = None,
+    status: SaleStatus | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    min_total: float | None = None,
+    max_total: float | None = None,
+    cursor: int | None = None,
+    limit: int = 50,
+    count: Literal["none", "exact", "estimate"] = "none",
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Composable sale search with keyset pagination.
+    Pass the returned `next_cursor` as `cursor` to fetch the next page.
+    """
+    service = SaleSearchService(db)
+    return await service.search(
+        customer_id=customer_id,
+        product_id=product_id,
+        status=status.value if status else None,
+        created_from=created_from,
+        created_to=created_to,
+        min_total=min_total,
+        max_total=max_total,
+        cursor=cursor,
+        limit=max(1, min(limit, 200)),
+        count=count,
+    )
+
 @router.get("/{sale_id}")
 async def get_sale(sale_id: int, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
     stmt = select(Sale).options(selectinload(Sale.items)).where(Sale.id == sale_id)
@@ -105,7 +164,7 @@ async def get_sale(sale_id: int, db: AsyncSession = Depends(get_db), current_use
 
 from sqlalchemy import func, desc
 
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 @router.get("/analytics/summary")
 async def get_sales_summary(
@@ -212,14 +271,14 @@ async def get_top_products(
     end_date: datetime | None = None, 
     days: int | None = None,
     limit: int = 5, 
+    metric: Literal["quantity", "revenue", "orders", "margin"] = "quantity",
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Returns top selling products by quantity.
+    Returns top selling products ranked by quantity, revenue, order count or margin.
+    Whole days are served from the daily rollup; only the partial first / last day reads sale lines.
     """
-    from modules.catalog.domain.models import Product
-    
     if start_date and end_date:
         cutoff_start = start_date
         cutoff_end = end_date
@@ -228,25 +287,42 @@ async def get_top_products(
         cutoff_end = datetime.utcnow()
         cutoff_start = cutoff_end - timedelta(days=lookback)
 
-    # Group by product_id, sum qty
-    stmt = (
-        select(SaleItem.product_id, Product.name, func.sum(SaleItem.qty).label("total_sold"), func.sum(SaleItem.qty * SaleItem.price).label("revenue"))
-        .join(Sale)
-        .join(Product, Product.id == SaleItem.product_id)
-        .where(
-            Sale.status == SaleStatus.CONFIRMED.value,
-            Sale.created_at >= cutoff_start,
-            Sale.created_at <= cutoff_end
-        )
-        .group_by(SaleItem.product_id, Product.name)
-        .order_by(desc("total_sold"))
-        .limit(limit)
+    return await SalesRollupService(db).get_top_products(
+        start=cutoff_start,
+        end=cutoff_end,
+        metric=metric,
+        limit=limit,
     )
-    
-    result = await db.execute(stmt)
-    rows = result.all()
-    
-    return [
-        {"product_id": row.product_id, "name": row.name, "total_sold": row.total_sold, "revenue": row.revenue}
-        for row in rows
-    ]
+
+@router.post("/analytics/rollups/rebuild", dependencies=[Depends(RoleChecker([UserRole.ADMIN]))])
+async def rebuild_sales_rollups(db: AsyncSession = Depends(get_db)):
+    """Recomputes the daily product rollup from all confirmed sales (backfill or after a timezone change)."""
+    service = SalesRollupService(db)
+    return await service.rebuild()
+
+from modules.sales.application.affinity_service import AffinityService
+
+@router.get("/analytics/affinity")
+async def get_product_affinity(
+    product_id: int,
+    metric: Literal["lift", "confidence", "support"] = "lift",
+    limit: int = 10,
+    min_pairs: int = 1,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    "Frequently bought together": products most associated with `product_id`,
+    served from the precomputed affinity table.
+    """
+    service = AffinityService(db)
+    return await service.get_related(product_id, metric=metric, limit=limit, min_pairs=min_pairs)
+
+@router.post("/analytics/affinity/refresh", dependencies=[Depends(RoleChecker([UserRole.ADMIN, UserRole.SUPERVISOR]))])
+async def refresh_product_affinity(full: bool = False, db: AsyncSession = Depends(get_db)):
+    """
+    Incrementally folds newly confirmed sales into the affinity table.
+    Intended to be called periodically (cron / scheduler); `full=true` rebuilds from scratch.
+    """
+    service = AffinityService(db)
+    return await service.refresh(full=full)
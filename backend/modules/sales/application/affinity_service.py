@@ -0,0 +1,168 @@
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from itertools import combinations
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, delete, desc
+from core.config import get_settings
+from core.database import dialect_insert
+from modules.sales.domain.models import (
+    Sale, SaleItem, SaleStatus, ProductAffinity, ProductBasketStat
+)
+from modules.sales.application.checkpoint_service import CheckpointService
+
+CHECKPOINT_NAME = "product_affinity"
+# Pairs grow quadratically with basket size; very large baskets (wholesale orders)
+# still count towards product frequency but are skipped for pair generation.
+MAX_BASKET_SIZE = 50
+UPSERT_CHUNK = 500
+
+class AffinityService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.checkpoints = CheckpointService(db)
+
+    @staticmethod
+    def count_baskets(rows):
+        """
+        Builds the sparse co-occurrence counts from (sale_id, product_id) rows.
+        Returns (basket_count, item_counts, pair_counts) where pair keys are (a, b) with a < b.
+        """
+        baskets = defaultdict(set)
+        for sale_id, product_id in rows:
+            baskets[sale_id].add(product_id)
+
+        item_counts = Counter()
+        pair_counts = Counter()
+        for products in baskets.values():
+            items = sorted(products)
+            item_counts.update(items)
+            if len(items) <= MAX_BASKET_SIZE:
+                pair_counts.update(combinations(items, 2))
+        return len(baskets), item_counts, pair_counts
+
+    async def refresh(self, full: bool = False):
+        """
+        Folds sales confirmed since the last run into the co-occurrence counters,
+        then recomputes support / confidence / lift for every stored pair.
+        `full=True` drops the counters and rebuilds from all confirmed sales.
+        """
+        checkpoint = await self.checkpoints.acquire(CHECKPOINT_NAME)
+        if full:
+            await self.db.execute(delete(ProductAffinity))
+            await self.db.execute(delete(ProductBasketStat))
+            checkpoint.last_processed_at = None
+            checkpoint.processed_count = 0
+
+        since = checkpoint.last_processed_at
+        lag = timedelta(seconds=get_settings().ANALYTICS_COMMIT_LAG_SECONDS)
+        until = max(datetime.utcnow() - lag, since or datetime.min)
+
+        stmt = (
+            select(SaleItem.sale_id, SaleItem.product_id)
+            .join(Sale, Sale.id == SaleItem.sale_id)
+            .where(Sale.status == SaleStatus.CONFIRMED.value, Sale.confirmed_at <= until)
+        )
+        if since:
+            stmt = stmt.where(Sale.confirmed_at > since)
+
+        rows = (await self.db.execute(stmt)).all()
+        basket_count, item_counts, pair_counts = self.count_baskets(rows)
+
+        await self._add_item_counts(item_counts)
+        await self._add_pair_counts(pair_counts)
+        self.checkpoints.advance(checkpoint, processed_at=until, processed=basket_count)
+
+        if basket_count or full:
+            await self._recompute_metrics(checkpoint.processed_count)
+
+        await self.db.commit()
+        return {
+            "new_baskets": basket_count,
+            "total_baskets": checkpoint.processed_count,
+            "pairs_updated": len(pair_counts) * 2,
+        }
+
+    async def _add_item_counts(self, item_counts: Counter):
+        rows = [{"product_id": pid, "basket_count": n} for pid, n in item_counts.items()]
+        for i in range(0, len(rows), UPSERT_CHUNK):
+            stmt = dialect_insert(self.db, ProductBasketStat).values(rows[i:i + UPSERT_CHUNK])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["product_id"],
+                set_={"basket_count": ProductBasketStat.basket_count + stmt.excluded.basket_count},
+            )
+            await self.db.execute(stmt)
+
+    async def _add_pair_counts(self, pair_counts: Counter):
+        rows = []
+        for (a, b), n in pair_counts.items():
+            rows.append({"product_id": a, "related_product_id": b, "pair_count": n})
+            rows.append({"product_id": b, "related_product_id": a, "pair_count": n})
+        for i in range(0, len(rows), UPSERT_CHUNK):
+            stmt = dialect_insert(self.db, ProductAffinity).values(rows[i:i + UPSERT_CHUNK])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["product_id", "related_product_id"],
+                set_={"pair_count": ProductAffinity.pair_count + stmt.excluded.pair_count},
+            )
+            await self.db.execute(stmt)
+
+    async def _recompute_metrics(self, total_baskets: int):
+        if not total_baskets:
+            return
+        # Set-based: one UPDATE with correlated lookups of both products' basket counts
+        count_a = (
+            select(ProductBasketStat.basket_count)
+            .where(ProductBasketStat.product_id == ProductAffinity.product_id)
+            .scalar_subquery()
+        )
+        count_b = (
+            select(ProductBasketStat.basket_count)
+            .where(ProductBasketStat.product_id == ProductAffinity.related_product_id)
+            .scalar_subquery()
+        )
+        n = float(total_baskets)
+        await self.db.execute(
+            update(ProductAffinity).values(
+                support=ProductAffinity.pair_count / n,
+                confidence=ProductAffinity.pair_count * 1.0 / count_a,
+                lift=ProductAffinity.pair_count * n / (count_a * count_b),
+            )
+        )
+
+    async def get_related(self, product_id: int, metric: str = "lift", limit: int = 10, min_pairs: int = 1):
+        from modules.catalog.domain.models import Product
+
+        order_column = {
+            "lift": ProductAffinity.lift,
+            "confidence": ProductAffinity.confidence,
+            "support": ProductAffinity.support,
+        }.get(metric, ProductAffinity.lift)
+
+        stmt = (
+            select(
+                ProductAffinity.related_product_id,
+                Product.name,
+                ProductAffinity.pair_count,
+                ProductAffinity.support,
+                ProductAffinity.confidence,
+                ProductAffinity.lift,
+            )
+            .join(Product, Product.id == ProductAffinity.related_product_id)
+            .where(
+                ProductAffinity.product_id == product_id,
+                ProductAffinity.pair_count >= min_pairs,
+            )
+            .order_by(desc(order_column), desc(ProductAffinity.pair_count))
+            .limit(limit)
+        )
+        rows = (await self.db.execute(stmt)).all()
+        return [
+            {
+                "product_id": r.related_product_id,
+                "name": r.name,
+                "pair_count": r.pair_count,
+                "support": r.support,
+                "confidence": r.confidence,
+                "lift": r.lift,
+            }
+            for r in rows
+        ]
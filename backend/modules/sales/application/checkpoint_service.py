@@ -0,0 +1,30 @@
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from modules.sales.domain.models import AnalyticsCheckpoint
+
+class CheckpointService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def acquire(self, name: str) -> AnalyticsCheckpoint:
+        """
+        Loads (or creates) the checkpoint row for a job.
+        On Postgres the row is locked FOR UPDATE so concurrent runs of the same job serialize.
+        """
+        stmt = select(AnalyticsCheckpoint).where(AnalyticsCheckpoint.name == name).with_for_update()
+        checkpoint = (await self.db.execute(stmt)).scalar_one_or_none()
+        if not checkpoint:
+            checkpoint = AnalyticsCheckpoint(name=name, processed_count=0)
+            self.db.add(checkpoint)
+            await self.db.flush()
+        return checkpoint
+
+    def advance(self, checkpoint: AnalyticsCheckpoint, processed_at: datetime | None = None,
+                last_id: int | None = None, processed: int = 0):
+        if processed_at is not None:
+            checkpoint.last_processed_at = processed_at
+        if last_id is not None:
+            checkpoint.last_id = last_id
+        checkpoint.processed_count = (checkpoint.processed_count or 0) + processed
+        checkpoint.updated_at = datetime.utcnow()
@@ -0,0 +1,173 @@
+from collections import defaultdict
+from datetime import datetime, date, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, desc, union_all
+from core.database import dialect_insert
+from modules.sales.domain.models import Sale, SaleItem, SaleStatus, ProductSalesDaily
+from modules.admin.application.service import SettingsService
+
+UPSERT_CHUNK = 500
+
+def split_range(start: datetime, end: datetime, offset: timedelta) -> tuple:
+    """
+    Splits the inclusive UTC range [start, end] into the whole local days it covers
+    ((first_day, last_day) or None) and the partial edges to read from sale lines,
+    as (edge_start, edge_end, include_end) UTC tuples.
+    """
+    # Stored timestamps are naive UTC
+    start, end = (d.astimezone(timezone.utc).replace(tzinfo=None) if d.tzinfo else d for d in (start, end))
+    local_start, local_end = start + offset, end + offset
+    first_day = local_start.date()
+    if local_start != datetime.combine(first_day, datetime.min.time()):
+        first_day += timedelta(days=1)
+    # Day d is whole if its next midnight is still inside the range
+    last_day = local_end.date() - timedelta(days=1)
+
+    if first_day > last_day:
+        return None, [(start, end, True)]
+
+    edges = []
+    first_midnight = datetime.combine(first_day, datetime.min.time()) - offset
+    if start < first_midnight:
+        edges.append((start, first_midnight, False))
+    edges.append((datetime.combine(last_day + timedelta(days=1), datetime.min.time()) - offset, end, True))
+    return (first_day, last_day), edges
+
+class SalesRollupService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.settings_service = SettingsService(db)
+
+    async def _offset_hours(self) -> int:
+        # Same convention as SalesAnalyticsService: stored as "-3" / "+1"
+        offset_str = await self.settings_service.get_setting("timezone_offset", "0")
+        try:
+            return int(offset_str)
+        except (TypeError, ValueError):
+            return 0
+
+    async def local_day(self, moment: datetime) -> date:
+        return (moment + timedelta(hours=await self._offset_hours())).date()
+
+    async def _upsert(self, buckets: dict):
+        rows = [
+            {
+                "day": day, "product_id": product_id, "warehouse_id": warehouse_id,
+                "quantity": agg["quantity"], "revenue": agg["revenue"], "order_count": agg["order_count"],
+            }
+            for (day, product_id, warehouse_id), agg in buckets.items()
+        ]
+        for i in range(0, len(rows), UPSERT_CHUNK):
+            stmt = dialect_insert(self.db, ProductSalesDaily).values(rows[i:i + UPSERT_CHUNK])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["day", "product_id", "warehouse_id"],
+                set_={
+                    "quantity": ProductSalesDaily.quantity + stmt.excluded.quantity,
+                    "revenue": ProductSalesDaily.revenue + stmt.excluded.revenue,
+                    "order_count": ProductSalesDaily.order_count + stmt.excluded.order_count,
+                },
+            )
+            await self.db.execute(stmt)
+
+    async def apply_sale(self, sale: Sale):
+        """
+        Adds a confirmed sale to the daily rollup. Runs inside the caller's transaction
+        so the rollup commits (or rolls back) together with the confirmation.
+        """
+        day = await self.local_day(sale.created_at or datetime.utcnow())
+        buckets = defaultdict(lambda: {"quantity": 0.0, "revenue": 0.0, "order_count": 0})
+        for item in sale.items:
+            agg = buckets[(day, item.product_id, sale.warehouse_id)]
+            agg["quantity"] += item.qty
+            agg["revenue"] += item.qty * (item.price or 0.0)
+            agg["order_count"] = 1
+        await self._upsert(buckets)
+
+    async def rebuild(self):
+        """Recomputes the whole rollup from confirmed sales (backfill / timezone change)."""
+        offset = timedelta(hours=await self._offset_hours())
+        # Collapse repeated lines per sale in SQL; bucket by local day in Python (cross-DB)
+        stmt = (
+            select(
+                Sale.created_at, Sale.warehouse_id, SaleItem.product_id,
+                func.sum(SaleItem.qty).label("quantity"),
+                func.sum(SaleItem.qty * SaleItem.price).label("revenue"),
+            )
+            .join(SaleItem, Sale.id == SaleItem.sale_id)
+            .where(Sale.status == SaleStatus.CONFIRMED.value)
+            .group_by(Sale.id, Sale.created_at, Sale.warehouse_id, SaleItem.product_id)
+        )
+        buckets = defaultdict(lambda: {"quantity": 0.0, "revenue": 0.0, "order_count": 0})
+        for row in (await self.db.execute(stmt)).all():
+            day = (row.created_at + offset).date()
+            agg = buckets[(day, row.product_id, row.warehouse_id)]
+            agg["quantity"] += row.quantity or 0.0
+            agg["revenue"] += row.revenue or 0.0
+            agg["order_count"] += 1
+
+        await self.db.execute(delete(ProductSalesDaily))
+        await self._upsert(buckets)
+        await self.db.commit()
+        return {"rows": len(buckets)}
+
+    async def get_top_products(self, start: datetime, end: datetime, metric: str = "quantity", limit: int = 5):
+        """
+        Top-k products over [start, end] (UTC, inclusive, same semantics as the sale-line query it replaced).
+        Whole local days come from the rollup; the partial days at either end are read from sale lines.
+        Margin uses the product's current landed cost (cost_price plus cost components).
+        """
+        from modules.catalog.domain.models import Product
+        from modules.finance.application.cost_engine import landed_cost_sql
+
+        full_days, edges = split_range(start, end, timedelta(hours=await self._offset_hours()))
+        parts = []
+        if full_days:
+            parts.append(
+                select(
+                    ProductSalesDaily.product_id,
+                    ProductSalesDaily.quantity.label("quantity"),
+                    ProductSalesDaily.revenue.label("revenue"),
+                    ProductSalesDaily.order_count.label("order_count"),
+                ).where(ProductSalesDaily.day >= full_days[0], ProductSalesDaily.day <= full_days[1])
+            )
+        for edge_start, edge_end, include_end in edges:
+            created_to = Sale.created_at <= edge_end if include_end else Sale.created_at < edge_end
+            parts.append(
+                select(
+                    SaleItem.product_id,
+                    func.sum(SaleItem.qty).label("quantity"),
+                    func.sum(SaleItem.qty * SaleItem.price).label("revenue"),
+                    func.count(func.distinct(Sale.id)).label("order_count"),
+                )
+                .join(Sale, Sale.id == SaleItem.sale_id)
+                .where(Sale.status == SaleStatus.CONFIRMED.value, Sale.created_at >= edge_start, created_to)
+                .group_by(SaleItem.product_id)
+            )
+        sold = union_all(*parts).subquery() if len(parts) > 1 else parts[0].subquery()
+
+        total_sold = func.sum(sold.c.quantity).label("total_sold")
+        revenue = func.sum(sold.c.revenue).label("revenue")
+        orders = func.sum(sold.c.order_count).label("orders")
+        margin = (func.sum(sold.c.revenue) - func.sum(sold.c.quantity) * landed_cost_sql()).label("margin")
+
+        order_by = {"quantity": total_sold, "revenue": revenue, "orders": orders, "margin": margin}[metric]
+
+        stmt = (
+            select(Product.id.label("product_id"), Product.name, total_sold, revenue, orders, margin)
+            .join(Product, Product.id == sold.c.product_id)
+            .group_by(Product.id, Product.name, Product.cost_price)
+            .order_by(desc(order_by))
+            .limit(limit)
+        )
+        rows = (await self.db.execute(stmt)).all()
+        return [
+            {
+                "product_id": r.product_id,
+                "name": r.name,
+                "total_sold": r.total_sold,
+                "revenue": r.revenue,
+                "orders": r.orders,
+                "margin": r.margin,
+            }
+            for r in rows
+        ]
@@ -0,0 +1,86 @@
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from sqlalchemy.orm import selectinload
+from modules.sales.domain.models import Sale, SaleItem
+
+# Upper bound for "estimate" counts: the database stops scanning after this many rows
+ESTIMATE_COUNT_CAP = 1000
+
+class SaleSearchService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _filtered(self, stmt, customer_id=None, product_id=None, status=None,
+                  created_from=None, created_to=None, min_total=None, max_total=None):
+        if customer_id is not None:
+            stmt = stmt.where(Sale.customer_id == customer_id)
+        if status:
+            stmt = stmt.where(Sale.status == status)
+        if product_id is not None:
+            # Resolved through ix_sale_items_product_id_sale_id (index-only)
+            stmt = stmt.where(Sale.id.in_(
+                select(SaleItem.sale_id).where(SaleItem.product_id == product_id)
+            ))
+        if created_from:
+            stmt = stmt.where(Sale.created_at >= created_from)
+        if created_to:
+            stmt = stmt.where(Sale.created_at <= created_to)
+        if min_total is not None:
+            stmt = stmt.where(Sale.total >= min_total)
+        if max_total is not None:
+            stmt = stmt.where(Sale.total <= max_total)
+        return stmt
+
+    async def search(
+        self,
+        customer_id: int | None = None,
+        product_id: int | None = None,
+        status: str | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        min_total: float | None = None,
+        max_total: float | None = None,
+        cursor: int | None = None,
+        limit: int = 50,
+        count: str = "none",
+    ):
+        """
+        Keyset-paginated sale search (newest first).
+        `cursor` is the last id of the previous page; `next_cursor` is None on the last page.
+        `count`: "none" (default), "exact" or "estimate" (capped at ESTIMATE_COUNT_CAP).
+        """
+        filters = dict(
+            customer_id=customer_id, product_id=product_id, status=status,
+            created_from=created_from, created_to=created_to,
+            min_total=min_total, max_total=max_total,
+        )
+
+        stmt = self._filtered(select(Sale), **filters)
+        if cursor is not None:
+            stmt = stmt.where(Sale.id < cursor)
+        # Fetch one extra row to know whether there is a next page
+        stmt = stmt.options(selectinload(Sale.items)).order_by(Sale.id.desc()).limit(limit + 1)
+
+        result = await self.db.execute(stmt)
+        sales = list(result.scalars().unique().all())
+        has_more = len(sales) > limit
+        sales = sales[:limit]
+
+        response = {
+            "items": sales,
+            "next_cursor": sales[-1].id if has_more else None,
+        }
+
+        if count == "exact":
+            count_stmt = self._filtered(select(func.count(Sale.id)), **filters)
+            response["count"] = (await self.db.execute(count_stmt)).scalar() or 0
+            response["count_is_estimate"] = False
+        elif count == "estimate":
+            # Bounded scan: cheap on huge result sets, exact below the cap
+            capped = self._filtered(select(Sale.id), **filters).limit(ESTIMATE_COUNT_CAP).subquery()
+            total = (await self.db.execute(select(func.count()).select_from(capped))).scalar() or 0
+            response["count"] = total
+            response["count_is_estimate"] = total >= ESTIMATE_COUNT_CAP
+
+        return response
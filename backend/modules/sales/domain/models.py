@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Date, Enum, Index
 from sqlalchemy.orm import relationship
 from core.database import Base
 from datetime import datetime
@@ -16,20 +16,76 @@ class Sale(Base):
     status = Column(String, default=SaleStatus.DRAFT.value)
     warehouse_id = Column(Integer, nullable=False)
     customer_id = Column(Integer, ForeignKey("customers.id"), nullable=True) # Link to Customer
+    total = Column(Float, default=0.0) # Denormalized sum(qty * price), filterable without joining items
     
     # Audit
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    confirmed_at = Column(DateTime, nullable=True, index=True) # Watermark for incremental analytics jobs
     
     items = relationship("SaleItem", back_populates="sale", lazy="joined")
 
+    # Search indexes: equality filter + id keeps keyset pagination (ORDER BY id DESC) on the index
+    __table_args__ = (
+        Index("ix_sales_customer_id_id", "customer_id", "id"),
+        Index("ix_sales_status_id", "status", "id"),
+    )
+
 class SaleItem(Base):
     __tablename__ = "sale_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False)
+    sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     qty = Column(Float, nullable=False)
     price = Column(Float, default=0.0)
 
     sale = relationship("Sale", back_populates="items")
     product = relationship("Product", lazy="joined")
+
+    # "Who bought X": covers product filter -> sale ids without touching the table
+    __table_args__ = (
+        Index("ix_sale_items_product_id_sale_id", "product_id", "sale_id"),
+    )
+
+# Progress marker for incremental analytics jobs (one row per job)
+class AnalyticsCheckpoint(Base):
+    __tablename__ = "analytics_checkpoints"
+
+    name = Column(String, primary_key=True)
+    last_processed_at = Column(DateTime, nullable=True) # e.g. Sale.confirmed_at watermark
+    last_id = Column(Integer, nullable=True) # For append-only sources (id watermark)
+    processed_count = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+# Number of confirmed sales (baskets) containing each product
+class ProductBasketStat(Base):
+    __tablename__ = "product_basket_stats"
+
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    basket_count = Column(Integer, default=0)
+
+# Directed product pair (A -> B) co-occurrence and association metrics.
+# Both directions are stored so lookups by product_id are a single index range.
+class ProductAffinity(Base):
+    __tablename__ = "product_affinities"
+
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    related_product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    pair_count = Column(Integer, default=0)
+
+    support = Column(Float, default=0.0) # P(A and B)
+    confidence = Column(Float, default=0.0) # P(B | A)
+    lift = Column(Float, default=0.0) # P(B | A) / P(B)
+
+# Per product / warehouse / local day sales aggregate, maintained when sales are confirmed.
+# Ranking and velocity reports read this instead of scanning sale lines.
+class ProductSalesDaily(Base):
+    __tablename__ = "product_sales_daily"
+
+    day = Column(Date, primary_key=True) # Local day (timezone_offset setting applied)
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True, index=True)
+    warehouse_id = Column(Integer, primary_key=True)
+
+    quantity = Column(Float, default=0.0)
+    revenue = Column(Float, default=0.0)
+    order_count = Column(Integer, default=0) # Confirmed sales containing the product
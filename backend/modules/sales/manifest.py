@@ -5,5 +5,5 @@ from .domain import models
 module = Module(
     name="sales",
     router=router,
-    models=[models.Sale, models.SaleItem]
+    models=[models.Sale, models.SaleItem, models.AnalyticsCheckpoint, models.ProductBasketStat, models.ProductAffinity, models.ProductSalesDaily]
 )
@@ -0,0 +1,40 @@
+import asyncio
+import importlib
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from core.database import Base
+
+# Relationships are declared by class name across modules ("Supplier", "Product"...):
+# import every module's models up front so mapper configuration never depends on
+# which test files happen to be collected.
+MODULES = (
+    "iam", "catalog", "inventory", "sales", "invoicing", "customers",
+    "accounts_receivable", "picking", "suppliers", "finance", "admin", "printing",
+)
+
+for name in MODULES:
+    importlib.import_module(f"modules.{name}.domain.models")
+
+@pytest.fixture
+def run_in_db(tmp_path):
+    """
+    Runs `scenario(sessions)` on a fresh SQLite file with the model tables created
+    and returns its result. `sessions` is an async_sessionmaker (expire_on_commit=False).
+    `foreign_keys=True` enforces FKs like Postgres; `tables` limits create_all.
+    """
+    def run(scenario, foreign_keys: bool = False, tables=None):
+        async def main():
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+            if foreign_keys:
+                event.listen(engine.sync_engine, "connect", lambda conn, _: conn.execute("PRAGMA foreign_keys=ON"))
+            try:
+                async with engine.begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all, tables=tables)
+                return await scenario(async_sessionmaker(engine, expire_on_commit=False))
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
@@ -0,0 +1,36 @@
+from modules.catalog.application.barcode_cache import BarcodeIndex, ProductRef
+
+def _ref(product_id):
+    return ProductRef(id=product_id, name=f"P{product_id}", sku=f"SKU{product_id}", price=1.0, is_inventory_tracked=True)
+
+def test_lru_eviction():
+    index = BarcodeIndex(maxsize=2)
+    index.put("A", _ref(1))
+    index.put("B", _ref(2))
+    index.get("A")  # A becomes most recently used
+    index.put("C", _ref(3))
+
+    assert index.get("B") is None
+    assert index.get("A").id == 1
+    assert index.get("C").id == 3
+    assert len(index) == 2
+
+def test_invalidate_product_drops_all_its_barcodes():
+    index = BarcodeIndex(maxsize=10)
+    index.put("A1", _ref(1))
+    index.put("A2", _ref(1))
+    index.put("B1", _ref(2))
+
+    index.invalidate_product(1)
+
+    assert index.get("A1") is None
+    assert index.get("A2") is None
+    assert index.get("B1").id == 2
+
+def test_reassigned_barcode_moves_between_products():
+    index = BarcodeIndex(maxsize=10)
+    index.put("X", _ref(1))
+    index.put("X", _ref(2))
+
+    index.invalidate_product(1)
+    assert index.get("X").id == 2
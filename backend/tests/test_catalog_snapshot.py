@@ -0,0 +1,60 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+from core.config import get_settings
+from modules.catalog.domain.models import Product
+from modules.catalog.application.snapshot_service import build_payload, encode_snapshot, CatalogSnapshotService
+
+PRODUCTS = [
+    {"id": 1, "name": "A", "price": 1.5, "barcodes": ["111"]},
+    {"id": 2, "name": "B", "price": 2.0, "barcodes": []},
+]
+FIELDS = ("id", "name", "price", "barcodes")
+
+def test_columnar_layout():
+    payload = build_payload(PRODUCTS, fields=FIELDS)
+    assert payload["fields"] == list(FIELDS)
+    assert payload["columns"]["id"] == [1, 2]
+    assert payload["columns"]["barcodes"] == [["111"], []]
+
+def test_snapshot_document_decodes():
+    etag, data = encode_snapshot(build_payload(PRODUCTS, fields=FIELDS), {"cursor": "c", "product_count": 2})
+    document = json.loads(gzip.decompress(data))
+    assert document["etag"] == etag
+    assert document["cursor"] == "c"
+    assert document["catalog"]["columns"]["name"] == ["A", "B"]
+
+def test_etag_ignores_metadata_and_is_reproducible():
+    payload = build_payload(PRODUCTS, fields=FIELDS)
+    etag1, data1 = encode_snapshot(payload, {"cursor": "a"})
+    etag2, _ = encode_snapshot(payload, {"cursor": "b"})
+    etag3, data3 = encode_snapshot(payload, {"cursor": "a"})
+    assert etag1 == etag2 == etag3
+    assert data1 == data3
+
+def test_refresh_rebuilds_only_stale_snapshots(run_in_db, tmp_path, monkeypatch):
+    async def scenario(sessions):
+        async with sessions() as db:
+            db.add(Product(id=1, name="A", sku="A1", price=1.0))
+            await db.commit()
+
+            service = CatalogSnapshotService(db, directory=str(tmp_path / "snapshots"))
+            assert service.current() is None
+            assert await service.refresh() is True
+            first = service.current()
+            assert await service.refresh() is False  # fresh: served as is
+
+            product = await db.get(Product, 1)
+            product.price = 2.0
+            await db.commit()
+            # Past the max age the next refresh picks the change up
+            later = datetime.fromisoformat(first["generated_at"]) + timedelta(seconds=301)
+            assert service.is_stale(first, now=later)
+            monkeypatch.setattr(get_settings(), "CATALOG_SNAPSHOT_MAX_AGE_SECONDS", 0)
+            assert await service.refresh() is True
+            second = service.current()
+            assert second["etag"] != first["etag"]
+            with gzip.open(second["path"]) as f:
+                assert json.load(f)["catalog"]["columns"]["price"] == [2.0]
+
+    run_in_db(scenario)
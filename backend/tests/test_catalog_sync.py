@@ -0,0 +1,51 @@
+import pytest
+from datetime import datetime, timedelta
+from core.config import get_settings
+from modules.catalog.domain.models import Product, ProductBarcode, CatalogTombstone
+from modules.catalog.application.sync_service import encode_cursor, decode_cursor, CatalogSyncService
+
+def test_cursor_round_trip():
+    since = datetime(2026, 1, 2, 3, 4, 5, 600000)
+    until = datetime(2026, 1, 2, 3, 5, 0)
+    assert decode_cursor(encode_cursor(since, until, 42)) == (since, until, 42)
+
+def test_empty_cursor_starts_full_sync():
+    assert decode_cursor(None) == (None, None, 0)
+    assert decode_cursor(encode_cursor(None)) == (None, None, 0)
+
+def test_malformed_cursor_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+def test_changes_pages_a_window_and_waits_out_the_lag(run_in_db, monkeypatch):
+    monkeypatch.setattr(get_settings(), "CATALOG_SYNC_LAG_SECONDS", 5)
+    t0 = datetime(2026, 3, 1, 12)
+
+    async def scenario(sessions):
+        async with sessions() as db:
+            db.add_all([Product(id=pid, name=f"P{pid}", sku=f"P{pid}", price=1.0, updated_at=t0 - timedelta(minutes=10))
+                        for pid in (1, 2, 3)])
+            # Stamped 2s before the request: may belong to a transaction still committing
+            db.add(Product(id=4, name="P4", sku="P4", price=1.0, updated_at=t0 - timedelta(seconds=2)))
+            await db.commit()
+
+            service = CatalogSyncService(db)
+            first = await service.changes(limit=2, now=t0)
+            assert ([p["id"] for p in first["products"]], first["has_more"]) == ([1, 2], True)
+            # Later pages stay on the same window even if the clock moves
+            second = await service.changes(first["next_cursor"], limit=2, now=t0 + timedelta(hours=1))
+            assert ([p["id"] for p in second["products"]], second["has_more"]) == ([3], False)
+            assert decode_cursor(second["next_cursor"]) == (t0 - timedelta(seconds=5), None, 0)
+
+            later = t0 + timedelta(minutes=1)
+            db.add(ProductBarcode(product_id=1, barcode="7791", updated_at=later))
+            await db.delete(await db.get(Product, 2))
+            db.add(CatalogTombstone(entity_type="product", entity_id=2, deleted_at=later))
+            await db.commit()
+
+            third = await service.changes(second["next_cursor"], now=t0 + timedelta(minutes=10))
+            assert [p["id"] for p in third["products"]] == [1, 4]
+            assert third["deleted"] == [2]
+            assert next(p for p in third["products"] if p["id"] == 1)["barcodes"] == ["7791"]
+
+    run_in_db(scenario)
@@ -0,0 +1,19 @@
+import pytest
+from modules.finance.application.cost_engine import compute_landed_costs, landed_cost
+
+def test_landed_cost_formula():
+    # base 10, freight 2, 21% tax on base
+    assert landed_cost(10.0, 2.0, 0.21) == pytest.approx(14.1)
+
+def test_compute_landed_costs_and_margins():
+    products = [(1, 10.0, 20.0), (2, None, None), (3, 6.0, 5.0)]
+    components = [(1, 2.0, 0.21), (99, 5.0, 0.0)]  # 99: component of a product not loaded
+    costs = compute_landed_costs(products, components)
+
+    assert set(costs) == {1, 2, 3}
+    assert costs[1].landed_cost == pytest.approx(14.1)
+    assert costs[1].margin == pytest.approx(5.9)
+    assert costs[1].margin_pct == pytest.approx(29.5)
+    assert costs[2].landed_cost == 0.0
+    assert costs[2].margin_pct is None  # no price
+    assert costs[3].margin_pct == pytest.approx(-20.0)
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+from core.config import get_settings
+from modules.customers.domain.models import Customer
+from modules.sales.domain.models import Sale, SaleStatus
+from modules.customers.application.scoring_service import quantile_scores, segment_for, CustomerScoringService
+
+def test_quantile_scores_spread_over_bins():
+    values = [10, 20, 30, 40, 50, 60, 70, 80, 90, 100]
+    assert quantile_scores(values) == [1, 1, 2, 2, 3, 3, 4, 4, 5, 5]
+
+def test_quantile_scores_ties_share_score():
+    scores = quantile_scores([5, 1, 5, 5, 9])
+    assert scores[0] == scores[2] == scores[3]
+    assert scores[1] < scores[0] < scores[4]
+
+def test_segments():
+    assert segment_for(5, 5, 5) == "Champions"
+    assert segment_for(5, 1, 1) == "New"
+    assert segment_for(1, 5, 5) == "At Risk"
+    assert segment_for(1, 1, 1) == "Lost"
+
+def test_refresh_scores_changed_customers_behind_the_commit_lag(run_in_db, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "ANALYTICS_COMMIT_LAG_SECONDS", 60)
+    now = datetime.utcnow()
+
+    async def scenario(sessions):
+        async with sessions() as db:
+            db.add_all([Customer(id=cid, name=f"C{cid}") for cid in (1, 2, 3)])
+            sales = [(1, 1, now - timedelta(days=2), 100.0), (2, 1, now - timedelta(days=1), 50.0),
+                     (3, 2, now - timedelta(days=40), 10.0), (4, 3, now - timedelta(seconds=10), 70.0)]
+            for sale_id, customer_id, confirmed_at, total in sales:
+                db.add(Sale(id=sale_id, warehouse_id=1, customer_id=customer_id, status=SaleStatus.CONFIRMED.value,
+                            created_at=confirmed_at, confirmed_at=confirmed_at, total=total))
+            await db.commit()
+
+            service = CustomerScoringService(db)
+            # Customer 3's only sale is inside the lag window
+            assert await service.refresh() == {"customers_updated": 2, "customers_scored": 2}
+            scores = {s["customer_id"]: s for s in await service.list_scores()}
+            assert sorted(scores) == [1, 2]
+            assert (scores[1]["frequency"], scores[1]["monetary"]) == (2, 150.0)
+            assert scores[2]["recency_days"] == 40
+
+            monkeypatch.setattr(settings, "ANALYTICS_COMMIT_LAG_SECONDS", 0)
+            assert await service.refresh() == {"customers_updated": 1, "customers_scored": 3}
+            scores = {s["customer_id"]: s for s in await service.list_scores()}
+            assert (scores[3]["frequency"], scores[3]["monetary"], scores[3]["recency_days"]) == (1, 70.0, 0)
+            assert scores[1]["r_score"] > scores[2]["r_score"]
+
+            assert (await service.refresh())["customers_updated"] == 0
+
+    run_in_db(scenario)
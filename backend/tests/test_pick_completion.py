@@ -0,0 +1,137 @@
+import pytest
+from types import SimpleNamespace
+from sqlalchemy import select
+from modules.catalog.domain.models import Product
+from modules.customers.domain.models import Customer
+from modules.sales.domain.models import Sale, SaleItem, SaleStatus
+from modules.inventory.domain.models import StockMovement
+from modules.invoicing.domain.models import Document
+from modules.accounts_receivable.domain.models import CustomerLedger
+from modules.picking.domain.models import PickTask, PickTaskStatus, PickShortPick
+from modules.picking.application.scan_context import scan_contexts, encode_counts
+from modules.picking.application.completion_service import reconcile, PickCompletionService, ShortPickError
+from modules.invoicing.application.service import billed_quantities, InvoicingService
+
+def test_reconcile_splits_picked_and_short():
+    picked, shorts = reconcile({1: 3.0, 2: 1.0, 3: 2.0}, {1: 3, 3: 5})
+    assert picked == {1: 3, 2: 0, 3: 2.0}
+    # Overpicked units are neither committed nor reported
+    assert shorts == {2: 1.0}
+
+def test_billed_quantities_consume_picked_units_in_item_order():
+    items = [SimpleNamespace(product_id=1, qty=2.0), SimpleNamespace(product_id=1, qty=1.0), SimpleNamespace(product_id=2, qty=4.0)]
+    billed = [qty for _, qty in billed_quantities(items, {1: 2, 2: 1})]
+    assert billed == [2, 0, 1]
+    assert [qty for _, qty in billed_quantities(items, None)] == [2.0, 1.0, 4.0]
+
+async def _seed(db, scanned: dict):
+    """Sale 1 (customer 1): product 1 x3, product 2 x2, untracked product 3 x1; task 1 with `scanned`."""
+    db.add(Customer(id=1, name="Client"))
+    db.add_all([
+        Product(id=1, name="A", sku="A1", price=10.0),
+        Product(id=2, name="B", sku="B1", price=5.0),
+        Product(id=3, name="Service", sku="S1", price=2.0, is_inventory_tracked=False),
+    ])
+    db.add(Sale(id=1, status=SaleStatus.CONFIRMED.value, warehouse_id=1, customer_id=1, total=42.0, items=[
+        SaleItem(id=1, product_id=1, qty=3.0, price=10.0),
+        SaleItem(id=2, product_id=2, qty=2.0, price=5.0),
+        SaleItem(id=3, product_id=3, qty=1.0, price=2.0),
+    ]))
+    db.add(PickTask(id=1, sale_id=1, status=PickTaskStatus.IN_PROGRESS.value,
+                    scan_counts=encode_counts(scanned), scanned_total=sum(scanned.values())))
+    await db.commit()
+
+async def _movements(db):
+    rows = (await db.execute(
+        select(StockMovement.type, StockMovement.reference_id, StockMovement.product_id, StockMovement.qty)
+        .order_by(StockMovement.id)
+    )).all()
+    return [tuple(r) for r in rows]
+
+def test_complete_bills_and_commits_picked_units(run_in_db):
+    async def scenario(sessions):
+        async with sessions() as db:
+            await _seed(db, {1: 3, 2: 1, 3: 1})
+
+        async with sessions() as db:
+            with pytest.raises(ShortPickError) as exc:
+                await PickCompletionService(db).complete(1, allow_short=False)
+            assert exc.value.shorts == {2: 1.0}
+
+        async with sessions() as db:
+            result = await PickCompletionService(db).complete(1)
+            assert (result["invoiced"], result["shorts"]) == (True, [{"product_id": 2, "required_qty": 2.0, "short_qty": 1.0}])
+
+        async with sessions() as db:
+            assert (await db.get(PickTask, 1)).status == PickTaskStatus.COMPLETED.value
+            short = (await db.execute(select(PickShortPick))).scalar_one()
+            assert (short.product_id, short.required_qty, short.picked_qty, short.short_qty) == (2, 2.0, 1.0, 1.0)
+            # The pick takes the picked tracked units out; the short unit's reservation is released
+            assert await _movements(db) == [
+                ("COMMIT", "PICK-1", 1, 3.0), ("COMMIT", "PICK-1", 2, 1.0), ("RELEASE", "SALE-1", 2, 1.0),
+            ]
+            doc = await db.get(Document, result["document_id"])
+            assert doc.total == 37.0
+            assert [(i.sale_item_id, i.qty, i.price) for i in doc.items] == [(1, 3.0, 10.0), (2, 1.0, 5.0), (3, 1.0, 2.0)]
+            ledger = (await db.execute(select(CustomerLedger.amount, CustomerLedger.reference_id))).all()
+            assert [tuple(r) for r in ledger] == [(37.0, f"DOC-{doc.id}")]
+
+            with pytest.raises(ValueError):
+                await PickCompletionService(db).complete(1)
+
+    run_in_db(scenario)
+
+def test_complete_rejects_scans_that_landed_meanwhile(run_in_db, monkeypatch):
+    async def scenario(sessions):
+        async with sessions() as db:
+            await _seed(db, {1: 3, 2: 2, 3: 1})
+
+        read_counters = scan_contexts.read_counters
+        async def stale_counters(db, task_id):
+            status, scanned, version = await read_counters(db, task_id)
+            return status, scanned, version - 1
+        monkeypatch.setattr(scan_contexts, "read_counters", stale_counters)
+
+        async with sessions() as db:
+            with pytest.raises(RuntimeError):
+                await PickCompletionService(db).complete(1)
+
+        async with sessions() as db:
+            assert (await db.get(PickTask, 1)).status == PickTaskStatus.IN_PROGRESS.value
+            assert await _movements(db) == []
+            assert (await db.execute(select(Document))).first() is None
+
+    run_in_db(scenario)
+
+def test_complete_after_invoice_only_releases_shorts(run_in_db):
+    async def scenario(sessions):
+        async with sessions() as db:
+            await _seed(db, {1: 2})
+            sale = await db.get(Sale, 1)
+            invoice = await InvoicingService(db).issue_for_sale(sale)
+            await db.commit()
+
+        async with sessions() as db:
+            result = await PickCompletionService(db).complete(1)
+            assert (result["invoiced"], result["document_id"]) == (False, invoice.id)
+            movements = await _movements(db)
+            # The invoice already took the stock out; the pick adds no COMMIT of its own
+            assert [m for m in movements if m[1] == "PICK-1"] == []
+            assert [m for m in movements if m[0] == "RELEASE"] == [("RELEASE", "SALE-1", 1, 1.0), ("RELEASE", "SALE-1", 2, 2.0)]
+            assert len((await db.execute(select(Document))).all()) == 1
+
+    run_in_db(scenario)
+
+def test_complete_with_nothing_picked_issues_no_invoice(run_in_db):
+    async def scenario(sessions):
+        async with sessions() as db:
+            await _seed(db, {})
+
+        async with sessions() as db:
+            result = await PickCompletionService(db).complete(1)
+            assert (result["invoiced"], result["document_id"]) == (False, None)
+            assert (await db.execute(select(Document))).first() is None
+            assert (await db.execute(select(CustomerLedger))).first() is None
+            assert await _movements(db) == [("RELEASE", "SALE-1", 1, 3.0), ("RELEASE", "SALE-1", 2, 2.0)]
+
+    run_in_db(scenario)
@@ -0,0 +1,89 @@
+from datetime import datetime
+from sqlalchemy import select, func
+from modules.picking.domain.models import PickScanEvent, PickMetricsHourly
+from modules.picking.application.metrics_service import aggregate_events, summarize, IDLE_GAP_SECONDS, PickMetricsService
+
+def at(hour, minute, second=0):
+    return datetime(2026, 3, 2, hour, minute, second)
+
+def test_events_roll_into_hour_and_picker_buckets():
+    rows = [
+        (1, "MATCH", True, at(9, 0)),
+        (1, "MATCH", False, at(9, 0, 20)),
+        (1, "MISMATCH", False, at(9, 0, 30)),
+        (2, "MATCH", True, at(9, 5)),
+        (None, "NOT_FOUND", False, at(9, 6)),
+        (1, "MATCH", True, at(10, 1)),
+    ]
+    buckets = aggregate_events(rows, {})
+
+    nine = buckets[(at(9, 0), 1)]
+    assert (nine["scans"], nine["units"], nine["lines"], nine["mismatches"]) == (3, 2, 1, 1)
+    assert (nine["gap_seconds"], nine["gap_count"]) == (30, 2)
+    # Unattributed scans land on user 0
+    assert buckets[(at(9, 0), 0)]["mismatches"] == 1
+    # 09:00:30 -> 10:01 is a break, not pick time
+    assert buckets[(at(10, 0), 1)]["gap_count"] == 0
+
+def test_gap_measurement_carries_across_chunks():
+    last_seen = {}
+    aggregate_events([(1, "MATCH", True, at(9, 0))], last_seen)
+    buckets = aggregate_events([(1, "MATCH", False, at(9, 0, 12))], last_seen)
+    assert buckets[(at(9, 0), 1)]["gap_seconds"] == 12
+    assert IDLE_GAP_SECONDS > 12
+
+def test_summarize_rates():
+    row = {"scans": 10, "units": 8, "lines": 4, "mismatches": 2, "gap_seconds": 90.0, "gap_count": 9}
+    summary = summarize(row, active_hours=2)
+    assert summary["lines_per_hour"] == 2
+    assert summary["units_per_hour"] == 4
+    assert summary["mismatch_rate"] == 0.2
+    assert summary["avg_seconds_between_scans"] == 10
+
+def test_refresh_waits_for_late_batches_and_keeps_first_gap(run_in_db, monkeypatch):
+    from core.config import get_settings
+    monkeypatch.setattr(get_settings(), "PICK_METRICS_LAG_SECONDS", 60)
+
+    async def scenario(sessions):
+        def scan(event_id, stamp):
+            return PickScanEvent(id=event_id, task_id=1, barcode_scanned="779", product_id=5, user_id=1,
+                                 result="MATCH", timestamp=stamp)
+
+        async with sessions() as db:
+            db.add_all([scan(1, at(9, 0)), scan(2, at(9, 0, 20)), scan(3, at(9, 9, 40))])
+            await db.commit()
+            # 09:09:40 is inside the lag window: left for the next run
+            assert (await PickMetricsService(db).refresh(now=at(9, 10)))["processed_events"] == 2
+
+            # A queued batch commits late: higher id, earlier stamp than event 3
+            db.add(scan(4, at(9, 9, 30)))
+            await db.commit()
+            assert (await PickMetricsService(db).refresh(now=at(9, 20)))["processed_events"] == 2
+
+            row = (await db.execute(select(
+                func.sum(PickMetricsHourly.scans), func.sum(PickMetricsHourly.gap_count), func.sum(PickMetricsHourly.gap_seconds)
+            ))).one()
+            # Gaps: 20s (first run), 550s from the last rolled-up scan, 10s
+            assert tuple(row) == (4, 3, 580)
+
+    run_in_db(scenario)
+
+def test_lines_count_per_task_and_per_wave(run_in_db):
+    async def scenario(sessions):
+        def scan(event_id, second, task_id=None, wave_id=None, product_id=5):
+            return PickScanEvent(id=event_id, task_id=task_id, wave_id=wave_id, barcode_scanned="779",
+                                 product_id=product_id, user_id=1, result="MATCH", timestamp=at(9, 0, second))
+
+        async with sessions() as db:
+            db.add_all([
+                scan(1, 0, task_id=1), scan(2, 5, task_id=1),
+                scan(3, 10, wave_id=1), scan(4, 15, wave_id=1), scan(5, 20, wave_id=1, product_id=6),
+                scan(6, 25, wave_id=2),
+            ])
+            await db.commit()
+            await PickMetricsService(db).refresh(now=at(10, 0))
+            row = (await db.execute(select(PickMetricsHourly.units, PickMetricsHourly.lines))).one()
+            # Task 1: product 5; wave 1: products 5 and 6; wave 2: product 5
+            assert tuple(row) == (6, 4)
+
+    run_in_db(scenario)
@@ -0,0 +1,193 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.sql.dml import Insert
+from modules.catalog.domain.models import Product
+from modules.sales.domain.models import Sale, SaleItem, SaleStatus
+from modules.inventory.domain.models import StockMovement
+from modules.invoicing.domain.models import Document
+from modules.picking.domain.models import (
+    PickTask, PickWave, PickWaveOrder, PickWaveLine, PickWaveSort, PickWaveStatus, PickScanEvent, PickShortPick,
+)
+from modules.picking.application.completion_service import ShortPickError
+from modules.picking.application.wave_service import WaveService
+
+CONFIRMED = SaleStatus.CONFIRMED.value
+
+async def _seed(db):
+    """Sales 1 and 2 are eligible in warehouse 1; 3 has a pick task, 4 is a draft, 5 is in warehouse 2."""
+    db.add_all([Product(id=1, name="A", sku="A1", price=10.0), Product(id=2, name="B", sku="B1", price=5.0)])
+    db.add_all([
+        Sale(id=1, status=CONFIRMED, warehouse_id=1, items=[
+            SaleItem(product_id=1, qty=2.0, price=10.0), SaleItem(product_id=1, qty=1.0, price=10.0),
+        ]),
+        Sale(id=2, status=CONFIRMED, warehouse_id=1, items=[
+            SaleItem(product_id=1, qty=1.0, price=10.0), SaleItem(product_id=2, qty=2.0, price=5.0),
+        ]),
+        Sale(id=3, status=CONFIRMED, warehouse_id=1, items=[SaleItem(product_id=2, qty=1.0, price=5.0)]),
+        Sale(id=4, status=SaleStatus.DRAFT.value, warehouse_id=1, items=[SaleItem(product_id=2, qty=1.0, price=5.0)]),
+        Sale(id=5, status=CONFIRMED, warehouse_id=2, items=[SaleItem(product_id=2, qty=1.0, price=5.0)]),
+    ])
+    db.add(PickTask(sale_id=3))
+    await db.commit()
+
+async def _pick_and_sort(service, wave_id, units):
+    for product_id in units:
+        assert (await service.register_pick(wave_id, product_id, f"B{product_id}"))["status"] == "MATCH"
+    return [await service.sort_unit(wave_id, product_id) for product_id in units]
+
+def test_generation_assigns_slots_and_sums_lines(run_in_db):
+    async def scenario(sessions):
+        async with sessions() as db:
+            await _seed(db)
+
+        async with sessions() as db:
+            with pytest.raises(ValueError):
+                await WaveService(db).create_wave(1, sale_ids=[1, 3])
+            assert (await db.execute(select(PickWave))).first() is None
+
+        async with sessions() as db:
+            wave_id = await WaveService(db).create_wave(1)
+            orders = (await db.execute(select(PickWaveOrder.sale_id, PickWaveOrder.slot).order_by(PickWaveOrder.slot))).all()
+            assert [tuple(o) for o in orders] == [(1, 1), (2, 2)]
+            lines = (await db.execute(
+                select(PickWaveLine.product_id, PickWaveLine.required_qty, PickWaveLine.picked_qty)
+                .where(PickWaveLine.wave_id == wave_id).order_by(PickWaveLine.product_id)
+            )).all()
+            assert [tuple(l) for l in lines] == [(1, 4.0, 0.0), (2, 2.0, 0.0)]
+
+            # Nothing left in warehouse 1; warehouse 2 gets its own wave
+            with pytest.raises(ValueError):
+                await WaveService(db).create_wave(1)
+            other = await WaveService(db).create_wave(2)
+            assert (await db.execute(select(PickWaveOrder.sale_id).where(PickWaveOrder.wave_id == other))).scalars().all() == [5]
+
+    run_in_db(scenario)
+
+def test_register_pick_logs_every_scan(run_in_db):
+    async def scenario(sessions):
+        async with sessions() as db:
+            await _seed(db)
+            wave_id = await WaveService(db).create_wave(1, sale_ids=[2])
+
+        async with sessions() as db:
+            service = WaveService(db)
+            assert await service.register_pick(wave_id, 1, "A", user_id=7) == {"status": "MATCH", "picked_qty": 1.0, "required_qty": 1.0}
+            assert (await service.register_pick(wave_id, 1, "A", user_id=7))["status"] == "OVERPICK"
+            assert (await service.register_pick(wave_id, 3, "C", user_id=7))["status"] == "MISMATCH"
+            assert (await service.register_pick(wave_id, None, "???", user_id=7))["status"] == "NOT_FOUND"
+            assert (await db.get(PickWave, wave_id)).status == PickWaveStatus.PICKING.value
+
+            line = (await db.execute(select(PickWaveLine.picked_qty).where(PickWaveLine.product_id == 1))).scalar()
+            assert line == 1.0  # the overpicked unit was not taken
+            events = (await db.execute(
+                select(PickScanEvent.wave_id, PickScanEvent.task_id, PickScanEvent.user_id, PickScanEvent.result)
+                .order_by(PickScanEvent.id)
+            )).all()
+            assert [tuple(e) for e in events] == [
+                (wave_id, None, 7, "MATCH"), (wave_id, None, 7, "MISMATCH"),
+                (wave_id, None, 7, "MISMATCH"), (wave_id, None, 7, "NOT_FOUND"),
+            ]
+
+    run_in_db(scenario)
+
+def test_sorting_fills_lowest_slot_and_completes_the_wave(run_in_db):
+    async def scenario(sessions):
+        async with sessions() as db:
+            await _seed(db)
+            wave_id = await WaveService(db).create_wave(1)
+
+        async with sessions() as db:
+            service = WaveService(db)
+            assert (await service.sort_unit(wave_id, 1))["status"] == "NOT_PICKED"
+            results = await _pick_and_sort(service, wave_id, [1, 1, 1, 1, 2, 2])
+            # Sale 1 (slot 1) takes product 1 until its 3 units are in, then sale 2
+            assert [(r["sale_id"], r["slot"], r["sorted_qty"]) for r in results] == [
+                (1, 1, 1), (1, 1, 2), (1, 1, 3), (2, 2, 1), (2, 2, 1), (2, 2, 2),
+            ]
+            assert [r["wave_completed"] for r in results] == [False] * 5 + [True]
+
+        async with sessions() as db:
+            wave = await db.get(PickWave, wave_id)
+            assert wave.status == PickWaveStatus.COMPLETED.value and wave.completed_at is not None
+            movements = (await db.execute(
+                select(StockMovement.reference_id, StockMovement.product_id, StockMovement.qty)
+                .where(StockMovement.type == "COMMIT").order_by(StockMovement.id)
+            )).all()
+            assert [tuple(m) for m in movements] == [
+                (f"WAVE-{wave_id}", 1, 3.0), (f"WAVE-{wave_id}", 1, 1.0), (f"WAVE-{wave_id}", 2, 2.0),
+            ]
+            totals = (await db.execute(select(Document.sale_id, Document.total).order_by(Document.sale_id))).all()
+            assert [tuple(t) for t in totals] == [(1, 30.0), (2, 20.0)]
+            assert (await db.execute(select(PickShortPick))).first() is None
+
+    run_in_db(scenario)
+
+def test_sort_refuses_to_overfill_a_slot_filled_concurrently(run_in_db):
+    async def scenario(sessions):
+        async with sessions() as db:
+            await _seed(db)
+            wave_id = await WaveService(db).create_wave(1, sale_ids=[1])
+            service = WaveService(db)
+            await _pick_and_sort(service, wave_id, [1, 1])
+
+        async with sessions() as db:
+            service = WaveService(db)
+            await service.register_pick(wave_id, 1, "A")
+            execute = db.execute
+
+            async def racing_execute(statement, *args, **kwargs):
+                if isinstance(statement, Insert) and statement.table.name == "pick_wave_sorts":
+                    # Another operator sorts the last unit between target selection and upsert
+                    async with sessions() as other:
+                        sort = (await other.execute(select(PickWaveSort))).scalar_one()
+                        sort.qty = 3.0
+                        await other.commit()
+                return await execute(statement, *args, **kwargs)
+
+            db.execute = racing_execute
+            with pytest.raises(RuntimeError):
+                await service.sort_unit(wave_id, 1)
+
+        async with sessions() as db:
+            assert (await db.execute(select(PickWaveSort.qty))).scalar() == 3.0
+
+    run_in_db(scenario)
+
+def test_complete_with_missing_units_bills_what_was_sorted(run_in_db):
+    async def scenario(sessions):
+        async with sessions() as db:
+            await _seed(db)
+            wave_id = await WaveService(db).create_wave(1)
+
+        async with sessions() as db:
+            service = WaveService(db)
+            # The wave is closed with sale 2's unit of product 1 still in the tote
+            await _pick_and_sort(service, wave_id, [1, 1, 1, 2, 2])
+            await service.register_pick(wave_id, 1, "A")
+            with pytest.raises(ShortPickError) as exc:
+                await service.complete(wave_id, allow_short=False)
+            assert exc.value.shorts == {2: {1: 1.0}}
+            assert (await db.get(PickWave, wave_id)).status != PickWaveStatus.COMPLETED.value
+
+            summary = await service.complete(wave_id)
+            assert [(o["sale_id"], o["invoiced"], o["shorts"]) for o in summary["orders"]] == [
+                (1, True, []), (2, True, [{"product_id": 1, "required_qty": 1.0, "short_qty": 1.0}]),
+            ]
+            with pytest.raises(ValueError):
+                await service.complete(wave_id)
+            with pytest.raises(ValueError):
+                await service.sort_unit(wave_id, 1)  # too late for that unit
+            with pytest.raises(LookupError):
+                await service.complete(99)
+
+        async with sessions() as db:
+            short = (await db.execute(select(PickShortPick))).scalar_one()
+            assert (short.wave_id, short.task_id, short.sale_id, short.picked_qty) == (wave_id, None, 2, 0.0)
+            release = (await db.execute(
+                select(StockMovement.reference_id, StockMovement.product_id, StockMovement.qty).where(StockMovement.type == "RELEASE")
+            )).all()
+            assert [tuple(r) for r in release] == [("SALE-2", 1, 1.0)]
+            totals = (await db.execute(select(Document.sale_id, Document.total).order_by(Document.sale_id))).all()
+            assert [tuple(t) for t in totals] == [(1, 30.0), (2, 10.0)]
+
+    run_in_db(scenario)
@@ -0,0 +1,114 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from sqlalchemy import select
+from modules.catalog.domain.models import Product, PriceListItem
+from modules.catalog.application.price_resolver import PriceEntry, PriceResolver, build_index, pick
+from modules.catalog.api.v1.router import (
+    PriceListCreate, PriceListItemData, PriceListUpdate,
+    create_price_list, upsert_price_list_items, delete_price_list_item, update_price_list,
+)
+
+JAN = datetime(2026, 1, 1)
+FEB = datetime(2026, 2, 1)
+MAR = datetime(2026, 3, 1)
+
+def _entry(list_id, price, customer_id=None, warehouse_id=None, priority=0, valid_from=None, valid_to=None):
+    return PriceEntry(list_id, customer_id, warehouse_id, priority, valid_from, valid_to, price)
+
+def test_most_specific_scope_wins_over_priority():
+    index = build_index([
+        (1, _entry(1, 9.0, priority=10)),
+        (1, _entry(2, 8.0, warehouse_id=1)),
+        (1, _entry(3, 7.0, customer_id=5)),
+    ])
+    bucket = index[1]
+    assert pick(bucket, None, None, FEB).price == 9.0
+    assert pick(bucket, None, 1, FEB).price == 8.0
+    assert pick(bucket, 5, 1, FEB).price == 7.0
+    assert pick(bucket, 6, 2, FEB).price == 9.0
+
+def test_priority_then_latest_window():
+    index = build_index([
+        (1, _entry(1, 9.0, valid_from=JAN)),
+        (1, _entry(2, 8.0, valid_from=FEB)),
+        (1, _entry(3, 5.0, priority=1, valid_from=JAN, valid_to=FEB)),
+    ])
+    bucket = index[1]
+    assert pick(bucket, None, None, datetime(2026, 1, 15)).price == 5.0  # higher priority promo
+    assert pick(bucket, None, None, FEB).price == 8.0  # promo ended (valid_to exclusive), newest list
+    assert pick(bucket, None, None, datetime(2025, 12, 31)) is None  # before any window
+
+def test_scheduled_list_only_applies_inside_window():
+    bucket = build_index([(1, _entry(1, 4.0, valid_from=FEB, valid_to=MAR))])[1]
+    assert pick(bucket, None, None, JAN) is None
+    assert pick(bucket, None, None, FEB).price == 4.0
+    assert pick(bucket, None, None, MAR) is None
+
+def test_item_version_window_limits_entry():
+    old = PriceEntry(1, None, None, 0, None, None, 9.0, None, FEB)
+    new = PriceEntry(1, None, None, 0, None, None, 7.0, FEB, None)
+    bucket = build_index([(1, old), (1, new)])[1]
+    assert pick(bucket, None, None, JAN).price == 9.0
+    assert pick(bucket, None, None, FEB).price == 7.0
+
+def test_repricing_keeps_past_prices(run_in_db):
+    async def scenario(sessions):
+        async with sessions() as db:
+            db.add_all([Product(id=1, name="A", sku="A1", price=10.0), Product(id=2, name="B", sku="B1", price=20.0)])
+            await db.commit()
+
+        async with sessions() as db:
+            created = await create_price_list(PriceListCreate(name="Promo", items=[
+                {"product_id": 1, "price": 8.0}, {"product_id": 2, "price": 18.0},
+            ]), db=db)
+            list_id = created.id
+            updated = await upsert_price_list_items(list_id, [
+                PriceListItemData(product_id=1, price=7.0), PriceListItemData(product_id=2, price=18.0),
+            ], db=db)
+            assert sorted((i.product_id, i.price) for i in updated.items) == [(1, 7.0), (2, 18.0)]
+            await delete_price_list_item(list_id, 2, db=db)
+
+        async with sessions() as db:
+            rows = (await db.execute(
+                select(PriceListItem).order_by(PriceListItem.product_id, PriceListItem.id)
+            )).scalars().all()
+            # The unchanged price was not re-versioned; the removed one was closed, not deleted
+            assert [(r.product_id, r.price, r.valid_to is None) for r in rows] == [
+                (1, 8.0, False), (1, 7.0, True), (2, 18.0, False),
+            ]
+            first, second, removed = rows
+            assert first.valid_to == second.valid_from
+
+            resolver = PriceResolver(ttl_seconds=0)
+            async def price(product_id, at):
+                return (await resolver.resolve_many(db, [product_id], at=at))[product_id]["price"]
+
+            assert await price(1, first.valid_from - timedelta(seconds=1)) == 10.0  # before the list had items
+            assert await price(1, first.valid_from) == 8.0
+            assert await price(1, second.valid_from) == 7.0
+            assert await price(2, removed.valid_from) == 18.0
+            assert await price(2, removed.valid_to) == 20.0
+
+    run_in_db(scenario)
+
+def test_list_in_effect_only_changes_name_and_end(run_in_db):
+    async def scenario(sessions):
+        async with sessions() as db:
+            live = await create_price_list(PriceListCreate(name="Live"), db=db)
+            draft = await create_price_list(PriceListCreate(name="Draft", is_active=False), db=db)
+            later = datetime.utcnow() + timedelta(days=30)
+
+            for change in ({"priority": 5}, {"is_active": False}, {"valid_to": JAN}):
+                with pytest.raises(HTTPException) as exc:
+                    await update_price_list(live.id, PriceListUpdate(**change), db=db)
+                assert exc.value.status_code == 409
+            renamed = await update_price_list(live.id, PriceListUpdate(name="Renamed", valid_to=later), db=db)
+            assert (renamed.name, renamed.valid_to) == ("Renamed", later)
+
+            # A list that never applied can change freely, but activating it starts it now
+            before = datetime.utcnow()
+            activated = await update_price_list(draft.id, PriceListUpdate(priority=3, valid_from=JAN, is_active=True), db=db)
+            assert activated.priority == 3 and activated.valid_from >= before
+
+    run_in_db(scenario)
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import socket
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from core.config import get_settings
+from modules.printing.domain.models import Printer, PrintJob, PrintJobStatus
+from modules.printing.application.spooler import PrintSpooler, PrintQueueService, retry_delay
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+TABLES = [Printer.__table__, PrintJob.__table__]
+
+async def add_printer(sessions, **kwargs) -> int:
+    async with sessions() as db:
+        printer = Printer(is_active=True, **kwargs)
+        db.add(printer)
+        await db.commit()
+        return printer.id
+
+async def statuses(sessions) -> list:
+    async with sessions() as db:
+        return (await db.execute(select(PrintJob.status).order_by(PrintJob.id))).scalars().all()
+
+def test_retry_delay_doubles_up_to_cap():
+    assert [retry_delay(n, 2.0, 10.0) for n in range(1, 6)] == [2.0, 4.0, 8.0, 10.0, 10.0]
+
+def test_jobs_are_delivered_over_tcp_and_to_files(tmp_path, run_in_db):
+    async def scenario(sessions):
+        received = []
+
+        async def fake_printer(reader, writer):
+            received.append(await reader.read())
+            writer.close()
+
+        server = await asyncio.start_server(fake_printer, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        tcp_id = await add_printer(sessions, name="counter", backend="tcp", target=f"127.0.0.1:{port}", concurrency=1)
+        file_id = await add_printer(sessions, name="office", backend="file", target=str(tmp_path / "spool"), concurrency=2)
+
+        async with sessions() as db:
+            queue = PrintQueueService(db)
+            await queue.enqueue(tcp_id, [("sale-1", b"\x1b@one"), ("sale-2", b"\x1b@two"), ("sale-3", b"\x1b@three")])
+            file_jobs = await queue.enqueue(file_id, [("document-7", b"\x1b@doc")])
+
+        spooler = PrintSpooler(session_factory=sessions)
+        # Concurrency 1: one TCP job per pass, in queue order
+        assert await spooler.run_once() == 2
+        await spooler.drain()
+        while await spooler.run_once():
+            await spooler.drain()
+
+        server.close()
+        await server.wait_closed()
+        with open(tmp_path / "spool" / f"job-{file_jobs[0].id}.bin", "rb") as f:
+            assert f.read() == b"\x1b@doc"
+        assert received == [b"\x1b@one", b"\x1b@two", b"\x1b@three"]
+        assert await statuses(sessions) == [PrintJobStatus.DONE.value] * 4
+        async with sessions() as db:
+            assert (await db.get(Printer, tcp_id)).last_status == "ok"
+
+    run_in_db(scenario, tables=TABLES)
+
+def test_unreachable_printer_backs_off_then_fails(run_in_db, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "PRINT_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(settings, "PRINT_TCP_TIMEOUT_SECONDS", 1.0)
+
+    async def scenario(sessions):
+        printer_id = await add_printer(sessions, name="dead", backend="tcp", target=f"127.0.0.1:{free_port()}", concurrency=1)
+        async with sessions() as db:
+            job_id = (await PrintQueueService(db).enqueue(printer_id, [("sale-1", b"\x1b@")]))[0].id
+
+        spooler = PrintSpooler(session_factory=sessions)
+        assert await spooler.run_once() == 1
+        await spooler.drain()
+        async with sessions() as db:
+            job = await db.get(PrintJob, job_id)
+            assert job.status == PrintJobStatus.QUEUED.value and job.attempts == 1
+            assert job.next_attempt_at > datetime.utcnow()
+            assert (await db.get(Printer, printer_id)).last_status == "error"
+
+        # Not due yet; after the backoff the second attempt exhausts the budget
+        assert await spooler.run_once() == 0
+        assert await spooler.run_once(now=datetime.utcnow() + timedelta(hours=1)) == 1
+        await spooler.drain()
+        assert await statuses(sessions) == [PrintJobStatus.FAILED.value]
+
+        async with sessions() as db:
+            job = await PrintQueueService(db).retry(job_id)
+            assert (job.status, job.attempts) == (PrintJobStatus.QUEUED.value, 0)
+
+    run_in_db(scenario, tables=TABLES)
+
+def test_expired_printing_lease_is_requeued(tmp_path, run_in_db):
+    async def scenario(sessions):
+        printer_id = await add_printer(sessions, name="office", backend="file", target=str(tmp_path / "spool"), concurrency=1)
+        async with sessions() as db:
+            # Claimed by a worker that died before recording the outcome
+            db.add(PrintJob(printer_id=printer_id, payload=b"x", size=1, status=PrintJobStatus.PRINTING.value,
+                            attempts=1, max_attempts=5, updated_at=datetime.utcnow() - timedelta(hours=1)))
+            await db.commit()
+
+        spooler = PrintSpooler(session_factory=sessions)
+        assert await spooler.run_once() == 1
+        await spooler.drain()
+        assert await statuses(sessions) == [PrintJobStatus.DONE.value]
+        assert os.listdir(tmp_path / "spool") == ["job-1.bin"]
+
+    run_in_db(scenario, tables=TABLES)
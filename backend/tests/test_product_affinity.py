@@ -0,0 +1,54 @@
+import pytest
+from datetime import datetime, timedelta
+from core.config import get_settings
+from modules.catalog.domain.models import Product
+from modules.sales.domain.models import Sale, SaleItem, SaleStatus
+from modules.sales.application.affinity_service import AffinityService
+
+def test_count_baskets_builds_pair_counts():
+    # (sale_id, product_id) rows; duplicated lines of a product count once per basket
+    rows = [
+        (1, 10), (1, 20),
+        (2, 10), (2, 20), (2, 30), (2, 30),
+        (3, 10), (3, 30),
+    ]
+    baskets, items, pairs = AffinityService.count_baskets(rows)
+
+    assert baskets == 3
+    assert items == {10: 3, 20: 2, 30: 2}
+    assert pairs == {(10, 20): 2, (10, 30): 2, (20, 30): 1}
+
+def test_refresh_leaves_sales_inside_the_commit_lag_for_the_next_run(run_in_db, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "ANALYTICS_COMMIT_LAG_SECONDS", 60)
+    now = datetime.utcnow()
+
+    async def scenario(sessions):
+        async with sessions() as db:
+            db.add_all([Product(id=pid, name=f"P{pid}", sku=f"P{pid}", price=1.0) for pid in (1, 2, 3)])
+            baskets = [(1, now - timedelta(minutes=10), (1, 2)), (2, now - timedelta(minutes=10), (1, 3)),
+                       (3, now - timedelta(seconds=10), (1, 2))]
+            for sale_id, confirmed_at, products in baskets:
+                db.add(Sale(id=sale_id, warehouse_id=1, status=SaleStatus.CONFIRMED.value, confirmed_at=confirmed_at))
+                db.add_all([SaleItem(sale_id=sale_id, product_id=pid, qty=1, price=1.0) for pid in products])
+            await db.commit()
+
+            service = AffinityService(db)
+            # Sale 3 may still have concurrent siblings committing: not folded in yet
+            assert (await service.refresh())["new_baskets"] == 2
+            related = await service.get_related(1)
+            assert sorted((r["product_id"], r["pair_count"]) for r in related) == [(2, 1), (3, 1)]
+
+            monkeypatch.setattr(settings, "ANALYTICS_COMMIT_LAG_SECONDS", 0)
+            result = await service.refresh()
+            assert (result["new_baskets"], result["total_baskets"]) == (1, 3)
+            related = {r["product_id"]: r for r in await service.get_related(1)}
+            assert related[2]["pair_count"] == 2
+            assert related[2]["confidence"] == pytest.approx(2 / 3)
+            assert related[2]["lift"] == pytest.approx(1.0)
+
+            # Nothing is counted twice
+            assert (await service.refresh())["new_baskets"] == 0
+            assert (await service.get_related(1))[0]["pair_count"] == 2
+
+    run_in_db(scenario)
@@ -0,0 +1,25 @@
+from sqlalchemy import select, func
+from modules.catalog.domain.models import Product
+from modules.inventory.domain.models import Warehouse, Location, ProductLocation
+from modules.catalog.application.product_writer import ProductWriteService
+
+def test_delete_removes_bin_assignments(run_in_db):
+    async def scenario(sessions):
+        async with sessions() as db:
+            db.add_all([Warehouse(id=1, name="Main"), Product(id=1, name="Yerba", sku="Y1", price=1.0)])
+            await db.flush()
+            db.add(Location(id=1, warehouse_id=1, code="A-01-1-1", aisle="A"))
+            await db.flush()
+            db.add(ProductLocation(product_id=1, location_id=1, is_primary=True))
+            await db.commit()
+
+            await ProductWriteService(db).delete(1)
+            await db.commit()
+
+            assert (await db.execute(select(func.count(ProductLocation.id)))).scalar() == 0
+            assert await db.get(Product, 1) is None
+            # The slot itself stays; only the assignment goes
+            assert await db.get(Location, 1) is not None
+
+    # Enforce FKs like Postgres does: a leftover product_locations row would fail the delete
+    run_in_db(scenario, foreign_keys=True)
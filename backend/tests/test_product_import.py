@@ -0,0 +1,90 @@
+import io
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import select, text
+from modules.catalog.domain.models import Product, ProductBarcode
+from modules.catalog.application.import_service import parse_record, iter_csv, iter_xlsx, ProductImportService
+
+def test_parse_record_lists_costs_and_blanks():
+    row = parse_record({
+        "sku": " A1 ", "name": "", "price": "7.50",
+        "barcodes": "111| 112 |", "supplier_ids": "1|2", "cost:3": "2.5", "cost:4": "",
+    })
+    assert row.sku == "A1"
+    assert row.name is None  # blank cell: keep current value
+    assert row.price == 7.5
+    assert row.barcodes == ["111", "112"]
+    assert row.supplier_ids == [1, 2]
+    assert row.costs == {3: 2.5}
+
+def test_parse_record_rejects_bad_values():
+    with pytest.raises(ValidationError):
+        parse_record({"sku": "A1", "price": "abc"})
+    with pytest.raises(ValidationError):
+        parse_record({"sku": "  "})
+
+def test_iter_csv_handles_bom():
+    data = io.BytesIO("﻿sku,name\nA1,Apple\n".encode("utf-8"))
+    assert list(iter_csv(data)) == [{"sku": "A1", "name": "Apple"}]
+
+def test_duplicate_sku_is_superseded_not_failed(run_in_db):
+    async def scenario(sessions):
+        async with sessions() as db:
+            data = io.BytesIO(b"sku,name,price\nA1,Apple,1\nB1,,2\nA1,Apple v2,3\n")
+            return await ProductImportService(db).run(iter_csv(data))
+
+    report = run_in_db(scenario)
+    assert (report["rows"], report["created"], report["superseded"], report["failed"]) == (3, 1, 1, 1)
+    assert report["superseded_rows"] == [{"row": 2, "sku": "A1", "superseded_by": 4}]
+    # Only the real problem (new product without a name) is an error
+    assert [e["row"] for e in report["errors"]] == [3]
+
+def test_skipped_barcodes_are_warnings_on_written_rows(run_in_db):
+    async def scenario(sessions):
+        async with sessions() as db:
+            db.add(Product(id=1, name="Owner", sku="O1"))
+            await db.flush()
+            db.add(ProductBarcode(product_id=1, barcode="111"))
+            await db.commit()
+            data = io.BytesIO(b"sku,name,barcodes\nA1,Apple,111|222\nO1,,333\n")
+            return await ProductImportService(db).run(iter_csv(data))
+
+    report = run_in_db(scenario)
+    assert (report["created"], report["updated"], report["failed"], report["errors"]) == (1, 1, 0, [])
+    assert report["warnings"] == [{"row": 2, "sku": "A1", "warning": "Barcodes already assigned to another product (skipped): ['111']"}]
+    assert report["results"] == [{"row": 2, "sku": "A1", "status": "created"}, {"row": 3, "sku": "O1", "status": "updated"}]
+
+def test_rejected_chunk_is_retried_row_by_row(run_in_db):
+    async def scenario(sessions):
+        async with sessions() as db:
+            # Stands in for any database-side rule the validation does not know about
+            await db.execute(text(
+                "CREATE TRIGGER block_bad_sku BEFORE INSERT ON products WHEN NEW.sku = 'BAD' "
+                "BEGIN SELECT RAISE(ABORT, 'sku BAD is blocked'); END"
+            ))
+            await db.commit()
+            data = io.BytesIO(b"sku,name\nA1,Apple\nBAD,Broken\nC1,Cherry\n")
+            report = await ProductImportService(db).run(iter_csv(data))
+            skus = (await db.execute(select(Product.sku).order_by(Product.sku))).scalars().all()
+            return report, skus
+
+    report, skus = run_in_db(scenario)
+    assert skus == ["A1", "C1"]
+    assert (report["created"], report["failed"]) == (2, 1)
+    assert [r["status"] for r in report["results"]] == ["created", "failed", "created"]
+    assert report["errors"] == [{"row": 3, "sku": "BAD", "error": "Rejected by database: IntegrityError: sku BAD is blocked"}]
+
+def test_iter_xlsx_reads_header_and_skips_blank_rows():
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for values in (["sku", "name", "price", None], ["A1", "Apple", 7.5, None], [None, None, None, None], [101, "Pear", 3, None]):
+        sheet.append(values)
+    data = io.BytesIO()
+    workbook.save(data)
+    data.seek(0)
+
+    assert list(iter_xlsx(data)) == [
+        {"sku": "A1", "name": "Apple", "price": "7.5"},
+        {"sku": "101", "name": "Pear", "price": "3"},
+    ]
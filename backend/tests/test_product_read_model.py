@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import select
+from modules.catalog.domain.models import Product, ProductBarcode
+from modules.suppliers.domain.models import Supplier
+from modules.catalog.api.v1.router import ProductRead
+from modules.catalog.application.read_model import COMPACT_COLUMNS, COMPACT_FIELDS, fetch_compact, parse_fields
+
+def test_parse_fields_always_includes_id():
+    assert parse_fields(None) == list(COMPACT_FIELDS)
+    assert parse_fields("sku, price") == ["id", "sku", "price"]
+    with pytest.raises(ValueError):
+        parse_fields("sku,suppliers")
+
+def test_compact_rows_match_the_full_view(run_in_db):
+    async def scenario(sessions):
+        async with sessions() as db:
+            supplier = Supplier(id=1, name="Acme")
+            db.add_all([
+                Product(id=1, name="Yerba", sku="Y1", price=2.5, suppliers=[supplier], measurement_value=500, measurement_unit="g"),
+                Product(id=2, name="Sugar", sku="S1", price=1.0, product_type="fractional", unit_of_measure="kg"),
+                Product(id=3, name="Soap", sku="SP1", description="Bar", is_inventory_tracked=False),
+            ])
+            await db.flush()
+            db.add_all([ProductBarcode(product_id=1, barcode="7790001"), ProductBarcode(product_id=1, barcode="7790002"),
+                        ProductBarcode(product_id=3, barcode="7790003")])
+            await db.commit()
+
+        async with sessions() as db:
+            compact = await fetch_compact(db)
+            full = [ProductRead.model_validate(p) for p in (await db.execute(select(Product).order_by(Product.id))).scalars()]
+
+            assert [row["id"] for row in compact] == [p.id for p in full]
+            for row, product in zip(compact, full):
+                # Scalars only: no supplier / cost component graphs
+                assert tuple(row) == COMPACT_FIELDS
+                assert {f: row[f] for f in COMPACT_COLUMNS} == product.model_dump(include=set(COMPACT_COLUMNS))
+                assert sorted(row["barcodes"]) == sorted(b.barcode for b in product.barcodes)
+            assert compact[1]["barcodes"] == []
+
+            narrow = await fetch_compact(db, fields=parse_fields("sku"), skip=1, limit=1)
+            assert narrow == [{"id": 2, "sku": "S1"}]
+
+    run_in_db(scenario)
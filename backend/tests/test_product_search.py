@@ -0,0 +1,73 @@
+import importlib.util
+from pathlib import Path
+from sqlalchemy import select, text
+from modules.catalog.domain.models import Product, ProductBarcode
+from modules.catalog.application.search_service import fts5_query, ProductSearchService
+
+def test_fts5_query_prefix_tokens():
+    assert fts5_query("coca col") == '"coca"* "col"*'
+    # SKU punctuation is a token separator in the FTS index as well
+    assert fts5_query("CC-500") == '"CC"* "500"*'
+
+def test_fts5_query_ignores_operators():
+    assert fts5_query('"; DROP') == '"DROP"*'
+    assert fts5_query("%*") is None
+
+def search_migration():
+    path = Path(__file__).resolve().parents[1] / "alembic" / "versions" / "f2c8b5a1d7e9_product_search_index.py"
+    spec = importlib.util.spec_from_file_location("product_search_index", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+async def seed(sessions):
+    async with sessions() as db:
+        db.add_all([
+            Product(id=1, name="Coca Cola 500", sku="CC-500", price=1.0),
+            Product(id=2, name="Cocoa Powder", sku="CP-1", price=1.0),
+            Product(id=3, name="Yerba Mate", sku="YM-1", price=1.0),
+        ])
+        await db.flush()
+        db.add_all([ProductBarcode(product_id=3, barcode="7790001"), ProductBarcode(product_id=2, barcode="7790387")])
+        await db.commit()
+
+def test_search_uses_fts_index_kept_by_triggers(run_in_db):
+    async def scenario(sessions):
+        async with sessions() as db:
+            for statement in search_migration().SQLITE_UPGRADE:
+                await db.execute(text(statement))
+            await db.commit()
+        await seed(sessions)
+
+        async with sessions() as db:
+            service = ProductSearchService(db)
+            assert await service._has_fts()
+            assert [p["id"] for p in await service.search("coca")] == [1]
+            assert sorted(p["id"] for p in await service.search("coc")) == [1, 2]
+            # Exact barcode first, then the ranked prefix hits
+            assert [p["id"] for p in await service.search("7790001")] == [3]
+            assert sorted(p["id"] for p in await service.search("779")) == [2, 3]
+
+            # Barcode edited in place: the FTS row follows the update trigger
+            barcode = (await db.execute(select(ProductBarcode).where(ProductBarcode.barcode == "7790001"))).scalar_one()
+            barcode.barcode = "5550001"
+            await db.commit()
+            assert [p["id"] for p in await service.search("779")] == [2]
+            assert [p["id"] for p in await service.search("555")] == [3]
+
+    run_in_db(scenario)
+
+def test_search_falls_back_to_like_without_fts(run_in_db):
+    async def scenario(sessions):
+        await seed(sessions)
+        async with sessions() as db:
+            service = ProductSearchService(db)
+            assert not await service._has_fts()
+            assert [p["id"] for p in await service.search("coc")] == [1, 2]
+            assert [p["id"] for p in await service.search("ym-")] == [3]
+            assert [p["id"] for p in await service.search("7790387")] == [2]
+            # The caller's session is left usable: nothing was rolled back
+            db.add(Product(id=4, name="Cocido", sku="CO-1", price=1.0))
+            assert [p["id"] for p in await service.search("coci")] == [4]
+
+    run_in_db(scenario)
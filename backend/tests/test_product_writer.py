@@ -0,0 +1,108 @@
+import pytest
+from datetime import datetime
+from sqlalchemy import event, select
+from modules.catalog.domain.models import Product, CatalogTombstone, product_supplier_association
+from modules.finance.domain.models import CostCategory, ProductCostComponent
+from modules.sales.domain.models import Sale, SaleItem
+from modules.suppliers.domain.models import Supplier
+from modules.catalog.application.product_writer import ProductWriteService, ProductInUseError, ProductNotFoundError
+
+STAMP = datetime(2026, 1, 1)
+
+async def seed(sessions):
+    async with sessions() as db:
+        db.add_all([Supplier(id=1, name="Acme"), Supplier(id=2, name="Bolt")])
+        db.add_all([CostCategory(id=cid, name=name) for cid, name in ((1, "Freight"), (2, "Tax"), (3, "Packing"))])
+        db.add_all([Product(id=1, name="Yerba", sku="Y1", price=2.5, updated_at=STAMP),
+                    Product(id=2, name="Sugar", sku="S1", price=1.0, updated_at=STAMP)])
+        await db.flush()
+        await db.execute(product_supplier_association.insert(), [{"product_id": 1, "supplier_id": 1}])
+        # Category 2 twice: a leftover duplicate the diff should clean up
+        db.add_all([ProductCostComponent(id=1, product_id=1, cost_category_id=1, value=10.0),
+                    ProductCostComponent(id=2, product_id=1, cost_category_id=2, value=5.0),
+                    ProductCostComponent(id=3, product_id=1, cost_category_id=2, value=5.0)])
+        await db.commit()
+
+def test_patch_writes_only_changed_columns(run_in_db):
+    async def scenario(sessions):
+        await seed(sessions)
+        async with sessions() as db:
+            statements = []
+            event.listen(db.bind.sync_engine, "before_cursor_execute",
+                         lambda conn, cursor, sql, params, context, many: statements.append(sql))
+            service = ProductWriteService(db)
+
+            assert await service.apply_changes(1, {"name": "Yerba", "sku": "Y1", "price": 3.0}) == ["price"]
+            updates = [sql for sql in statements if sql.startswith("UPDATE products")]
+            assert len(updates) == 1
+            assert "price" in updates[0] and "updated_at" in updates[0]
+            assert "name" not in updates[0] and "sku" not in updates[0]
+
+            # Same values again: no write and no new updated_at stamp
+            statements.clear()
+            assert await service.apply_changes(1, {"name": "Yerba", "price": 3.0}) == []
+            assert not [sql for sql in statements if sql.startswith("UPDATE")]
+            await db.commit()
+
+            product = (await db.execute(select(Product.price, Product.updated_at).where(Product.id == 1))).one()
+            assert product.price == 3.0 and product.updated_at > STAMP
+
+            with pytest.raises(ProductNotFoundError):
+                await service.apply_changes(99, {"price": 1.0})
+
+    run_in_db(scenario)
+
+def test_suppliers_and_cost_components_are_diffed(run_in_db):
+    async def scenario(sessions):
+        await seed(sessions)
+        async with sessions() as db:
+            service = ProductWriteService(db)
+
+            # Unknown supplier 99 is ignored, as on create
+            assert await service.apply_changes(1, {"supplier_ids": [2, 99]}) == ["supplier_ids"]
+            assert await service.apply_changes(1, {"supplier_ids": [2]}) == []
+            links = (await db.execute(select(product_supplier_association.c.supplier_id)
+                                      .where(product_supplier_association.c.product_id == 1))).scalars().all()
+            assert links == [2]
+
+            components = [{"category_id": 1, "value": 12}, {"category_id": 2, "value": 5}, {"category_id": 3, "value": 1}]
+            assert await service.apply_changes(1, {"cost_components": components}) == ["cost_components"]
+            assert await service.apply_changes(1, {"cost_components": components}) == []
+            await db.commit()
+
+            rows = (await db.execute(
+                select(ProductCostComponent.id, ProductCostComponent.cost_category_id, ProductCostComponent.value)
+                .where(ProductCostComponent.product_id == 1).order_by(ProductCostComponent.cost_category_id)
+            )).all()
+            # Updated in place, duplicate dropped, new category inserted
+            assert [(r.id, r.cost_category_id, r.value) for r in rows][:2] == [(1, 1, 12.0), (2, 2, 5.0)]
+            assert [(r.cost_category_id, r.value) for r in rows] == [(1, 12.0), (2, 5.0), (3, 1.0)]
+            # Association-only changes still stamp the product for delta sync
+            assert (await db.get(Product, 1)).updated_at > STAMP
+
+    run_in_db(scenario)
+
+def test_delete_refuses_products_with_history(run_in_db):
+    async def scenario(sessions):
+        await seed(sessions)
+        async with sessions() as db:
+            db.add(Sale(id=1, warehouse_id=1))
+            db.add(SaleItem(sale_id=1, product_id=2, qty=1, price=1.0))
+            await db.commit()
+
+            service = ProductWriteService(db)
+            with pytest.raises(ProductInUseError) as error:
+                await service.delete(2)
+            assert error.value.references == ["sale_items"]
+
+            await service.delete(1)
+            await db.commit()
+            assert await db.get(Product, 1) is None
+            assert (await db.execute(select(ProductCostComponent.id))).scalars().all() == []
+            tombstone = (await db.execute(select(CatalogTombstone.entity_id))).scalars().all()
+            assert tombstone == [1]
+
+            with pytest.raises(ProductNotFoundError):
+                await service.delete(1)
+
+    run_in_db(scenario, foreign_keys=True)
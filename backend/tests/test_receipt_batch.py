@@ -0,0 +1,57 @@
+import asyncio
+import io
+import zipfile
+from datetime import datetime
+from core.config import get_settings
+from modules.printing.domain.schemas import ReceiptData, ReceiptItem, PrinterConfig
+from modules.printing.application.service import ReceiptService
+from modules.catalog.domain.models import Product
+from modules.sales.domain.models import Sale, SaleItem
+from modules.invoicing.domain.models import Document, DocumentItem
+from modules.printing.application.batch_service import render_receipts, build_zip, ReceiptBatchService
+
+def make_receipt(n: int) -> ReceiptData:
+    return ReceiptData(
+        store_name="Store", sale_id=str(n), date=datetime(2026, 1, 2, 10, 0),
+        items=[ReceiptItem(name="Yerba", qty=2, price=3.5, total=7.0)],
+        subtotal=7.0, total=7.0, payments=[],
+    )
+
+def test_pool_rendering_matches_inline_and_keeps_order(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "PRINT_BATCH_WORKERS", 2)
+    monkeypatch.setattr(settings, "PRINT_BATCH_POOL_THRESHOLD", 3)
+    config = PrinterConfig()
+    receipts = [make_receipt(n) for n in range(5)]
+
+    jobs = asyncio.run(render_receipts(receipts, config))
+    assert jobs == [ReceiptService.generate_receipt_bytes(r, config) for r in receipts]
+
+def test_zip_has_one_entry_per_receipt():
+    archive = zipfile.ZipFile(io.BytesIO(build_zip([("sale-1.bin", b"\x1b@a"), ("document-4.bin", b"\x1b@b")])))
+    assert archive.namelist() == ["sale-1.bin", "document-4.bin"]
+    assert archive.read("document-4.bin") == b"\x1b@b"
+
+def test_documents_print_their_billed_lines(run_in_db):
+    async def scenario(sessions):
+        async with sessions() as db:
+            db.add_all([Product(id=1, name="Yerba", sku="Y1", price=3.5), Product(id=2, name="Mate", sku="M1", price=9.0)])
+            db.add(Sale(id=1, warehouse_id=1, total=25.0, items=[
+                SaleItem(id=1, product_id=1, qty=2.0, price=3.5), SaleItem(id=2, product_id=2, qty=2.0, price=9.0),
+            ]))
+            # Short-picked: one Mate billed. Document 2 predates stored lines.
+            db.add(Document(id=1, sale_id=1, status="ISSUED", total=16.0, store_name="Store", items=[
+                DocumentItem(sale_item_id=1, product_id=1, qty=2.0, price=3.5),
+                DocumentItem(sale_item_id=2, product_id=2, qty=1.0, price=9.0),
+            ]))
+            db.add(Document(id=2, sale_id=1, status="ISSUED", total=25.0, store_name="Store"))
+            await db.commit()
+
+        async with sessions() as db:
+            receipts, missing = await ReceiptBatchService(db).load(sale_ids=[1], document_ids=[1, 2])
+        lines = {name: [(i.name, i.qty, i.total) for i in receipt.items] for name, receipt in receipts}
+        sold = [("Yerba", 2.0, 7.0), ("Mate", 2.0, 18.0)]
+        assert lines == {"sale-1.bin": sold, "document-1.bin": [("Yerba", 2.0, 7.0), ("Mate", 1.0, 9.0)], "document-2.bin": sold}
+        assert dict(receipts)["document-1.bin"].total == 16.0
+
+    run_in_db(scenario)
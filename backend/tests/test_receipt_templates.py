@@ -0,0 +1,101 @@
+from datetime import datetime
+import pytest
+from modules.printing.domain.schemas import (
+    ReceiptData, ReceiptItem, ReceiptPayment, PrinterConfig, ReceiptTemplate, TemplateLine
+)
+from modules.printing.application.service import EscPosBuilder, ReceiptService
+
+def builder_receipt_bytes(data, config) -> bytes:
+    """The receipt layout as built call by call with EscPosBuilder before templates were compiled."""
+    builder = EscPosBuilder(encoding=config.encoding)
+    w = 48 if config.paper_width == 80 else 32
+    builder.init()
+    builder.align("center")
+    builder.set_size(1, 1).emphasize(True)
+    builder.text_ln(data.store_name)
+    builder.emphasize(False).set_size(1, 1)
+    if data.store_address: builder.text_ln(data.store_address)
+    if data.store_cuit: builder.text_ln(f"CUIT: {data.store_cuit}")
+    if data.store_iva: builder.text_ln(data.store_iva)
+    builder.feed(1)
+    builder.align("left")
+    builder.text_ln(f"Fecha: {data.date.strftime('%d/%m/%Y %H:%M')}")
+    builder.text_ln(f"Ticket: {data.sale_id}")
+    if data.customer_name: builder.text_ln(f"Cliente: {data.customer_name}")
+    builder.product_separator(w)
+    builder.align("left")
+    for item in data.items:
+        builder.emphasize(True).text_ln(item.name).emphasize(False)
+        qty_price = f"{item.qty:.2f} x ${item.price:.2f}"
+        total_str = f"${item.total:.2f}"
+        spaces = w - len(qty_price) - len(total_str)
+        if spaces < 1: spaces = 1
+        builder.text_ln(qty_price + (" " * spaces) + total_str)
+    builder.product_separator(w)
+    builder.align("right")
+    builder.emphasize(True).set_size(1, 2)
+    builder.text_ln(f"TOTAL: ${data.total:.2f}")
+    builder.set_size(1, 1).emphasize(False)
+    builder.feed(1)
+    builder.align("left")
+    for pay in data.payments:
+        builder.text_ln(f"Pago: {pay.method} ${pay.amount:.2f}")
+    builder.feed(1)
+    builder.align("center")
+    if data.qr_data:
+        builder.qr_code(data.qr_data)
+        builder.feed(1)
+    builder.text_ln("GRACIAS POR SU COMPRA")
+    builder.feed(config.feed_lines)
+    builder.cut(mode=config.cut_mode)
+    return builder.get_bytes()
+
+def make_receipt(**overrides) -> ReceiptData:
+    fields = dict(
+        store_name="Almacén Ñandú", store_address="Av. Siempre Viva 742", store_cuit="20-12345678-9",
+        store_iva="Responsable Inscripto", sale_id="1042", date=datetime(2026, 5, 4, 18, 30),
+        customer_name="José Pérez",
+        items=[
+            ReceiptItem(name="Yerba mate 1kg", qty=2, price=3250.5, total=6501.0),
+            ReceiptItem(name="Azúcar", qty=1.5, price=899.99, total=1349.99),
+            ReceiptItem(name="X" * 24, qty=1234.5, price=99999.99, total=123449987.65),
+        ],
+        subtotal=123457838.64, total=123457838.64,
+        payments=[ReceiptPayment(method="Efectivo", amount=100.0), ReceiptPayment(method="Débito", amount=57.5)],
+        qr_data="https://www.afip.gob.ar/fe/qr/?p=eyJ2ZXIiOjF9" * 3,
+    )
+    fields.update(overrides)
+    return ReceiptData(**fields)
+
+@pytest.mark.parametrize("config", [
+    PrinterConfig(),
+    PrinterConfig(paper_width=58, cut_mode="full", feed_lines=2),
+    PrinterConfig(encoding="cp437"),
+    PrinterConfig(encoding="not-a-codec"),
+])
+@pytest.mark.parametrize("overrides", [
+    {},
+    {"store_address": None, "store_cuit": "", "store_iva": None, "customer_name": None, "qr_data": None, "payments": []},
+    {"items": [], "store_name": ""},
+])
+def test_compiled_output_matches_builder(config, overrides):
+    data = make_receipt(**overrides)
+    assert ReceiptService.generate_receipt_bytes(data, config) == builder_receipt_bytes(data, config)
+
+def test_custom_template_changes_static_sections_only():
+    template = ReceiptTemplate(
+        header=[TemplateLine(text="{store_name}", align="center", bold=True, width=2, height=2),
+                TemplateLine(text="Tel: 555-0101", align="left")],
+        footer=[TemplateLine(text="Cambios dentro de 30 días", align="center")],
+    )
+    data = make_receipt()
+    default = ReceiptService.generate_receipt_bytes(data, PrinterConfig())
+    custom = ReceiptService.generate_receipt_bytes(data, PrinterConfig(template=template))
+    assert b"Tel: 555-0101" in custom and b"CUIT" not in custom
+    assert b"GRACIAS" not in custom
+    # Variable sections are untouched
+    assert default[default.index(b"Fecha:"):default.index(b"TOTAL")] == custom[custom.index(b"Fecha:"):custom.index(b"TOTAL")]
+
+def test_template_rejects_unknown_fields():
+    with pytest.raises(ValueError):
+        TemplateLine(text="{store_phone}")
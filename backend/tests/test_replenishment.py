@@ -0,0 +1,22 @@
+from modules.inventory.application.replenishment_service import plan_replenishment
+
+def test_fast_mover_gets_velocity_based_reorder():
+    # 10 units/day in every window
+    units = {7: 70.0, 30: 300.0, 90: 900.0}
+    plan = plan_replenishment(stock=50.0, units=units, min_stock_level=10.0,
+                              lead_time_days=7, coverage_days=30, safety_days=3)
+
+    assert plan["daily_velocity"] == 10.0
+    assert plan["days_of_cover"] == 5.0
+    assert plan["reorder_point"] == 100.0
+    assert plan["needs_reorder"] is True
+    # Target = 10/day * (7 + 3 + 30) days = 400
+    assert plan["suggested_qty"] == 350
+
+def test_product_without_sales_uses_min_stock_level():
+    plan = plan_replenishment(stock=3.0, units={}, min_stock_level=5.0,
+                              lead_time_days=7, coverage_days=30, safety_days=3)
+
+    assert plan["days_of_cover"] is None
+    assert plan["needs_reorder"] is True
+    assert plan["suggested_qty"] == 2
@@ -0,0 +1,62 @@
+import pytest
+from datetime import datetime
+from pydantic import ValidationError
+from sqlalchemy import select
+from modules.catalog.domain.models import Product, product_supplier_association
+from modules.suppliers.domain.models import Supplier
+from modules.catalog.application.reprice_service import glob_to_like, RepriceRequest, RepriceService
+
+def test_glob_to_like_escapes_sql_wildcards():
+    assert glob_to_like("AB*") == "AB%"
+    assert glob_to_like("A?C") == "A_C"
+    assert glob_to_like("B_1*") == "B\\_1%"
+    assert glob_to_like("50%") == "50\\%"
+
+def test_request_requires_rules():
+    with pytest.raises(ValidationError):
+        RepriceRequest(rules=[])
+    assert RepriceRequest(rules=[{"value": 5}]).dry_run is True
+
+def test_dry_run_previews_and_apply_updates(run_in_db):
+    stamp = datetime(2026, 1, 1)
+
+    async def scenario(sessions):
+        async with sessions() as db:
+            db.add(Supplier(id=2, name="Acme"))
+            db.add_all([
+                Product(id=1, name="A one", sku="A1", price=10.0, updated_at=stamp),
+                Product(id=2, name="A two", sku="A2", price=20.0, updated_at=stamp),
+                Product(id=3, name="Bulk", sku="B1", price=5.0, updated_at=stamp),
+                Product(id=4, name="Other", sku="C1", price=3.0, updated_at=stamp),
+            ])
+            await db.flush()
+            await db.execute(product_supplier_association.insert(), [
+                {"product_id": 1, "supplier_id": 2}, {"product_id": 3, "supplier_id": 2},
+            ])
+            await db.commit()
+
+        # First matching rule wins (product 1 is also Acme's); negative results clamp to 0
+        rules = [{"sku_pattern": "A*", "mode": "percent", "value": 10}, {"supplier_id": 2, "mode": "fixed", "value": -10}]
+        expected = [(1, 10.0, 11.0), (2, 20.0, 22.0), (3, 5.0, 0.0)]
+
+        async with sessions() as db:
+            preview = await RepriceService(db).run(RepriceRequest(rules=rules))
+            assert (preview["dry_run"], preview["matched"], preview["changed"]) == (True, 3, 3)
+            assert [(r["id"], r["old_price"], r["new_price"]) for r in preview["preview"]] == expected
+            prices = (await db.execute(select(Product.price).order_by(Product.id))).scalars().all()
+            assert prices == [10.0, 20.0, 5.0, 3.0]
+
+        async with sessions() as db:
+            applied = await RepriceService(db).run(RepriceRequest(rules=rules, dry_run=False))
+            assert applied["preview"] == preview["preview"]
+
+        async with sessions() as db:
+            rows = (await db.execute(select(Product.price, Product.updated_at).order_by(Product.id))).all()
+            assert [r.price for r in rows] == [11.0, 22.0, 0.0, 3.0]
+            # Touched products are stamped for the delta sync; the untouched one is not
+            assert [r.updated_at > stamp for r in rows] == [True, True, True, False]
+            # Re-running the same rules from the new prices: product 3 stays at 0
+            again = await RepriceService(db).run(RepriceRequest(rules=rules))
+            assert [(r["id"], r["new_price"]) for r in again["preview"]] == [(1, 12.1), (2, 24.2)]
+
+    run_in_db(scenario)
@@ -0,0 +1,35 @@
+import random
+import time
+from types import SimpleNamespace
+from modules.picking.application.route_optimizer import Stop, serpentine, nearest_neighbor, walking_order, route_lines
+
+def test_serpentine_reverses_every_other_visited_aisle():
+    stops = [Stop("a1r9", 1, 9), Stop("a1r2", 1, 2), Stop("a4r1", 4, 1), Stop("a4r7", 4, 7), Stop("a6r3", 6, 3), Stop("a6r5", 6, 5)]
+    route = [s.key for s in serpentine(stops)]
+    # Aisle 4 is the second visited aisle, so it is walked backwards
+    assert route == ["a1r2", "a1r9", "a4r7", "a4r1", "a6r3", "a6r5"]
+
+def test_nearest_neighbor_starts_at_dock():
+    stops = [Stop("far", 1, x=10.0, y=10.0), Stop("near", 1, x=1.0, y=0.0), Stop("mid", 1, x=5.0, y=1.0)]
+    assert [s.key for s in nearest_neighbor(stops)] == ["near", "mid", "far"]
+
+def test_coordinates_switch_heuristic_and_unlocated_go_last():
+    with_xy = [Stop("b", 2, x=0.0, y=5.0), Stop("none", None), Stop("a", 9, x=0.0, y=1.0)]
+    assert [s.key for s in walking_order(with_xy)] == ["a", "b", "none"]
+    # One stop without coordinates: fall back to aisle order
+    mixed = [Stop("b", 2, x=0.0, y=5.0), Stop("a", 9)]
+    assert [s.key for s in walking_order(mixed)] == ["b", "a"]
+
+def test_route_lines_attaches_location_codes():
+    loc = lambda code, aisle, rack: SimpleNamespace(code=code, aisle=aisle, rack=rack, level=0, bin=None, x=None, y=None)
+    lines = [{"product_id": 1}, {"product_id": 2}, {"product_id": 3}]
+    ordered = route_lines(lines, {1: loc("B-01", 2, 1), 2: loc("A-05", 1, 5)})
+    assert [(l["product_id"], l["location"]) for l in ordered] == [(2, "A-05"), (1, "B-01"), (3, None)]
+
+def test_300_stop_route_is_fast():
+    rng = random.Random(7)
+    stops = [Stop(i, rng.randint(1, 30), rng.randint(1, 40), x=rng.uniform(0, 100), y=rng.uniform(0, 60)) for i in range(300)]
+    started = time.perf_counter()
+    route = walking_order(stops)
+    assert len(route) == 300
+    assert time.perf_counter() - started < 0.5
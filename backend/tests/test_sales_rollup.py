@@ -0,0 +1,41 @@
+from datetime import datetime, date, timedelta
+from modules.catalog.domain.models import Product
+from modules.sales.domain.models import Sale, SaleItem, SaleStatus
+from modules.sales.application.rollup_service import SalesRollupService, split_range
+
+def test_split_range_reads_partial_days_from_sale_lines():
+    full, edges = split_range(datetime(2026, 3, 1, 15), datetime(2026, 3, 4, 9), timedelta(0))
+    assert full == (date(2026, 3, 2), date(2026, 3, 3))
+    assert edges == [
+        (datetime(2026, 3, 1, 15), datetime(2026, 3, 2), False),
+        (datetime(2026, 3, 4), datetime(2026, 3, 4, 9), True),
+    ]
+    # Intra-day range: no whole day, everything from sale lines
+    assert split_range(datetime(2026, 3, 1, 9), datetime(2026, 3, 1, 12), timedelta(0)) == (
+        None, [(datetime(2026, 3, 1, 9), datetime(2026, 3, 1, 12), True)]
+    )
+    # Local days (UTC-3): 03:00 UTC is local midnight, so no leading edge
+    full, edges = split_range(datetime(2026, 3, 1, 3), datetime(2026, 3, 3, 3), timedelta(hours=-3))
+    assert full == (date(2026, 3, 1), date(2026, 3, 2))
+    assert edges == [(datetime(2026, 3, 3, 3), datetime(2026, 3, 3, 3), True)]
+
+def test_top_products_keeps_intra_day_range_semantics(run_in_db):
+    async def scenario(sessions):
+        async with sessions() as db:
+            db.add_all([Product(id=1, name="Morning", sku="P1", price=1.0), Product(id=2, name="Evening", sku="P2", price=1.0)])
+            sales = [(1, datetime(2026, 3, 1, 9), 1, 5), (2, datetime(2026, 3, 1, 20), 2, 8), (3, datetime(2026, 3, 2, 10), 1, 1)]
+            for sale_id, created_at, product_id, qty in sales:
+                db.add(Sale(id=sale_id, warehouse_id=1, status=SaleStatus.CONFIRMED.value, created_at=created_at, total=qty))
+                db.add(SaleItem(sale_id=sale_id, product_id=product_id, qty=qty, price=1.0))
+            await db.commit()
+            await SalesRollupService(db).rebuild()
+
+            service = SalesRollupService(db)
+            morning = await service.get_top_products(datetime(2026, 3, 1, 8), datetime(2026, 3, 1, 12))
+            assert [(r["product_id"], r["total_sold"], r["orders"]) for r in morning] == [(1, 5.0, 1)]
+
+            # Whole day from the rollup + the first hours of the next one from sale lines
+            spanning = await service.get_top_products(datetime(2026, 3, 1), datetime(2026, 3, 2, 12))
+            assert [(r["product_id"], r["total_sold"], r["orders"]) for r in spanning] == [(2, 8.0, 1), (1, 6.0, 2)]
+
+    run_in_db(scenario)
@@ -0,0 +1,39 @@
+from modules.catalog.domain.models import Product
+from modules.sales.domain.models import Sale, SaleItem, SaleStatus
+from modules.sales.application.search_service import SaleSearchService
+
+async def seed(sessions):
+    """Two products; three sales of product 1 (totals 10, 20, 30) and one of product 2."""
+    async with sessions() as db:
+        db.add_all([Product(id=1, name="Search Prod", sku="SRCH-1", price=10.0), Product(id=2, name="Other", sku="OTH-1", price=5.0)])
+        for sale_id, (product_id, qty, price) in enumerate([(1, 1, 10.0), (1, 2, 10.0), (2, 1, 5.0), (1, 3, 10.0)], start=1):
+            db.add(Sale(id=sale_id, warehouse_id=1, status=SaleStatus.CONFIRMED.value, total=qty * price))
+            db.add(SaleItem(sale_id=sale_id, product_id=product_id, qty=qty, price=price))
+        await db.commit()
+
+def test_sales_search_filters_and_cursor(run_in_db):
+    async def scenario(sessions):
+        await seed(sessions)
+
+        async with sessions() as db:
+            service = SaleSearchService(db)
+
+            # Product filter + keyset pagination, newest first
+            page = await service.search(product_id=1, limit=2, count="exact")
+            assert [s.id for s in page["items"]] == [4, 2]
+            assert page["next_cursor"] == 2
+            assert (page["count"], page["count_is_estimate"]) == (3, False)
+
+            last_page = await service.search(product_id=1, limit=2, cursor=page["next_cursor"])
+            assert [s.id for s in last_page["items"]] == [1]
+            assert last_page["next_cursor"] is None
+            assert "count" not in last_page
+
+            # Total range
+            ranged = await service.search(product_id=1, min_total=15.0, max_total=25.0)
+            assert [s.total for s in ranged["items"]] == [20.0]
+
+            estimate = await service.search(count="estimate")
+            assert (estimate["count"], estimate["count_is_estimate"]) == (4, False)
+
+    run_in_db(scenario)
@@ -0,0 +1,53 @@
+import asyncio
+from datetime import datetime
+import pytest
+from sqlalchemy.exc import OperationalError
+from modules.picking.application.scan_context import TaskContext, encode_counts, decode_counts, scan_contexts
+from modules.picking.application.scan_channel import ScanChannel
+
+class RecordingSession:
+    def __init__(self):
+        self.rollbacks = 0
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+def test_counts_round_trip():
+    counts = {1: 3, 42: 1}
+    assert decode_counts(encode_counts(counts)) == counts
+    assert decode_counts(None) == {}
+    assert decode_counts("{}") == {}
+
+def test_progress_uses_summed_requirements():
+    ctx = TaskContext(task_id=1, sale_id=1, status="PENDING", required={7: 3.0}, scanned={7: 2}, version=2)
+    assert ctx.progress(7) == (2, 3)
+    assert ctx.progress(8) == (0, 0)
+
+def test_progress_keeps_fractional_requirements():
+    ctx = TaskContext(task_id=1, sale_id=1, status="PENDING", required={7: 2.5}, scanned={7: 2}, version=2)
+    scanned, required = ctx.progress(7)
+    assert (scanned, required) == (2, 2.5)
+    assert scanned < required
+
+def test_failed_flush_rolls_back_and_keeps_scans_queued(monkeypatch):
+    calls = []
+
+    async def record_scans(db, ctx, scans, user_id=None):
+        calls.append(list(scans))
+        if len(calls) == 1:
+            raise OperationalError("INSERT", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(scan_contexts, "record_scans", record_scans)
+    db = RecordingSession()
+    ctx = TaskContext(task_id=1, sale_id=1, status="PENDING", required={7: 2.0}, scanned={}, version=0)
+    channel = ScanChannel(db, ctx)
+    channel.pending.append((7, "779", datetime.utcnow()))
+
+    with pytest.raises(OperationalError):
+        asyncio.run(channel.flush())
+    assert db.rollbacks == 1
+    assert channel.queued == 1
+
+    # The retry runs on the rolled-back session with the same batch
+    assert asyncio.run(channel.flush()) == 1
+    assert calls[0] == calls[1] and channel.queued == 0
@@ -0,0 +1,108 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
+from core.config import get_settings
+from modules.iam.domain.models import User
+from modules.iam.application.security import create_access_token
+from modules.catalog.domain.models import Product, ProductBarcode
+from modules.catalog.application.barcode_cache import barcode_index
+from modules.sales.domain.models import Sale, SaleItem
+from modules.picking.domain.models import PickTask, PickScanEvent
+from modules.picking.application.scan_context import scan_contexts
+from modules.picking.api.v1 import router as picking_router
+
+URL = "/picking/tasks/1/ws"
+
+@pytest.fixture
+def client(tmp_path, run_in_db, monkeypatch):
+    """Picking router on a seeded temporary database: task 1 needs 2 x product 1."""
+    async def seed(sessions):
+        async with sessions() as db:
+            db.add(User(id=7, username="picker", hashed_password="x"))
+            db.add_all([Product(id=1, name="Yerba", sku="Y1"), Product(id=2, name="Sugar", sku="S1")])
+            db.add_all([ProductBarcode(product_id=1, barcode="7791"), ProductBarcode(product_id=2, barcode="7792")])
+            db.add(Sale(id=1, warehouse_id=1))
+            await db.flush()
+            db.add_all([SaleItem(sale_id=1, product_id=1, qty=2, price=1.0), PickTask(id=1, sale_id=1)])
+            await db.commit()
+
+    run_in_db(seed)
+    # The test client runs the app on its own event loop: no pooled connections across loops
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", poolclass=NullPool)
+    monkeypatch.setattr(picking_router, "SessionLocal", async_sessionmaker(engine, expire_on_commit=False))
+    monkeypatch.setattr(get_settings(), "PICK_WS_FLUSH_BATCH", 2)
+    scan_contexts.clear()
+    barcode_index.clear()
+
+    app = FastAPI()
+    app.include_router(picking_router.router)
+    with TestClient(app) as test_client:
+        yield test_client
+    scan_contexts.clear()
+    barcode_index.clear()
+
+def scan_rows(tmp_path) -> list:
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(PickScanEvent.product_id, PickScanEvent.result, PickScanEvent.user_id).order_by(PickScanEvent.id)
+        ).all()
+    engine.dispose()
+    return [tuple(row) for row in rows]
+
+def test_socket_rejects_missing_or_invalid_token(client):
+    for url in (URL, f"{URL}?token=not-a-jwt"):
+        with pytest.raises(WebSocketDisconnect) as closed:
+            with client.websocket_connect(url) as ws:
+                ws.receive_text()
+        assert closed.value.code == 1008
+
+def test_scans_are_answered_at_once_and_flushed_in_batches(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "PICK_WS_FLUSH_MS", 60000)
+    token = create_access_token("picker")
+
+    with client.websocket_connect(f"{URL}?token={token}") as ws:
+        ws.send_text('{"barcode": "7791", "seq": 1}')
+        reply = ws.receive_json()
+        assert (reply["type"], reply["seq"], reply["status"], reply["scanned_qty"], reply["required_qty"]) == ("scan", 1, "MATCH", 1, 2.0)
+        # A wrong product is answered right away and does not count towards the batch
+        ws.send_text("7792")
+        assert ws.receive_json()["status"] == "MISMATCH"
+        assert scan_rows(tmp_path) == []
+
+        ws.send_text("7791")
+        assert ws.receive_json()["scanned_qty"] == 2
+        # Second matching scan fills the batch: persisted before the timer fires
+        assert ws.receive_json() == {"type": "flushed", "persisted": 2, "scan_count": 2}
+
+    assert scan_rows(tmp_path) == [(2, "MISMATCH", 7), (1, "MATCH", 7), (1, "MATCH", 7)]
+
+def test_failed_flush_is_rolled_back_and_retried(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "PICK_WS_FLUSH_MS", 50)
+    record_scans = scan_contexts.record_scans
+    attempts = []
+
+    async def flaky_record_scans(db, ctx, scans, user_id=None):
+        attempts.append(len(scans))
+        if len(attempts) == 1:
+            raise OperationalError("INSERT", {}, Exception("database is locked"))
+        await record_scans(db, ctx, scans, user_id=user_id)
+
+    monkeypatch.setattr(scan_contexts, "record_scans", flaky_record_scans)
+    token = create_access_token("picker")
+
+    with client.websocket_connect(URL, headers={"Authorization": f"Bearer {token}"}) as ws:
+        ws.send_text("7791")
+        ws.receive_json()
+        ws.send_text("7791")
+        ws.receive_json()
+        # The batch flush fails; the timer retries the same scans on the rolled-back session
+        assert ws.receive_json() == {"type": "flushed", "persisted": 2, "scan_count": 2}
+
+    assert attempts == [2, 2]
+    assert scan_rows(tmp_path) == [(1, "MATCH", 7), (1, "MATCH", 7)]
@@ -45,19 +45,20 @@ export const PrintProvider = ({ children }) => {
                 }
             };
 
-            const backendRes = await api.post('/printing/generate-raw', payload);
-            if (!backendRes.data.raw_bytes_base64) throw new Error("No bytes returned");
-
-            // 2. Send to Local Bridge
-            const bridgePayload = {
-                printer_name: config.printerName,
-                data: backendRes.data.raw_bytes_base64
-            };
+            const backendRes = await api.post('/printing/generate-raw', payload, {
+                params: { format: 'binary' },
+                responseType: 'arraybuffer'
+            });
+            if (!backendRes.data?.byteLength) throw new Error("No bytes returned");
 
-            const bridgeRes = await fetch(`${config.bridgeUrl}/print`, {
+            // 2. Send the raw bytes to the Local Bridge (no base64 round trip)
+            const bridgeRes = await fetch(`${config.bridgeUrl}/print/raw`, {
                 method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify(bridgePayload)
+                headers: {
+                    'Content-Type': 'application/octet-stream',
+                    'X-Printer-Name': config.printerName
+                },
+                body: backendRes.data
             });
 
             if (!bridgeRes.ok) throw new Error("Bridge error: " + bridgeRes.statusText);
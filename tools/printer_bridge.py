@@ -23,6 +23,19 @@ def list_printers():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def write_raw(printer_name, raw_bytes):
+    hPrinter = win32print.OpenPrinter(printer_name)
+    try:
+        hJob = win32print.StartDocPrinter(hPrinter, 1, ("AntiGravity Receipt", None, "RAW"))
+        try:
+            win32print.StartPagePrinter(hPrinter)
+            win32print.WritePrinter(hPrinter, raw_bytes)
+            win32print.EndPagePrinter(hPrinter)
+        finally:
+            win32print.EndDocPrinter(hPrinter)
+    finally:
+        win32print.ClosePrinter(hPrinter)
+
 @app.route('/print', methods=['POST'])
 def print_raw():
     data = request.json
@@ -38,22 +51,26 @@ def print_raw():
         return jsonify({"error": "Invalid base64 data"}), 400
 
     try:
-        hPrinter = win32print.OpenPrinter(printer_name)
-        try:
-            hJob = win32print.StartDocPrinter(hPrinter, 1, ("AntiGravity Receipt", None, "RAW"))
-            try:
-                win32print.StartPagePrinter(hPrinter)
-                win32print.WritePrinter(hPrinter, raw_bytes)
-                win32print.EndPagePrinter(hPrinter)
-            finally:
-                win32print.EndDocPrinter(hPrinter)
-        finally:
-            win32print.ClosePrinter(hPrinter)
-        
+        write_raw(printer_name, raw_bytes)
         return jsonify({"status": "success", "message": "Job sent to printer"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/print/raw', methods=['POST'])
+def print_raw_bytes():
+    """Raw ESC/POS body (application/octet-stream), printer in the X-Printer-Name header or ?printer=."""
+    printer_name = request.headers.get('X-Printer-Name') or request.args.get('printer')
+    raw_bytes = request.get_data(cache=False)
+
+    if not printer_name or not raw_bytes:
+        return jsonify({"error": "Missing printer name or data"}), 400
+
+    try:
+        write_raw(printer_name, raw_bytes)
+        return jsonify({"status": "success", "message": "Job sent to printer", "bytes": len(raw_bytes)})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 if __name__ == '__main__':
     print("Starting Local Printer Bridge on port 3001...")
     # Run on port 3001 to avoid conflict with React (5173) or Backend (8000)